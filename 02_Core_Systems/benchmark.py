@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Performance Benchmark Suite
+
+逻辑引擎与SST配置生成的性能基准
+覆盖以下项目，结果连同运行环境信息输出为JSON，便于跨版本跟踪:
+- simulate: 不同网格规模 (4x4 到 64x64)、拓扑和注入负载下
+  HybridMirandaMesh.simulate 的周期/秒和弹出包/秒
+- report: 同一运行上 collect_statistics() 和 print_statistics() 的耗时
+- send_message: 手动注入消息的速率 (消息/秒)
+- construct: 用SST替身模块构建完整配置图 (组件、链路、统计) 的耗时和规模
+
+每个用例在独立的子进程中运行，报告该用例的峰值常驻内存 (ru_maxrss)；
+计时区间内的标准输出重定向到 /dev/null，避免终端输出主导计时
+
+使用方法:
+    python benchmark.py                                  # 4x4 到 64x64 全部用例
+    python benchmark.py --sizes 4x4,8x8 --loads 0.1 --output bench.json
+"""
+
+# 标准库导入
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+
+# 第三方库
+import numpy as np
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import (HybridMirandaMesh, TopologyType, TopoConfig, TrafficConfig, TrafficPattern,
+                                 ENGINE_VERSION)
+
+# 默认用例参数
+DEFAULT_SIZES = ("4x4", "8x8", "16x16", "32x32", "64x64")
+DEFAULT_TOPOLOGIES = ("mesh", "torus")
+DEFAULT_LOADS = (0.05, 0.2)
+
+# 每个simulate用例的节点周期预算 (大网格相应减少计时周期数)
+DEFAULT_NODE_CYCLES = 200_000
+MIN_CYCLES = 20
+MAX_CYCLES = 1000
+
+
+# =============================================================================
+# 用例与结果
+# =============================================================================
+
+@dataclass
+class BenchmarkCase:
+    """一个基准用例"""
+    kind: str                            # simulate / send_message / construct
+    shape: str
+    topology: str = "mesh"
+    load: float = 0.0
+    cycles: int = 0                      # simulate: 计时周期数
+    warmup_cycles: int = 0               # simulate: 计时前的预热周期数
+    messages: int = 0                    # send_message: 注入消息数
+    seed: int = 1
+
+
+@dataclass
+class BenchmarkResult:
+    """一个用例的结果 (metrics中全部为数值)"""
+    case: BenchmarkCase
+    metrics: Dict[str, float] = field(default_factory=dict)
+    peak_rss_mib: float = 0.0
+    error: Optional[str] = None
+
+
+def _parse_shape(shape: str):
+    size_x, size_y = (int(v) for v in shape.lower().split("x"))
+    return size_x, size_y
+
+
+def _build_mesh(case: BenchmarkCase, traffic: bool, enable_sst_stats: bool, output_dir: str) -> HybridMirandaMesh:
+    size_x, size_y = _parse_shape(case.shape)
+    topology = TopologyType(case.topology)
+    config = TopoConfig(topology, mesh_size_x=size_x, mesh_size_y=size_y, total_nodes=size_x * size_y)
+    traffic_config = (TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=case.load, packets_per_node=0)
+                      if traffic else None)
+    return HybridMirandaMesh(topology_type=topology, topology_config=config, enable_sst_stats=enable_sst_stats,
+                             traffic_config=traffic_config, output_dir=output_dir, seed=case.seed, verbose=False)
+
+
+@contextlib.contextmanager
+def _quiet():
+    """计时区间内丢弃标准输出"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _packets_received(mesh: HybridMirandaMesh) -> int:
+    return sum(node.packets_received for node in mesh.nodes.values())
+
+
+def _run_case(case: BenchmarkCase) -> BenchmarkResult:
+    """子进程工作函数: 执行一个用例"""
+    if "sst_standin" in sys.modules:
+        sys.modules["sst_standin"].reset()
+    result = BenchmarkResult(case=case)
+    with tempfile.TemporaryDirectory() as output_dir:
+        try:
+            if case.kind == "construct":
+                with _quiet():
+                    start = time.perf_counter()
+                    mesh = _build_mesh(case, traffic=False, enable_sst_stats=True, output_dir=output_dir)
+                    elapsed = time.perf_counter() - start
+                result.metrics["construct_seconds"] = elapsed
+                result.metrics["nodes"] = len(mesh.nodes)
+                if "sst_standin" in sys.modules:
+                    result.metrics["sst_components"] = len(sys.modules["sst_standin"].components)
+                    result.metrics["sst_links"] = len(sys.modules["sst_standin"].links)
+
+            elif case.kind == "send_message":
+                mesh = _build_mesh(case, traffic=False, enable_sst_stats=False, output_dir=output_dir)
+                rng = random.Random(case.seed)
+                pairs = [(rng.randrange(mesh.total_nodes), rng.randrange(mesh.total_nodes))
+                         for _ in range(case.messages)]
+                with _quiet():
+                    start = time.perf_counter()
+                    for source, destination in pairs:
+                        mesh.send_message(source, destination, "bench")
+                    elapsed = time.perf_counter() - start
+                result.metrics["send_seconds"] = elapsed
+                result.metrics["messages_per_second"] = case.messages / elapsed if elapsed > 0 else 0.0
+
+            elif case.kind == "simulate":
+                mesh = _build_mesh(case, traffic=True, enable_sst_stats=False, output_dir=output_dir)
+                with _quiet():
+                    for _ in range(case.warmup_cycles):
+                        mesh.simulate_step()
+                    received = _packets_received(mesh)
+                    start = time.perf_counter()
+                    simulation = mesh.simulate(case.cycles)
+                    elapsed = time.perf_counter() - start
+                    packets = _packets_received(mesh) - received
+
+                    report_start = time.perf_counter()
+                    mesh.collect_statistics()
+                    collect_elapsed = time.perf_counter() - report_start
+                    report_start = time.perf_counter()
+                    mesh.print_statistics()
+                    print_elapsed = time.perf_counter() - report_start
+                if not simulation.completed:
+                    result.error = f"看门狗在第 {simulation.cycles} 个周期终止模拟"
+                result.metrics.update({
+                    "simulate_seconds": elapsed,
+                    "cycles_per_second": simulation.cycles / elapsed if elapsed > 0 else 0.0,
+                    "node_cycles_per_second": simulation.cycles * mesh.total_nodes / elapsed if elapsed > 0 else 0.0,
+                    "packets_per_second": packets / elapsed if elapsed > 0 else 0.0,
+                    "packets_ejected": packets,
+                    "collect_statistics_seconds": collect_elapsed,
+                    "print_statistics_seconds": print_elapsed,
+                })
+            else:
+                raise ValueError(f"未知的基准用例类型: {case.kind}")
+        except Exception as exc:  # 单个用例失败不影响其余用例
+            result.error = f"{type(exc).__name__}: {exc}"
+    result.peak_rss_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+# =============================================================================
+# 基准套件
+# =============================================================================
+
+def build_cases(sizes=DEFAULT_SIZES, topologies=DEFAULT_TOPOLOGIES, loads=DEFAULT_LOADS,
+                node_cycles: int = DEFAULT_NODE_CYCLES, messages: int = 20000, seed: int = 1) -> List[BenchmarkCase]:
+    """生成用例列表: 每个规模的construct/send_message，以及规模×拓扑×负载的simulate"""
+    cases = []
+    for shape in sizes:
+        size_x, size_y = _parse_shape(shape)
+        cycles = max(MIN_CYCLES, min(MAX_CYCLES, node_cycles // (size_x * size_y)))
+        for topology in topologies:
+            cases.append(BenchmarkCase("construct", shape, topology, seed=seed))
+        cases.append(BenchmarkCase("send_message", shape, topologies[0], messages=messages, seed=seed))
+        for topology in topologies:
+            for load in loads:
+                cases.append(BenchmarkCase("simulate", shape, topology, load, cycles=cycles,
+                                           warmup_cycles=max(MIN_CYCLES, cycles // 5), seed=seed))
+    return cases
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """运行环境信息 (随结果一起保存，用于跨机器/跨版本比较)"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "engine_version": ENGINE_VERSION,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "python_implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "sst_backend": "standin" if "sst_standin" in sys.modules else "sst-core",
+    }
+
+
+def run_benchmarks(cases: List[BenchmarkCase], verbose: bool = True) -> Dict[str, Any]:
+    """
+    依次在独立子进程中运行各用例
+
+    Returns:
+        Dict: {"environment": ..., "results": [...]} (可直接写成JSON)
+    """
+    results = []
+    for case in cases:
+        # 每个用例一个新的spawn进程，使峰值内存只反映该用例
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+            result = pool.submit(_run_case, case).result()
+        results.append(result)
+        if verbose:
+            print_result(result)
+    return {"environment": environment_metadata(), "results": [asdict(result) for result in results]}
+
+
+def print_result(result: BenchmarkResult):
+    """打印一个用例的结果"""
+    case = result.case
+    name = f"{case.kind:<12} {case.topology:<5} {case.shape:>6}"
+    if case.kind == "simulate":
+        name += f" 负载 {case.load:<5}"
+    if result.error:
+        print(f"  {name}  ❌ {result.error}")
+        return
+    metrics = result.metrics
+    if case.kind == "simulate":
+        detail = (f"{metrics['cycles_per_second']:9.1f} 周期/s  {metrics['packets_per_second']:10.0f} 包/s  "
+                  f"统计 {metrics['collect_statistics_seconds'] * 1000:7.1f}ms  "
+                  f"报告 {metrics['print_statistics_seconds'] * 1000:7.1f}ms")
+    elif case.kind == "send_message":
+        detail = f"{metrics['messages_per_second']:10.0f} 消息/s"
+    else:
+        detail = (f"构建 {metrics['construct_seconds']:.3f}s  "
+                  f"{metrics.get('sst_components', 0):.0f} 组件  {metrics.get('sst_links', 0):.0f} 链路")
+    print(f"  {name}  {detail}  峰值内存 {result.peak_rss_mib:.0f} MiB")
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="逻辑引擎与SST配置生成性能基准")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="网格规模列表，如 4x4,8x8")
+    parser.add_argument("--topologies", default=",".join(DEFAULT_TOPOLOGIES), help="拓扑列表")
+    parser.add_argument("--loads", default=",".join(str(load) for load in DEFAULT_LOADS), help="注入负载列表")
+    parser.add_argument("--node-cycles", type=int, default=DEFAULT_NODE_CYCLES,
+                        help=f"每个simulate用例的节点周期预算 (计时周期数限制在{MIN_CYCLES}-{MAX_CYCLES})")
+    parser.add_argument("--messages", type=int, default=20000, help="send_message用例的消息数")
+    parser.add_argument("--seed", type=int, default=1, help="运行种子")
+    parser.add_argument("--output", help="结果JSON路径 (默认 benchmark_<时间戳>.json)")
+    args = parser.parse_args(argv)
+
+    topologies = tuple(args.topologies.split(","))
+    for topology in topologies:
+        TopologyType(topology)
+    cases = build_cases(sizes=tuple(args.sizes.split(",")), topologies=topologies,
+                        loads=tuple(float(load) for load in args.loads.split(",")),
+                        node_cycles=args.node_cycles, messages=args.messages, seed=args.seed)
+
+    print(f"\n=== 性能基准: {len(cases)} 个用例 ===")
+    report = run_benchmarks(cases)
+    output = args.output or f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2, ensure_ascii=False)
+    print(f"\n基准结果已写入: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,677 @@
+#!/usr/bin/env python3
+"""
+Channel Dependency Graph Analyzer
+
+通道依赖图 (CDG) 死锁分析工具
+对任意TopoConfig和路由模式 (包括虚拟通道划分) 构建通道依赖图，
+用迭代Tarjan算法求强连通分量，报告最短的违规循环。
+通道依赖图无环是确定性路由无死锁的充分条件 (Dally & Seitz)
+
+构建方法:
+- 通道 = (节点, 输出方向, 虚拟通道)，编号 ((节点*4 + 方向)*VC数 + VC)
+- 每个通道携带的目标节点集合用位集 (Python整数) 表示，从各节点注入开始
+  按路由关系逐跳传播 (半朴素不动点迭代)，只记录实际可达的依赖
+- 数据包状态 (日期线、奇偶模型的源列、O1TURN维序、两阶段路由阶段、是否已进入
+  逃逸子网络) 作为传播状态的一部分，虚拟通道类取自 MultiTopologyRouter.class_vcs；
+  两阶段路由的阶段0以中间节点为目标集合；ROMM的阶段0状态携带源节点，到达中间节点后
+  阶段1的目标集合只含最小象限覆盖该中间节点的目标节点 (节点数超过ROMM_EXACT_MAX_NODES
+  时按Valiant方式取依赖的超集，结果标记为保守近似: 无环仍可证明无死锁，循环可能是虚假的)
+- MIN_ADAPTIVE预留逃逸通道时按Duato理论只检查逃逸子网络的依赖 (逃逸通道之间的边)；
+  数据包进入逃逸子网络后不再返回自适应通道，因此不存在经自适应通道的间接依赖
+- 路由关系按目标节点向量化计算，并可用 --verify 抽样对照 MultiTopologyRouter
+
+使用方法:
+    python channel_dependency.py --topology torus --shape 8x8 --vcs 2
+    python channel_dependency.py --topology mesh --shape 16x16 --routing all
+"""
+
+# 标准库导入
+import argparse
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# 第三方库
+import numpy as np
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import (Direction, TopologyType, RoutingMode, TieBreak, TopoConfig, Packet,
+                                 MultiTopologyRouter, ROUTING_MODE_TOPOLOGIES, TWO_PHASE_ROUTING_MODES)
+
+# 通道方向顺序 (通道编号中的方向索引)
+CHANNEL_DIRECTIONS: Tuple[Direction, ...] = (Direction.NORTH, Direction.SOUTH, Direction.EAST, Direction.WEST)
+_DIRECTION_INDEX = {direction: index for index, direction in enumerate(CHANNEL_DIRECTIONS)}
+
+# 传播状态字段: (当前维度, 已越过日期线, 已在X方向移动, YX维序, 两阶段路由阶段, 已进入逃逸子网络,
+#               ROMM阶段0的源节点 (其余为-1))
+_State = Tuple[int, int, int, int, int, int, int]
+
+# 逃逸子网络 (维序路由) 的路由状态键
+_DOR_KEY = -1
+
+# ROMM精确建模 (阶段0按源节点区分状态，开销随节点数平方增长) 的最大节点数
+ROMM_EXACT_MAX_NODES = 256
+
+
+# =============================================================================
+# 结果数据结构
+# =============================================================================
+
+@dataclass
+class DependencyGraph:
+    """通道依赖图 (CSR邻接数组)"""
+    config: TopoConfig
+    num_channels: int
+    indptr: np.ndarray                   # (通道数+1,) 每个通道出边在indices中的起始位置
+    indices: np.ndarray                  # (边数,) 出边的目标通道
+    used_channels: np.ndarray            # (通道数,) 通道是否被任何数据包使用
+    escape_subnetwork: bool = False      # 是否只含逃逸子网络的依赖
+    conservative: bool = False           # 依赖为实际依赖的超集 (大规模ROMM)
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.indices.size)
+
+    def successors(self, channel: int) -> np.ndarray:
+        return self.indices[self.indptr[channel]:self.indptr[channel + 1]]
+
+    def channel_label(self, channel: int) -> str:
+        """通道的可读名称，如 (3,1)->east vc1"""
+        num_vcs = self.config.virtual_channels
+        vc = channel % num_vcs
+        node, direction_index = divmod(channel // num_vcs, len(CHANNEL_DIRECTIONS))
+        y, x = divmod(node, self.config.mesh_size_x)
+        return f"({x},{y})->{CHANNEL_DIRECTIONS[direction_index].value} vc{vc}"
+
+
+@dataclass
+class CDGReport:
+    """通道依赖图分析结果"""
+    topology: str
+    shape: str
+    routing_mode: str
+    tie_break: str
+    virtual_channels: int
+    num_channels: int                    # 被使用的通道数
+    num_edges: int
+    cyclic_components: int               # 含循环的强连通分量数
+    largest_component: int               # 最大强连通分量的通道数
+    escape_subnetwork: bool = False      # 是否只分析逃逸子网络 (MIN_ADAPTIVE预留逃逸通道时)
+    conservative: bool = False           # 保守近似: 循环可能不对应实际死锁
+    shortest_cycle: List[str] = field(default_factory=list)   # 最短违规循环 (通道名称)
+    build_seconds: float = 0.0
+    analysis_seconds: float = 0.0
+
+    @property
+    def deadlock_free(self) -> bool:
+        return self.cyclic_components == 0
+
+
+# =============================================================================
+# 路由关系 (按目标节点向量化，与 MultiTopologyRouter.candidate_directions 一致)
+# =============================================================================
+
+class RoutingRelation:
+    """
+    路由关系: 对节点n和路由相关状态，给出每个输出方向对应的目标节点集合
+
+    目标节点集合以位集 (Python整数，第i位对应节点ID i) 表示
+    """
+
+    def __init__(self, config: TopoConfig):
+        self.config = config
+        self.size_x = config.mesh_size_x
+        self.size_y = config.mesh_size_y
+        self.num_nodes = self.size_x * self.size_y
+        self.torus = config.topology_type == TopologyType.TORUS
+        self.mode = config.routing_mode
+
+        node_ids = np.arange(self.num_nodes)
+        self.dest_x = node_ids % self.size_x
+        self.dest_y = node_ids // self.size_x
+        self._cache: Dict[Tuple[int, int], List[Tuple[Direction, int]]] = {}
+        self._romm_cache: Dict[Tuple[int, int], int] = {}
+
+    def routing_key(self, state: _State) -> int:
+        """影响路由函数的状态部分 (奇偶模型: 是否已在X方向移动; O1TURN: 维序; 逃逸子网络: 维序路由)"""
+        if state[5]:
+            return _DOR_KEY
+        if self.mode == RoutingMode.ODD_EVEN:
+            return state[2]
+        if self.mode == RoutingMode.O1TURN:
+            return state[3]
+        return 0
+
+    def masks(self, node: int, key: int) -> List[Tuple[Direction, int]]:
+        """节点node在路由状态key下每个输出方向的目标节点位集 (仅非空项)"""
+        cached = self._cache.get((node, key))
+        if cached is None:
+            y, x = divmod(node, self.size_x)
+            arrays = self._direction_arrays(x, y, key)
+            cached = []
+            for direction, mask in arrays.items():
+                if mask.any():
+                    packed = np.packbits(mask, bitorder="little").tobytes()
+                    cached.append((direction, int.from_bytes(packed, "little")))
+            self._cache[(node, key)] = cached
+        return cached
+
+    def romm_destinations(self, source: int, intermediate: int) -> int:
+        """ROMM: 源节点source选择intermediate为中间节点时可能的目标节点位集 (最小象限覆盖中间节点)"""
+        key = (source, intermediate)
+        cached = self._romm_cache.get(key)
+        if cached is None:
+            sy, sx = divmod(source, self.size_x)
+            iy, ix = divmod(intermediate, self.size_x)
+            mask = (self._in_minimal_span(sx, ix, self.dest_x, self.size_x)
+                    & self._in_minimal_span(sy, iy, self.dest_y, self.size_y))
+            packed = np.packbits(mask, bitorder="little").tobytes()
+            cached = self._romm_cache[key] = int.from_bytes(packed, "little")
+        return cached
+
+    def _in_minimal_span(self, source: int, point: int, dest: np.ndarray, size: int) -> np.ndarray:
+        """单个维度上point是否位于source到各目标的最短路径区间内 (Torus平局按tie_break)"""
+        if not self.torus:
+            return (np.minimum(source, dest) <= point) & (point <= np.maximum(source, dest))
+        forward = (dest - source) % size
+        backward = (source - dest) % size
+        in_forward = (point - source) % size <= forward
+        in_backward = (source - point) % size <= backward
+        tie = forward == backward
+        if self.config.tie_break == TieBreak.DIRECT:
+            # 平局走直接路径: 目标坐标更大时为正向
+            use_forward = (forward < backward) | (tie & (dest >= source))
+            return np.where(use_forward, in_forward, in_backward)
+        return np.where(tie, in_forward | in_backward, np.where(forward < backward, in_forward, in_backward))
+
+    def _dimension_masks(self, current: int, dest: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """单个维度上正向/反向为最短路径方向的目标集合 (Torus平局按tie_break)"""
+        if not self.torus:
+            return dest > current, dest < current
+        forward = (dest - current) % size
+        backward = (current - dest) % size
+        moving = dest != current
+        positive = moving & (forward < backward)
+        negative = moving & (backward < forward)
+        tie = moving & (forward == backward)
+        if self.config.tie_break == TieBreak.DIRECT:
+            # 平局走直接路径: 目标坐标更大时为正向
+            positive |= tie & (dest > current)
+            negative |= tie & (dest < current)
+        else:
+            positive |= tie
+            negative |= tie
+        return positive, negative
+
+    def _direction_arrays(self, x: int, y: int, key: int) -> Dict[Direction, np.ndarray]:
+        tx, ty = self.dest_x, self.dest_y
+        east, west = self._dimension_masks(x, tx, self.size_x)
+        south, north = self._dimension_masks(y, ty, self.size_y)
+        x_aligned = tx == x
+        y_aligned = ty == y
+        local = x_aligned & y_aligned
+
+        if key == _DOR_KEY:
+            return self._dor_arrays(east, west, south, north, x_aligned, local)
+
+        if self.mode == RoutingMode.WEST_FIRST:
+            not_west = ~west
+            return {Direction.WEST: west, Direction.EAST: east & not_west,
+                    Direction.SOUTH: south & not_west, Direction.NORTH: north & not_west,
+                    Direction.LOCAL: local}
+
+        if self.mode == RoutingMode.ODD_EVEN:
+            at_source_column = key == 0
+            dx = tx - x
+            vertical_ok = np.where(dx > 0, (x % 2 == 1) or at_source_column,
+                                   np.where(dx < 0, x % 2 == 0, True))
+            east_ok = (dx > 0) & (y_aligned | (tx % 2 == 1) | (dx != 1))
+            return {Direction.EAST: east_ok, Direction.WEST: dx < 0,
+                    Direction.SOUTH: south & vertical_ok, Direction.NORTH: north & vertical_ok,
+                    Direction.LOCAL: local}
+
+        if self.mode == RoutingMode.MIN_ADAPTIVE:
+            return {Direction.EAST: east, Direction.WEST: west, Direction.SOUTH: south,
+                    Direction.NORTH: north, Direction.LOCAL: local}
+
+        if self.mode == RoutingMode.O1TURN and key == 1:
+            # 先Y后X
+            return {Direction.SOUTH: south, Direction.NORTH: north,
+                    Direction.EAST: east & y_aligned, Direction.WEST: west & y_aligned,
+                    Direction.LOCAL: local}
+
+        # 维序路由 (DOR、O1TURN的XY维序、两阶段路由的各阶段)
+        return self._dor_arrays(east, west, south, north, x_aligned, local)
+
+    @staticmethod
+    def _dor_arrays(east: np.ndarray, west: np.ndarray, south: np.ndarray, north: np.ndarray,
+                    x_aligned: np.ndarray, local: np.ndarray) -> Dict[Direction, np.ndarray]:
+        """维序路由 (先X后Y) 的方向目标集合"""
+        return {Direction.EAST: east, Direction.WEST: west,
+                Direction.SOUTH: south & x_aligned, Direction.NORTH: north & x_aligned,
+                Direction.LOCAL: local}
+
+
+# =============================================================================
+# 依赖图构建
+# =============================================================================
+
+def build_dependency_graph(config: TopoConfig) -> DependencyGraph:
+    """
+    构建通道依赖图
+
+    Args:
+        config: 拓扑配置 (拓扑类型、规模、路由模式、平局策略、虚拟通道数)
+
+    Returns:
+        DependencyGraph: CSR形式的通道依赖图
+    """
+    if config.topology_type not in ROUTING_MODE_TOPOLOGIES[config.routing_mode]:
+        raise ValueError(f"路由模式 {config.routing_mode.value} 不支持 {config.topology_type.value} 拓扑")
+
+    relation = RoutingRelation(config)
+    size_x, size_y = config.mesh_size_x, config.mesh_size_y
+    num_nodes = size_x * size_y
+    num_vcs = config.virtual_channels
+    num_channels = num_nodes * len(CHANNEL_DIRECTIONS) * num_vcs
+    all_nodes = (1 << num_nodes) - 1
+
+    two_phase = config.routing_mode in TWO_PHASE_ROUTING_MODES
+    romm = config.routing_mode == RoutingMode.ROMM and num_nodes <= ROMM_EXACT_MAX_NODES
+    conservative = config.routing_mode == RoutingMode.ROMM and not romm
+    track_dateline = relation.torus and num_vcs >= 2
+    track_x_moved = config.routing_mode == RoutingMode.ODD_EVEN
+    adaptive_escape = config.routing_mode == RoutingMode.MIN_ADAPTIVE
+    vc_router = MultiTopologyRouter(0, (0, 0), config)
+    # 预留逃逸通道时只记录逃逸通道之间的依赖
+    escape_vcs = set(vc_router.class_vcs(1, False)) | set(vc_router.class_vcs(1, True))
+    escape_only = vc_router.has_escape_vcs
+
+    # 每个通道的下游节点和日期线标记 (使用路由器自身的判定)
+    downstream = np.full(num_channels // num_vcs, -1, dtype=np.int64)
+    crosses = np.zeros(num_channels // num_vcs, dtype=bool)
+    for node in range(num_nodes):
+        y, x = divmod(node, size_x)
+        router = MultiTopologyRouter(node, (x, y), config)
+        for index, direction in enumerate(CHANNEL_DIRECTIONS):
+            nx, ny = x, y
+            if direction == Direction.EAST:
+                nx = x + 1
+            elif direction == Direction.WEST:
+                nx = x - 1
+            elif direction == Direction.SOUTH:
+                ny = y + 1
+            else:
+                ny = y - 1
+            if relation.torus:
+                nx, ny = nx % size_x, ny % size_y
+            elif not (0 <= nx < size_x and 0 <= ny < size_y):
+                continue
+            downstream[node * len(CHANNEL_DIRECTIONS) + index] = ny * size_x + nx
+            crosses[node * len(CHANNEL_DIRECTIONS) + index] = router.crosses_dateline(direction)
+    downstream_list = downstream.tolist()
+    crosses_list = crosses.tolist()
+
+    # 传播: (输入通道或-1, 节点, 状态) -> 已携带的目标集合 / 待处理增量
+    carried: Dict[Tuple[int, int, _State], int] = {}
+    pending: Dict[Tuple[int, int, _State], int] = {}
+    worklist: deque = deque()
+
+    def add(key: Tuple[int, int, _State], targets: int):
+        new = targets & ~carried.get(key, 0)
+        if not new:
+            return
+        carried[key] = carried.get(key, 0) | new
+        if key in pending:
+            pending[key] |= new
+        else:
+            pending[key] = new
+            worklist.append(key)
+
+    initial_phase = 0 if two_phase else 1
+    initial_orders = (0, 1) if config.routing_mode == RoutingMode.O1TURN else (0,)
+    for node in range(num_nodes):
+        for order in initial_orders:
+            add((-1, node, (-1, 0, 0, order, initial_phase, 0, node if romm else -1)), all_nodes)
+
+    edges = set()
+    used = np.zeros(num_channels, dtype=bool)
+    while worklist:
+        key = worklist.popleft()
+        targets = pending.pop(key)
+        in_channel, node, state = key
+        dim, crossed, x_moved, order, phase, escaped, source = state
+
+        # 自适应路由的每一跳也可转入逃逸子网络 (维序路由)，此后不再返回
+        hops = [(direction, mask, escaped) for direction, mask in relation.masks(node, relation.routing_key(state))]
+        if adaptive_escape and not escaped:
+            hops += [(direction, mask, 1) for direction, mask in relation.masks(node, _DOR_KEY)
+                     if direction != Direction.LOCAL]
+        for direction, mask, next_escaped in hops:
+            subset = targets & mask
+            if not subset:
+                continue
+            if direction == Direction.LOCAL:
+                if phase == 0:
+                    # 到达中间节点，进入阶段1 (重新开始日期线状态)；
+                    # Valiant的目标为全部节点，ROMM为最小象限覆盖该中间节点的目标节点
+                    destinations = relation.romm_destinations(source, node) if romm else all_nodes
+                    add((in_channel, node, (-1, 0, x_moved, order, 1, escaped, -1)), destinations)
+                continue
+
+            link = node * len(CHANNEL_DIRECTIONS) + _DIRECTION_INDEX[direction]
+            out_dim = 0 if direction in (Direction.EAST, Direction.WEST) else 1
+            next_dim, next_crossed = dim, crossed
+            if track_dateline:
+                if out_dim != dim:
+                    next_dim, next_crossed = out_dim, 0
+                if crosses_list[link]:
+                    next_crossed = 1
+            # 虚拟通道类 (与 MultiTopologyRouter.vc_group 一致)
+            group = phase if two_phase else order if config.routing_mode == RoutingMode.O1TURN else next_escaped
+            vcs = vc_router.class_vcs(group, bool(next_crossed))
+            next_state = (next_dim, next_crossed, 1 if (x_moved or (track_x_moved and out_dim == 0)) else 0,
+                          order, phase, next_escaped, source)
+            next_node = downstream_list[link]
+
+            for vc in vcs:
+                out_channel = link * num_vcs + vc
+                used[out_channel] = True
+                if in_channel >= 0 and (not escape_only or (in_channel % num_vcs in escape_vcs
+                                                            and vc in escape_vcs)):
+                    edges.add(in_channel * num_channels + out_channel)
+                add((out_channel, next_node, next_state), subset)
+
+    # CSR邻接数组
+    if edges:
+        encoded = np.fromiter(edges, dtype=np.int64, count=len(edges))
+        encoded.sort()
+        sources = encoded // num_channels
+        indices = encoded % num_channels
+    else:
+        sources = np.zeros(0, dtype=np.int64)
+        indices = np.zeros(0, dtype=np.int64)
+    indptr = np.zeros(num_channels + 1, dtype=np.int64)
+    np.add.at(indptr, sources + 1, 1)
+    np.cumsum(indptr, out=indptr)
+    return DependencyGraph(config, num_channels, indptr, indices, used, escape_only, conservative)
+
+
+# =============================================================================
+# 强连通分量和最短循环
+# =============================================================================
+
+def strongly_connected_components(graph: DependencyGraph) -> List[np.ndarray]:
+    """
+    迭代Tarjan算法求含循环的强连通分量
+
+    Returns:
+        List[np.ndarray]: 每个含循环分量的通道编号 (大小>1，或含自环)
+    """
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    n = graph.num_channels
+    index_of = [-1] * n
+    lowlink = [0] * n
+    on_stack = [False] * n
+    stack: List[int] = []
+    components: List[np.ndarray] = []
+    counter = 0
+
+    for root in range(n):
+        if index_of[root] != -1 or indptr[root] == indptr[root + 1]:
+            continue
+        # 调用栈元素: (节点, 下一条待访问出边的位置)
+        call_stack = [(root, indptr[root])]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while call_stack:
+            v, edge = call_stack[-1]
+            if edge < indptr[v + 1]:
+                call_stack[-1] = (v, edge + 1)
+                w = indices[edge]
+                if index_of[w] == -1:
+                    index_of[w] = lowlink[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    call_stack.append((w, indptr[w]))
+                elif on_stack[w] and index_of[w] < lowlink[v]:
+                    lowlink[v] = index_of[w]
+                continue
+
+            call_stack.pop()
+            if call_stack:
+                parent = call_stack[-1][0]
+                if lowlink[v] < lowlink[parent]:
+                    lowlink[parent] = lowlink[v]
+            if lowlink[v] == index_of[v]:
+                members = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    members.append(w)
+                    if w == v:
+                        break
+                if len(members) > 1 or v in indices[indptr[v]:indptr[v + 1]]:
+                    components.append(np.array(sorted(members), dtype=np.int64))
+    return components
+
+
+def shortest_cycle(graph: DependencyGraph, components: List[np.ndarray]) -> List[int]:
+    """
+    求所有含循环分量中的最短循环
+
+    从每个通道出发在所属分量内做深度受限BFS，深度上限随已找到的最短循环收紧
+
+    Returns:
+        List[int]: 最短循环上的通道编号 (按依赖顺序)，无循环时为空
+    """
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    best: List[int] = []
+
+    for component in components:
+        members = set(component.tolist())
+        for start in component.tolist():
+            limit = len(best) - 1 if best else len(members)
+            parent = {start: -1}
+            frontier = [start]
+            depth = 0
+            found = None
+            while frontier and depth < limit and found is None:
+                depth += 1
+                next_frontier = []
+                for v in frontier:
+                    for w in indices[indptr[v]:indptr[v + 1]]:
+                        if w == start:
+                            found = v
+                            break
+                        if w in members and w not in parent:
+                            parent[w] = v
+                            next_frontier.append(w)
+                    if found is not None:
+                        break
+                frontier = next_frontier
+            if found is not None:
+                cycle = []
+                v = found
+                while v != -1:
+                    cycle.append(v)
+                    v = parent[v]
+                cycle.reverse()
+                if not best or len(cycle) < len(best):
+                    best = cycle
+                    if len(best) == 1:
+                        return best
+    return best
+
+
+# =============================================================================
+# 分析入口
+# =============================================================================
+
+def analyze_channel_dependencies(config: TopoConfig) -> CDGReport:
+    """构建通道依赖图并检查循环"""
+    start = time.perf_counter()
+    graph = build_dependency_graph(config)
+    built = time.perf_counter()
+    components = strongly_connected_components(graph)
+    cycle = shortest_cycle(graph, components)
+    finished = time.perf_counter()
+
+    return CDGReport(
+        topology=config.topology_type.value,
+        shape=f"{config.mesh_size_x}x{config.mesh_size_y}",
+        routing_mode=config.routing_mode.value,
+        tie_break=config.tie_break.value,
+        virtual_channels=config.virtual_channels,
+        num_channels=int(graph.used_channels.sum()),
+        num_edges=graph.num_edges,
+        cyclic_components=len(components),
+        largest_component=max((len(c) for c in components), default=0),
+        escape_subnetwork=graph.escape_subnetwork,
+        conservative=graph.conservative,
+        shortest_cycle=[graph.channel_label(channel) for channel in cycle],
+        build_seconds=built - start,
+        analysis_seconds=finished - built,
+    )
+
+
+def analyze_all_routing_modes(topology_type: TopologyType, size_x: int, size_y: int,
+                              virtual_channels: int = 1,
+                              tie_break: TieBreak = TieBreak.DIRECT) -> List[CDGReport]:
+    """对拓扑支持的每种路由模式运行通道依赖分析"""
+    reports = []
+    for mode in RoutingMode:
+        if topology_type not in ROUTING_MODE_TOPOLOGIES[mode]:
+            continue
+        config = TopoConfig(topology_type, mesh_size_x=size_x, mesh_size_y=size_y,
+                            total_nodes=size_x * size_y, routing_mode=mode,
+                            tie_break=tie_break, virtual_channels=virtual_channels)
+        reports.append(analyze_channel_dependencies(config))
+    return reports
+
+
+def verify_routing_relation(config: TopoConfig, samples: int = 2000, seed: int = 1) -> List[str]:
+    """
+    抽样对照分析器的路由关系与 MultiTopologyRouter 的实际路由结果
+
+    Returns:
+        List[str]: 不一致的样本描述
+    """
+    rng = random.Random(seed)
+    relation = RoutingRelation(config)
+    num_nodes = relation.num_nodes
+    routers = {}
+    problems = []
+
+    for _ in range(samples):
+        node = rng.randrange(num_nodes)
+        dest = rng.randrange(num_nodes)
+        y, x = divmod(node, config.mesh_size_x)
+        dest_pos = (dest % config.mesh_size_x, dest // config.mesh_size_x)
+        key = rng.randrange(2) if config.routing_mode in (RoutingMode.ODD_EVEN, RoutingMode.O1TURN) else 0
+
+        # 奇偶模型: key=0表示仍在源列
+        source = (x, y)
+        if config.routing_mode == RoutingMode.ODD_EVEN and key == 1:
+            candidates = [sx for sx in range(config.mesh_size_x)
+                          if sx != x and (sx < x) == (dest_pos[0] > x) and sx != dest_pos[0]]
+            if not candidates:
+                continue
+            source = (rng.choice(candidates), y)
+        packet = Packet(source=source, destination=dest_pos, data="verify", packet_id=0)
+        packet.yx_order = bool(key) if config.routing_mode == RoutingMode.O1TURN else None
+        packet.intermediate = dest_pos
+        packet.phase = 1
+        target = dest
+        if config.routing_mode in TWO_PHASE_ROUTING_MODES and rng.random() < 0.5:
+            # 阶段0: 以尚未到达的中间节点为路由终点
+            target = rng.randrange(num_nodes - 1)
+            target += target >= node
+            packet.intermediate = (target % config.mesh_size_x, target // config.mesh_size_x)
+            packet.phase = 0
+
+        if node not in routers:
+            routers[node] = MultiTopologyRouter(node, (x, y), config)
+        expected = {direction for direction, mask in relation.masks(node, key) if (mask >> target) & 1}
+        if config.routing_mode in (RoutingMode.WEST_FIRST, RoutingMode.ODD_EVEN, RoutingMode.MIN_ADAPTIVE):
+            actual = set(routers[node].candidate_directions(packet))
+        else:
+            actual = {routers[node].route_packet(packet)}
+
+        exact = config.tie_break == TieBreak.DIRECT or not relation.torus
+        if (exact and actual != expected) or not actual <= expected:
+            problems.append(f"节点({x},{y}) -> {dest_pos} 状态{key} 阶段{packet.phase}: "
+                            f"路由器 {sorted(d.value for d in actual)}, 分析器 {sorted(d.value for d in expected)}")
+    return problems
+
+
+def print_report(report: CDGReport):
+    """打印通道依赖分析报告"""
+    status = "✅ 无环 (无死锁)" if report.deadlock_free else f"❌ {report.cyclic_components} 个循环分量"
+    if report.escape_subnetwork:
+        status += " [逃逸子网络]"
+    if report.conservative:
+        status += " [保守近似]" if report.deadlock_free else " [保守近似，循环可能不对应实际死锁]"
+    print(f"  {report.topology.upper()} {report.shape} {report.routing_mode:>13} "
+          f"(平局 {report.tie_break}, {report.virtual_channels}VC): {status}, "
+          f"通道 {report.num_channels}, 依赖 {report.num_edges}, "
+          f"构建 {report.build_seconds:.2f}s, 分析 {report.analysis_seconds:.2f}s")
+    if not report.deadlock_free:
+        print(f"      最大分量 {report.largest_component} 个通道, 最短循环 ({len(report.shortest_cycle)} 个通道):")
+        print("      " + " -> ".join(report.shortest_cycle[:12]) + (" -> ..." if len(report.shortest_cycle) > 12 else ""))
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="通道依赖图死锁分析")
+    parser.add_argument("--shape", default="8x8", help="网格大小，如 8x8")
+    parser.add_argument("--topology", choices=["mesh", "torus"], default="torus", help="拓扑类型")
+    parser.add_argument("--routing", default="all",
+                        help=f"路由模式 ({', '.join(m.value for m in RoutingMode)}) 或 all")
+    parser.add_argument("--tie-break", choices=[t.value for t in TieBreak], default="direct",
+                        help="Torus平局方向选择策略")
+    parser.add_argument("--vcs", type=int, default=1, help="每端口虚拟通道数")
+    parser.add_argument("--verify", action="store_true", help="抽样对照 MultiTopologyRouter 检查路由关系")
+    args = parser.parse_args(argv)
+
+    size_x, size_y = (int(v) for v in args.shape.lower().split("x"))
+    topology_type = TopologyType(args.topology)
+    tie_break = TieBreak(args.tie_break)
+
+    print(f"\n=== 通道依赖图分析: {topology_type.value.upper()} {size_x}×{size_y}, {args.vcs}VC ===")
+    if args.routing == "all":
+        reports = analyze_all_routing_modes(topology_type, size_x, size_y, args.vcs, tie_break)
+    else:
+        config = TopoConfig(topology_type, mesh_size_x=size_x, mesh_size_y=size_y, total_nodes=size_x * size_y,
+                            routing_mode=RoutingMode(args.routing), tie_break=tie_break,
+                            virtual_channels=args.vcs)
+        reports = [analyze_channel_dependencies(config)]
+
+    for report in reports:
+        print_report(report)
+        if args.verify:
+            config = TopoConfig(topology_type, mesh_size_x=size_x, mesh_size_y=size_y,
+                                total_nodes=size_x * size_y, routing_mode=RoutingMode(report.routing_mode),
+                                tie_break=tie_break, virtual_channels=args.vcs)
+            problems = verify_routing_relation(config)
+            print(f"      路由关系抽样核对: {'一致' if not problems else f'{len(problems)} 处不一致'}")
+            for problem in problems[:5]:
+                print(f"        - {problem}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Logical Simulation Checkpoint
+
+逻辑仿真检查点的保存与恢复
+将HybridMirandaMesh的完整逻辑状态 (全部队列中的在途数据包、计数器、
+随机数生成器状态和时钟) 写成紧凑的二进制数组文件 (numpy .npz，不含pickle对象)，
+并恢复到新建的HybridMirandaMesh中，用于暂停/继续长时间运行，或从同一个
+已预热的网络分叉出多组实验
+
+文件内容:
+- meta: 配置和标量状态 (JSON编码为uint8数组)
+- 节点计数器、方向/类型流量、轮询指针、路由器随机数状态: 每节点一行
+- 运行种子 (派生尚未使用的随机数流) 和各节点流量/路由随机数流的当前状态
+- 在途数据包: 每包一行整数字段 + 时间戳，按 (节点, 队列, 端口, VC, 队列位置) 顺序
+- 延迟样本: 默认只保存每节点的延迟周期直方图 (节点, 周期数, 包数)，文件大小不随运行长度增长；
+  恢复后延迟样本为按周期数排序的同一多重集 (均值、分位数和总和不变)，墙钟延迟样本不保存。
+  latency_samples=True 时改为保存原始样本 (所有节点拼接为一个数组 + 偏移量)，保留接收顺序
+- 延迟分解: 跳数类别 × 分量的总和与直方图数组
+- 测量/采样结果对象不保存 (恢复后为None)，检查点应在run_measurement之外保存
+
+使用方法:
+    python checkpoint.py --verify --topology torus --shape 8x8 --routing valiant --load 0.3
+    python checkpoint.py --verify --latency-samples
+    python checkpoint.py --info run.ckpt
+"""
+
+# 标准库导入
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# 第三方库
+import numpy as np
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import (Direction, TopologyType, RoutingMode, AllocatorType, TopoConfig,
+                                 TrafficPattern, TrafficConfig, Packet, FlowStats, HybridMirandaMesh,
+                                 config_to_dict, config_from_dict)
+
+# 检查点格式版本
+CHECKPOINT_VERSION = 6
+
+# 方向和队列类型编码
+_DIRECTIONS = list(Direction)
+_DIRECTION_INDEX = {direction: index for index, direction in enumerate(_DIRECTIONS)}
+_QUEUE_INJECT, _QUEUE_INPUT, _QUEUE_OUTPUT = 0, 1, 2
+_TRAFFIC_TYPES = ("data", "memory_request")
+
+# 节点整数计数器 (按此顺序存为每节点一行)
+NODE_COUNTERS = (
+    "packets_sent", "packets_received", "packets_forwarded", "link_traversals",
+    "bytes_sent", "bytes_received", "bytes_forwarded",
+    "total_hop_count", "total_minimal_hops",
+    "switch_requests", "switch_grants", "total_switch_wait_cycles",
+    "measured_sent", "measured_received", "measured_hop_count",
+    "current_cycle",
+)
+
+# 数据包整数字段 (前4列为所在队列位置，None编码为-1)
+PACKET_COLUMNS = (
+    "node", "queue", "port", "slot",
+    "source_x", "source_y", "destination_x", "destination_y",
+    "packet_id", "hop_count", "memory_request", "size_bytes", "injection_cycle",
+    "escape", "intermediate_x", "intermediate_y", "phase", "yx_order",
+    "vc", "vc_dimension", "dateline_crossed", "arrival_cycle", "switch_wait_cycles",
+    "measured", "data",
+    "stage_cycle", "port_mark", "source_queueing_cycles", "pipeline_cycles", "link_cycles",
+    "serialization_cycles", "contention_cycles",
+)
+
+
+# =============================================================================
+# 编码辅助函数
+# =============================================================================
+
+def _json_array(value: Any) -> np.ndarray:
+    return np.frombuffer(json.dumps(value, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+
+
+def _json_value(array: np.ndarray) -> Any:
+    return json.loads(array.tobytes().decode("utf-8"))
+
+
+def _rng_state(rng: random.Random) -> Tuple[np.ndarray, float]:
+    _, internal, gauss_next = rng.getstate()
+    return np.array(internal, dtype=np.uint32), np.nan if gauss_next is None else gauss_next
+
+
+def _set_rng_state(rng: random.Random, internal: np.ndarray, gauss_next: float):
+    rng.setstate((3, tuple(internal.tolist()), None if np.isnan(gauss_next) else float(gauss_next)))
+
+
+def _packet_row(packet: Packet, location: Tuple[int, int, int, int], strings: Dict[str, int]) -> List[int]:
+    intermediate = packet.intermediate if packet.intermediate is not None else (-1, -1)
+    yx_order = -1 if packet.yx_order is None else int(packet.yx_order)
+    data = strings.setdefault(packet.data, len(strings))
+    return [*location,
+            *packet.source, *packet.destination,
+            packet.packet_id, packet.hop_count, int(packet.memory_request), packet.size_bytes,
+            packet.injection_cycle, int(packet.escape), *intermediate, packet.phase, yx_order,
+            packet.vc, packet.vc_dimension, int(packet.dateline_crossed), packet.arrival_cycle,
+            packet.switch_wait_cycles, int(packet.measured), data,
+            packet.stage_cycle, packet.port_mark, packet.source_queueing_cycles, packet.pipeline_cycles,
+            packet.link_cycles, packet.serialization_cycles, packet.contention_cycles]
+
+
+def _packet_from_row(row: List[int], times: List[float], strings: List[str]) -> Packet:
+    (_, _, _, _, src_x, src_y, dst_x, dst_y, packet_id, hop_count, memory_request, size_bytes,
+     injection_cycle, escape, inter_x, inter_y, phase, yx_order, vc, vc_dimension, dateline_crossed,
+     arrival_cycle, switch_wait_cycles, measured, data, stage_cycle, port_mark, source_queueing_cycles,
+     pipeline_cycles, link_cycles, serialization_cycles, contention_cycles) = row
+    return Packet(source=(src_x, src_y), destination=(dst_x, dst_y), data=strings[data], packet_id=packet_id,
+                  hop_count=hop_count, memory_request=bool(memory_request), size_bytes=size_bytes,
+                  timestamp=times[0], creation_time=times[1], injection_cycle=injection_cycle,
+                  escape=bool(escape), intermediate=None if inter_x < 0 else (inter_x, inter_y),
+                  phase=phase, yx_order=None if yx_order < 0 else bool(yx_order), vc=vc,
+                  vc_dimension=vc_dimension, dateline_crossed=bool(dateline_crossed),
+                  arrival_cycle=arrival_cycle, switch_wait_cycles=switch_wait_cycles, measured=bool(measured),
+                  stage_cycle=stage_cycle, port_mark=port_mark, source_queueing_cycles=source_queueing_cycles,
+                  pipeline_cycles=pipeline_cycles, link_cycles=link_cycles,
+                  serialization_cycles=serialization_cycles, contention_cycles=contention_cycles)
+
+
+def _node_queues(node) -> List[Tuple[Tuple[int, int, int], List[Packet]]]:
+    """节点上的全部队列及其位置编码 (队列类型, 端口, 虚拟通道)"""
+    queues = [((_QUEUE_INJECT, _DIRECTION_INDEX[Direction.LOCAL], 0), node.input_queue)]
+    for port, vc_queues in node.input_ports.items():
+        queues.extend(((_QUEUE_INPUT, _DIRECTION_INDEX[port], vc), queue) for vc, queue in enumerate(vc_queues))
+    for direction, vc_queues in node.output_queues.items():
+        queues.extend(((_QUEUE_OUTPUT, _DIRECTION_INDEX[direction], vc), queue)
+                      for vc, queue in enumerate(vc_queues))
+    return queues
+
+
+def _concatenate(lists: List[list], dtype) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(values) for values in lists])
+    values = np.fromiter((v for values in lists for v in values), dtype=dtype, count=int(offsets[-1]))
+    return values, offsets
+
+
+def _split(values: np.ndarray, offsets: np.ndarray) -> List[list]:
+    """按偏移量把_concatenate的结果拆回列表"""
+    return [values[start:end].tolist() for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _histogram(lists: List[List[int]]) -> np.ndarray:
+    """每个列表的取值直方图，每行 (列表序号, 取值, 次数)，按列表序号和取值排序"""
+    rows = []
+    for index, values in enumerate(lists):
+        if values:
+            keys, counts = np.unique(np.asarray(values, dtype=np.int64), return_counts=True)
+            rows.append(np.column_stack((np.full(len(keys), index, dtype=np.int64), keys, counts)))
+    return np.concatenate(rows) if rows else np.zeros((0, 3), dtype=np.int64)
+
+
+def _expand_histogram(rows: np.ndarray, count: int) -> List[List[int]]:
+    """由_histogram的结果还原count个按取值排序的列表"""
+    bounds = np.searchsorted(rows[:, 0], np.arange(count + 1))
+    return [np.repeat(rows[start:end, 1], rows[start:end, 2]).tolist()
+            for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+# =============================================================================
+# 保存与恢复
+# =============================================================================
+
+def mesh_metadata(mesh: HybridMirandaMesh, latency_samples: bool = False) -> Dict[str, Any]:
+    """重建网格所需的配置和标量状态"""
+    return {
+        "version": CHECKPOINT_VERSION,
+        "topology_type": mesh.topology_type.value,
+        "topology_config": config_to_dict(mesh.topology_config),
+        "traffic_config": config_to_dict(mesh.traffic_config) if mesh.traffic_config is not None else None,
+        "hardware": {
+            "cpu_clock": mesh.cpu_clock,
+            "cache_size": mesh.cache_size,
+            "memory_size": mesh.memory_size,
+            "link_bandwidth": mesh.link_bandwidth,
+            "link_latency": mesh.link_latency,
+        },
+        "statistics": {
+            "enable_sst_stats": mesh.enable_sst_stats,
+            "stats_profile": mesh.stats_profile.name,
+            "stats_rate": mesh.stats_rate,
+            "stats_format": mesh.stats_format,
+            "output_dir": mesh.output_dir,
+        },
+        "stall_limit": mesh.stall_limit,
+        "seed": mesh.seed,
+        "current_cycle": mesh.current_cycle,
+        "packet_counter": mesh.packet_counter,
+        "progress_count": mesh._progress_count,
+        "last_progress_cycle": mesh._last_progress_cycle,
+        "latency_samples": latency_samples,
+        "node_counters": list(NODE_COUNTERS),
+        "packet_columns": list(PACKET_COLUMNS),
+    }
+
+
+def save_checkpoint(mesh: HybridMirandaMesh, path: str, latency_samples: bool = False) -> int:
+    """
+    保存网格的完整逻辑状态
+
+    Args:
+        mesh: 要保存的网格 (应在run_measurement之外调用)
+        path: 输出文件路径
+        latency_samples: 保存原始延迟样本 (含墙钟延迟，文件大小随已接收包数增长)，
+                         默认只保存延迟周期直方图
+
+    Returns:
+        int: 写入的字节数
+    """
+    if mesh.phase is not None:
+        raise ValueError(f"测量阶段 {mesh.phase.value} 进行中，无法保存检查点")
+
+    nodes = list(mesh.nodes.values())
+    num_nodes = len(nodes)
+    strings: Dict[str, int] = {}
+    packet_rows: List[List[int]] = []
+    packet_times: List[Tuple[float, float]] = []
+
+    counters = np.zeros((num_nodes, len(NODE_COUNTERS)), dtype=np.int64)
+    traffic_by_direction = np.zeros((num_nodes, len(_DIRECTIONS), 2), dtype=np.int64)
+    traffic_by_type = np.zeros((num_nodes, len(_TRAFFIC_TYPES), 2), dtype=np.int64)
+    vc_round_robin = np.zeros((num_nodes, len(_DIRECTIONS)), dtype=np.int64)
+    port_sent = np.zeros((num_nodes, len(_DIRECTIONS)), dtype=np.int64)
+    tie_toggle = np.zeros((num_nodes, 2), dtype=np.int64)
+    allocator_pointers = np.zeros((num_nodes, 3, len(_DIRECTIONS)), dtype=np.int64)
+    router_rng = np.zeros((num_nodes, 625), dtype=np.uint32)
+    router_gauss = np.zeros(num_nodes, dtype=np.float64)
+
+    for index, node in enumerate(nodes):
+        counters[index] = [getattr(node, name) for name in NODE_COUNTERS]
+        for direction, traffic in node.traffic_by_direction.items():
+            traffic_by_direction[index, _DIRECTION_INDEX[direction]] = (traffic["packets"], traffic["bytes"])
+        for type_index, packet_type in enumerate(_TRAFFIC_TYPES):
+            traffic = node.traffic_by_type[packet_type]
+            traffic_by_type[index, type_index] = (traffic["packets"], traffic["bytes"])
+        for direction, pointer in node._vc_round_robin.items():
+            vc_round_robin[index, _DIRECTION_INDEX[direction]] = pointer
+        for direction, sent in node.port_sent.items():
+            port_sent[index, _DIRECTION_INDEX[direction]] = sent
+        tie_toggle[index] = node.logical_router._tie_toggle
+        allocator = node.switch_allocator
+        if allocator is not None:
+            for row, pointers in enumerate((allocator.vc_pointer, allocator.grant_pointer, allocator.accept_pointer)):
+                for port, pointer in pointers.items():
+                    allocator_pointers[index, row, _DIRECTION_INDEX[port]] = pointer
+        router_rng[index], router_gauss[index] = _rng_state(node.logical_router.rng)
+
+        for (queue_type, port, slot), queue in _node_queues(node):
+            for packet in queue:
+                packet_rows.append(_packet_row(packet, (index, queue_type, port, slot), strings))
+                packet_times.append((packet.timestamp, packet.creation_time))
+
+    flow_rows = [[index, source, flow.packets, flow.bytes, flow.total_latency_cycles, flow.total_hop_count,
+                  flow.max_latency_cycles]
+                 for index, node in enumerate(nodes) for source, flow in node.flow_stats.items()]
+    sketch_rows = [[index, source, key, count] for index, node in enumerate(nodes)
+                   for source, flow in node.flow_stats.items() for key, count in flow.sketch.items()]
+
+    arrays = {
+        "meta": _json_array(mesh_metadata(mesh, latency_samples)),
+        "strings": _json_array(list(strings)),
+        "node_counters": counters,
+        "traffic_by_direction": traffic_by_direction,
+        "traffic_by_type": traffic_by_type,
+        "vc_round_robin": vc_round_robin,
+        "port_sent": port_sent,
+        "tie_toggle": tie_toggle,
+        "allocator_pointers": allocator_pointers,
+        "router_rng": router_rng,
+        "router_gauss": router_gauss,
+        "packets": np.array(packet_rows, dtype=np.int64).reshape(-1, len(PACKET_COLUMNS)),
+        "packet_times": np.array(packet_times, dtype=np.float64).reshape(-1, 2),
+        "flows": np.array(flow_rows, dtype=np.int64).reshape(-1, 7),
+        "flow_sketches": np.array(sketch_rows, dtype=np.int64).reshape(-1, 4),
+        "breakdown_measured_only": np.array([mesh.latency_breakdown.measured_only]),
+        "breakdown_packets": np.array(mesh.latency_breakdown.packets, dtype=np.int64),
+        "breakdown_totals": np.array(mesh.latency_breakdown.total_cycles, dtype=np.int64),
+        "breakdown_histograms": np.array(mesh.latency_breakdown.histograms, dtype=np.int64),
+    }
+    if latency_samples:
+        arrays["latency_cycles"], arrays["latency_offsets"] = _concatenate(
+            [node.packet_latency_cycles for node in nodes], np.int64)
+        arrays["latency_seconds"], _ = _concatenate([node.packet_latencies for node in nodes], np.float64)
+        arrays["measured_latency_cycles"], arrays["measured_offsets"] = _concatenate(
+            [node.measured_latency_cycles for node in nodes], np.int64)
+    else:
+        arrays["latency_histogram"] = _histogram([node.packet_latency_cycles for node in nodes])
+        arrays["measured_latency_histogram"] = _histogram([node.measured_latency_cycles for node in nodes])
+    generator = mesh.traffic_generator
+    if generator is not None:
+        arrays["generator_rng"], gauss = _rng_state(generator.rng)
+        arrays["generator_gauss"] = np.array([gauss])
+        if generator.node_rngs is not None:
+            states = [_rng_state(rng) for rng in generator.node_rngs]
+            arrays["generator_node_rng"] = np.array([state for state, _ in states], dtype=np.uint32)
+            arrays["generator_node_gauss"] = np.array([gauss for _, gauss in states], dtype=np.float64)
+        injected = np.full(num_nodes, -1, dtype=np.int64)
+        for node_id, count in generator.injected.items():
+            injected[node_id] = count
+        arrays["generator_injected"] = injected
+
+    with open(path, "wb") as handle:
+        np.savez_compressed(handle, **arrays)
+    return os.path.getsize(path)
+
+
+def read_metadata(path: str) -> Dict[str, Any]:
+    """只读取检查点的配置和标量状态"""
+    with np.load(path, allow_pickle=False) as data:
+        return _json_value(data["meta"])
+
+
+def restore_checkpoint(mesh: HybridMirandaMesh, path: str) -> HybridMirandaMesh:
+    """
+    将检查点恢复到配置相同的网格中 (覆盖其全部逻辑状态)
+
+    恢复开销与节点数和在途数据包数成正比；延迟样本 (或直方图) 整块读取后转换为列表
+
+    Raises:
+        ValueError: 检查点版本或拓扑配置与网格不一致
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+
+    meta = _json_value(arrays["meta"])
+    if meta["version"] != CHECKPOINT_VERSION:
+        raise ValueError(f"不支持的检查点版本: {meta['version']} (当前 {CHECKPOINT_VERSION})")
+    if meta["topology_config"] != config_to_dict(mesh.topology_config):
+        raise ValueError("检查点的拓扑配置与目标网格不一致")
+    if (meta["traffic_config"] is None) != (mesh.traffic_generator is None):
+        raise ValueError("检查点与目标网格的合成流量配置不一致")
+    if meta["node_counters"] != list(NODE_COUNTERS) or meta["packet_columns"] != list(PACKET_COLUMNS):
+        raise ValueError("检查点字段布局与当前版本不一致")
+
+    mesh.current_cycle = meta["current_cycle"]
+    mesh.packet_counter = meta["packet_counter"]
+    mesh.stall_limit = meta["stall_limit"]
+    mesh._progress_count = meta["progress_count"]
+    mesh._last_progress_cycle = meta["last_progress_cycle"]
+    mesh.seed = meta["seed"]
+    mesh.phase = None
+    mesh.measurement = None
+    mesh.sampling = None
+
+    nodes = list(mesh.nodes.values())
+    if meta["latency_samples"]:
+        latency_cycles = _split(arrays["latency_cycles"], arrays["latency_offsets"])
+        latency_seconds = _split(arrays["latency_seconds"], arrays["latency_offsets"])
+        measured_latency = _split(arrays["measured_latency_cycles"], arrays["measured_offsets"])
+    else:
+        latency_cycles = _expand_histogram(arrays["latency_histogram"], len(nodes))
+        latency_seconds = [[] for _ in nodes]
+        measured_latency = _expand_histogram(arrays["measured_latency_histogram"], len(nodes))
+    for index, node in enumerate(nodes):
+        for name, value in zip(NODE_COUNTERS, arrays["node_counters"][index].tolist()):
+            setattr(node, name, value)
+        node.measuring = False
+        for direction in _DIRECTIONS:
+            packets, size = arrays["traffic_by_direction"][index, _DIRECTION_INDEX[direction]].tolist()
+            node.traffic_by_direction[direction] = {"packets": packets, "bytes": size}
+        for type_index, packet_type in enumerate(_TRAFFIC_TYPES):
+            packets, size = arrays["traffic_by_type"][index, type_index].tolist()
+            node.traffic_by_type[packet_type] = {"packets": packets, "bytes": size}
+        for direction in _DIRECTIONS:
+            node._vc_round_robin[direction] = int(arrays["vc_round_robin"][index, _DIRECTION_INDEX[direction]])
+            node.port_sent[direction] = int(arrays["port_sent"][index, _DIRECTION_INDEX[direction]])
+        node.logical_router._tie_toggle = arrays["tie_toggle"][index].tolist()
+        allocator = node.switch_allocator
+        if allocator is not None:
+            for row, pointers in enumerate((allocator.vc_pointer, allocator.grant_pointer, allocator.accept_pointer)):
+                for port in pointers:
+                    pointers[port] = int(arrays["allocator_pointers"][index, row, _DIRECTION_INDEX[port]])
+        _set_rng_state(node.logical_router.rng, arrays["router_rng"][index], arrays["router_gauss"][index])
+
+        node.packet_latency_cycles = latency_cycles[index]
+        node.packet_latencies = latency_seconds[index]
+        node.measured_latency_cycles = measured_latency[index]
+        node.flow_stats = {}
+        for _, queue in _node_queues(node):
+            queue.clear()
+    for node_index, source, packets, size, latency, hops, max_latency in arrays["flows"].tolist():
+        nodes[node_index].flow_stats[source] = FlowStats(packets, size, latency, hops, max_latency)
+    for node_index, source, key, count in arrays["flow_sketches"].tolist():
+        nodes[node_index].flow_stats[source].sketch[key] = count
+    breakdown = mesh.latency_breakdown
+    breakdown.measured_only = bool(arrays["breakdown_measured_only"][0])
+    breakdown.packets = arrays["breakdown_packets"].tolist()
+    breakdown.total_cycles = arrays["breakdown_totals"].tolist()
+    breakdown.histograms = arrays["breakdown_histograms"].tolist()
+
+    strings = _json_value(arrays["strings"])
+    for row, times in zip(arrays["packets"].tolist(), arrays["packet_times"].tolist()):
+        node_index, queue_type, port, slot = row[:4]
+        node = nodes[node_index]
+        direction = _DIRECTIONS[port]
+        if queue_type == _QUEUE_INJECT:
+            queue = node.input_queue
+        elif queue_type == _QUEUE_INPUT:
+            queue = node.input_ports[direction][slot]
+        else:
+            queue = node.output_queues[direction][slot]
+        queue.append(_packet_from_row(row, times, strings))
+
+    generator = mesh.traffic_generator
+    if generator is not None:
+        _set_rng_state(generator.rng, arrays["generator_rng"], arrays["generator_gauss"][0])
+        if ("generator_node_rng" in arrays) != (generator.node_rngs is not None):
+            raise ValueError("检查点与目标网格的流量随机数流划分不一致")
+        for node_id, rng in enumerate(generator.node_rngs or []):
+            _set_rng_state(rng, arrays["generator_node_rng"][node_id], arrays["generator_node_gauss"][node_id])
+        generator.injected = {node_id: count for node_id, count in enumerate(arrays["generator_injected"].tolist())
+                              if count >= 0}
+    if mesh.occupancy_monitor is not None:
+        mesh.occupancy_monitor.resync(nodes, mesh.current_cycle)
+    return mesh
+
+
+def load_checkpoint(path: str, verbose: bool = False, enable_sst_stats: Optional[bool] = None) -> HybridMirandaMesh:
+    """
+    按检查点中的配置新建网格并恢复状态
+
+    Args:
+        path: 检查点文件路径
+        verbose: 新网格是否输出详细日志
+        enable_sst_stats: 覆盖检查点中的SST统计开关，None时沿用
+    """
+    meta = read_metadata(path)
+    statistics = meta["statistics"]
+    traffic = meta["traffic_config"]
+    mesh = HybridMirandaMesh(
+        topology_type=TopologyType(meta["topology_type"]),
+        topology_config=config_from_dict(TopoConfig, meta["topology_config"]),
+        **meta["hardware"],
+        enable_sst_stats=statistics["enable_sst_stats"] if enable_sst_stats is None else enable_sst_stats,
+        stats_profile=statistics["stats_profile"],
+        stats_rate=statistics["stats_rate"],
+        stats_format=statistics["stats_format"],
+        traffic_config=config_from_dict(TrafficConfig, traffic) if traffic is not None else None,
+        output_dir=statistics["output_dir"],
+        stall_limit=meta["stall_limit"],
+        seed=meta["seed"],
+        verbose=verbose,
+    )
+    return restore_checkpoint(mesh, path)
+
+
+# =============================================================================
+# 分叉一致性验证
+# =============================================================================
+
+def state_fingerprint(mesh: HybridMirandaMesh) -> Dict[str, Any]:
+    """按周期计的逻辑状态摘要 (不含墙钟时间戳)，用于比较两次运行是否一致"""
+    return {
+        "cycle": mesh.current_cycle,
+        "packet_counter": mesh.packet_counter,
+        "counters": [[getattr(node, name) for name in NODE_COUNTERS] for node in mesh.nodes.values()],
+        "latency_cycles": [sorted(node.packet_latency_cycles) for node in mesh.nodes.values()],
+        "flows": [sorted(node.flow_stats.items()) for node in mesh.nodes.values()],
+        "latency_breakdown": [mesh.latency_breakdown.packets, mesh.latency_breakdown.total_cycles],
+        "queues": [[[packet.packet_id for packet in queue] for _, queue in _node_queues(node)]
+                   for node in mesh.nodes.values()],
+    }
+
+
+def verify_fork(config: TopoConfig, traffic: TrafficConfig, warmup_cycles: int = 200,
+                continue_cycles: int = 200, latency_samples: bool = False) -> List[str]:
+    """
+    检查从检查点分叉的运行与原运行继续的结果是否一致
+
+    延迟样本按多重集比较 (默认的直方图检查点不保留接收顺序)
+
+    Returns:
+        List[str]: 不一致的状态项
+    """
+    original = HybridMirandaMesh(topology_type=config.topology_type, topology_config=config,
+                                 enable_sst_stats=False, traffic_config=traffic, verbose=False)
+    for _ in range(warmup_cycles):
+        original.simulate_step()
+
+    handle, path = tempfile.mkstemp(suffix=".ckpt")
+    os.close(handle)
+    try:
+        save_checkpoint(original, path, latency_samples)
+        forked = load_checkpoint(path)
+    finally:
+        os.remove(path)
+
+    for mesh in (original, forked):
+        for _ in range(continue_cycles):
+            mesh.simulate_step()
+
+    expected, actual = state_fingerprint(original), state_fingerprint(forked)
+    return [f"{key} 不一致" for key in expected if expected[key] != actual[key]]
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="逻辑仿真检查点")
+    parser.add_argument("--info", metavar="PATH", help="显示检查点的配置和在途状态")
+    parser.add_argument("--verify", action="store_true", help="验证从检查点分叉与继续原运行结果一致")
+    parser.add_argument("--shape", default="8x8", help="网格大小，如 8x8")
+    parser.add_argument("--topology", choices=["mesh", "torus"], default="mesh", help="拓扑类型")
+    parser.add_argument("--routing", choices=[m.value for m in RoutingMode], default="dor", help="路由模式")
+    parser.add_argument("--vcs", type=int, default=2, help="每端口虚拟通道数")
+    parser.add_argument("--buffer-depth", type=int, default=4, help="每虚拟通道缓冲深度")
+    parser.add_argument("--allocator", choices=[a.value for a in AllocatorType], default="ideal",
+                        help="交换分配器模型")
+    parser.add_argument("--load", type=float, default=0.3, help="均匀流量注入率")
+    parser.add_argument("--cycles", type=int, default=300, help="检查点之前/之后各运行的周期数")
+    parser.add_argument("--latency-samples", action="store_true",
+                        help="验证时检查点保存原始延迟样本而不是延迟直方图")
+    args = parser.parse_args(argv)
+
+    if args.info:
+        with np.load(args.info, allow_pickle=False) as data:
+            meta = _json_value(data["meta"])
+            in_flight = len(data["packets"])
+            if meta["latency_samples"]:
+                samples = len(data["latency_cycles"])
+            else:
+                samples = int(data["latency_histogram"][:, 2].sum())
+        config = meta["topology_config"]
+        print(f"\n=== 检查点 {args.info} ({os.path.getsize(args.info):,} 字节) ===")
+        print(f"  拓扑: {meta['topology_type']} {config['mesh_size_x']}×{config['mesh_size_y']}, "
+              f"路由 {config['routing_mode']}, {config['virtual_channels']}VC")
+        print(f"  周期: {meta['current_cycle']:,}, 已发送 {meta['packet_counter']:,} 包, "
+              f"在途 {in_flight:,} 包, 延迟样本 {samples:,} 个{'' if meta['latency_samples'] else ' (直方图)'}")
+        return
+
+    if args.verify:
+        size_x, size_y = (int(v) for v in args.shape.lower().split("x"))
+        config = TopoConfig(TopologyType(args.topology), mesh_size_x=size_x, mesh_size_y=size_y,
+                            total_nodes=size_x * size_y, routing_mode=RoutingMode(args.routing),
+                            virtual_channels=args.vcs, buffer_depth=args.buffer_depth,
+                            switch_allocator=AllocatorType(args.allocator))
+        traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=args.load, packets_per_node=0)
+        start = time.time()
+        problems = verify_fork(config, traffic, args.cycles, args.cycles, args.latency_samples)
+        print(f"\n=== 检查点分叉验证: {args.topology.upper()} {size_x}×{size_y}, {args.routing}, "
+              f"{args.allocator} ({time.time() - start:.2f}s) ===")
+        print(f"  {'✅ 分叉运行与原运行一致' if not problems else '❌ ' + ', '.join(problems)}")
+        return
+
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
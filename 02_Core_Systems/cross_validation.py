@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Cross Validation Harness
+
+逻辑引擎与SST merlin仿真结果的交叉验证工具
+用相同的拓扑和流量分别运行Python逻辑引擎 (MultiTopologyRouter) 和SST
+(或读取已记录的SST统计结果)，逐链路对比包数、跳数和延迟分布，
+输出差异指标，用于判断逻辑引擎在哪些配置下可以代替SST做大范围扫描
+
+对比内容:
+- 每条有向链路的包数 (逻辑引擎方向流量 vs hr_router端口 send_packet_count)
+- 每节点弹出包数 (逻辑引擎接收包数 vs hr_router本地端口)
+- 平均跳数 (逻辑引擎逐包跳数 vs SST非本地端口发送总数/弹出总数)
+- 延迟分布 (逻辑引擎周期数 vs linkcontrol packet_latency，按比例尺度对比)
+
+使用方法:
+    python cross_validation.py --shape 4x4 --topology mesh --sst-csv statistics_output/sst_mesh_minimal_stats.csv
+"""
+
+# 标准库导入
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional, Tuple
+
+# 第三方库
+import numpy as np
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import (HybridMirandaMesh, TopologyType, TopoConfig, Direction,
+                                 TrafficConfig, TrafficPattern)
+from sst_stats_parser import PORT_DIRECTIONS, LOCAL_PORT, SSTStatistics, load_sst_statistics
+
+# 端口顺序与SST hr_router一致: 东西南北
+LINK_DIRECTIONS: Tuple[Direction, ...] = tuple(Direction(name) for name in PORT_DIRECTIONS[:LOCAL_PORT])
+
+
+# =============================================================================
+# 结果数据结构
+# =============================================================================
+
+@dataclass
+class EngineResult:
+    """
+    单个后端的归一化结果
+
+    所有数组按节点ID索引，链路数组按 (节点, 端口方向) 索引
+    """
+    backend: str                         # 后端名称 ("logical" / "sst")
+    link_packets: np.ndarray             # (节点数, 4) 每条有向链路的包数
+    ejected_packets: np.ndarray          # (节点数,) 每节点弹出的包数
+    mean_hops: float                     # 平均跳数
+    latency_mean: np.ndarray             # (节点数,) 每个目标节点的平均延迟，无数据为NaN
+    latency_count: np.ndarray            # (节点数,) 每个目标节点的延迟样本数
+    latency_overall: Dict[str, float]    # 总体延迟分布 (mean/std/min/max)
+    latency_unit: str                    # 延迟单位 ("cycles" / SST时间单位)
+
+
+@dataclass
+class CrossValidationReport:
+    """交叉验证差异指标"""
+    shape: str
+    topology: str
+    total_packets: Dict[str, int]
+    link_correlation: float              # 每链路包数的Pearson相关系数
+    link_l1_distance: float              # 归一化链路负载分布的L1距离 (0~2)
+    link_max_abs_error: int              # 单条链路最大包数差
+    link_mean_rel_error: float           # 有流量链路的平均相对误差
+    worst_links: List[Dict]              # 差异最大的链路
+    ejection_max_abs_error: int          # 节点弹出包数最大差
+    mean_hops: Dict[str, float]
+    hop_rel_error: float
+    latency: Dict[str, Dict[str, float]]
+    latency_scale: float                 # SST延迟/逻辑延迟 (每周期对应的SST时间)
+    latency_cv_diff: float               # 变异系数差 (分布形状差异，与单位无关)
+    latency_node_correlation: float      # 每目标节点平均延迟的相关系数
+    agrees: bool = False                 # 是否在容差范围内一致
+    notes: List[str] = field(default_factory=list)
+
+
+# =============================================================================
+# 逻辑引擎后端
+# =============================================================================
+
+def uniform_random_messages(num_nodes: int, messages_per_node: int, size_bytes: int = 64,
+                            seed: int = 1) -> List[Tuple[int, int, int]]:
+    """
+    生成均匀随机流量 (src, dst, 字节数) 列表
+
+    Args:
+        num_nodes: 节点数
+        messages_per_node: 每个节点发送的消息数
+        size_bytes: 消息大小
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    messages = []
+    for src in range(num_nodes):
+        for _ in range(messages_per_node):
+            dst = rng.randrange(num_nodes - 1)
+            messages.append((src, dst if dst < src else dst + 1, size_bytes))
+    return messages
+
+
+def run_logical(topology_config: TopoConfig, messages: Optional[List[Tuple[int, int, int]]] = None,
+                traffic_config: Optional[TrafficConfig] = None,
+                max_steps: int = 100000) -> HybridMirandaMesh:
+    """
+    在逻辑引擎中运行给定流量直到全部送达
+
+    Args:
+        topology_config: 拓扑配置
+        messages: (src, dst, 字节数) 列表
+        traffic_config: 合成流量配置 (与SST端点参数同源，需设置packets_per_node)
+        max_steps: 最大仿真周期数
+
+    Returns:
+        HybridMirandaMesh: 运行完成的网格实例
+    """
+    if traffic_config is not None and traffic_config.packets_per_node <= 0:
+        raise ValueError("交叉验证需要有限的流量: 请设置 packets_per_node > 0")
+
+    mesh = HybridMirandaMesh(
+        topology_type=topology_config.topology_type,
+        topology_config=topology_config,
+        enable_sst_stats=False,
+        traffic_config=traffic_config,
+        verbose=False,
+    )
+    for src, dst, size_bytes in messages or []:
+        mesh.send_message(src, dst, f"xval {src}->{dst}", size_bytes=size_bytes)
+
+    def traffic_pending() -> bool:
+        if traffic_config is None:
+            return False
+        generator = mesh.traffic_generator
+        return any(generator.injected.get(node_id, 0) < traffic_config.packets_per_node
+                   for node_id in mesh.nodes
+                   if not generator.is_permutation() or generator.fixed_destination(node_id) is not None)
+
+    while ((mesh.packets_in_flight() > 0 or traffic_pending())
+           and mesh.current_cycle < max_steps):
+        mesh.simulate_step()
+    return mesh
+
+
+def _latency_summary(samples: np.ndarray) -> Dict[str, float]:
+    """延迟样本汇总"""
+    if samples.size == 0:
+        return {"mean": math.nan, "std": math.nan, "min": math.nan, "max": math.nan, "count": 0}
+    return {
+        "mean": float(samples.mean()),
+        "std": float(samples.std()),
+        "min": float(samples.min()),
+        "max": float(samples.max()),
+        "count": int(samples.size),
+    }
+
+
+def logical_result(mesh: HybridMirandaMesh) -> EngineResult:
+    """从逻辑引擎的节点计数器提取归一化结果"""
+    num_nodes = len(mesh.nodes)
+    link_packets = np.zeros((num_nodes, len(LINK_DIRECTIONS)), dtype=np.int64)
+    ejected = np.zeros(num_nodes, dtype=np.int64)
+    latency_mean = np.full(num_nodes, np.nan)
+    latency_count = np.zeros(num_nodes, dtype=np.int64)
+    total_hops = 0
+    samples = []
+
+    for node_id, node in mesh.nodes.items():
+        for port, direction in enumerate(LINK_DIRECTIONS):
+            link_packets[node_id, port] = node.traffic_by_direction[direction]["packets"]
+        ejected[node_id] = node.packets_received
+        total_hops += node.total_hop_count
+        if node.packet_latency_cycles:
+            latency_mean[node_id] = np.mean(node.packet_latency_cycles)
+            latency_count[node_id] = len(node.packet_latency_cycles)
+            samples.extend(node.packet_latency_cycles)
+
+    total_ejected = int(ejected.sum())
+    return EngineResult(
+        backend="logical",
+        link_packets=link_packets,
+        ejected_packets=ejected,
+        mean_hops=total_hops / total_ejected if total_ejected else 0.0,
+        latency_mean=latency_mean,
+        latency_count=latency_count,
+        latency_overall=_latency_summary(np.asarray(samples, dtype=float)),
+        latency_unit="cycles",
+    )
+
+
+# =============================================================================
+# SST后端
+# =============================================================================
+
+def sst_result(stats: SSTStatistics) -> EngineResult:
+    """从解析后的SST统计提取归一化结果"""
+    packets = stats.port_packets()
+    link_packets = packets[:, :LOCAL_PORT].astype(np.int64)
+    ejected = packets[:, LOCAL_PORT].astype(np.int64)
+    total_ejected = int(ejected.sum())
+
+    latency_sum = stats.endpoint_values("packet_latency", "sum")
+    latency_sumsq = stats.endpoint_values("packet_latency", "sumsq")
+    latency_count = stats.endpoint_values("packet_latency", "count").astype(np.int64)
+    latency_min = stats.endpoint_values("packet_latency", "min")
+    latency_max = stats.endpoint_values("packet_latency", "max")
+
+    count = int(latency_count.sum())
+    if count > 0:
+        mean = float(latency_sum.sum() / count)
+        variance = max(float(latency_sumsq.sum() / count) - mean * mean, 0.0)
+        has_data = latency_count > 0
+        overall = {
+            "mean": mean,
+            "std": math.sqrt(variance),
+            "min": float(latency_min[has_data].min()),
+            "max": float(latency_max[has_data].max()),
+            "count": count,
+        }
+    else:
+        overall = _latency_summary(np.empty(0))
+
+    return EngineResult(
+        backend="sst",
+        link_packets=link_packets,
+        ejected_packets=ejected,
+        mean_hops=float(link_packets.sum() / total_ejected) if total_ejected else 0.0,
+        latency_mean=stats.mean_packet_latency(),
+        latency_count=latency_count,
+        latency_overall=overall,
+        latency_unit="sst_time",
+    )
+
+
+def run_sst(script: str, model_options: str = "", timeout: Optional[int] = None,
+            sst_executable: str = "sst") -> None:
+    """
+    运行SST仿真 (需要SST-Core)
+
+    Args:
+        script: SST Python配置脚本
+        model_options: 传给 --model-options 的参数
+        timeout: 超时秒数
+        sst_executable: sst可执行文件
+    """
+    if shutil.which(sst_executable) is None:
+        raise RuntimeError(f"未找到SST可执行文件 '{sst_executable}'，请改用 --sst-csv 指定已记录的结果")
+    command = [sst_executable]
+    if model_options:
+        command.append(f"--model-options={model_options}")
+    command.append(script)
+    subprocess.run(command, check=True, timeout=timeout)
+
+
+# =============================================================================
+# 差异指标
+# =============================================================================
+
+def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Pearson相关系数，常数序列返回NaN"""
+    if a.size < 2 or np.std(a) == 0 or np.std(b) == 0:
+        return math.nan
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def compare_results(logical: EngineResult, reference: EngineResult, mesh_size_x: int, mesh_size_y: int,
+                    topology: str = "mesh", link_tolerance: float = 0.05, hop_tolerance: float = 0.05,
+                    top: int = 10) -> CrossValidationReport:
+    """
+    计算逻辑引擎与SST结果的差异指标
+
+    Args:
+        logical: 逻辑引擎结果
+        reference: SST结果
+        mesh_size_x: X方向网格大小
+        mesh_size_y: Y方向网格大小
+        topology: 拓扑名称
+        link_tolerance: 链路负载分布L1距离容差
+        hop_tolerance: 平均跳数相对误差容差
+        top: 列出的差异最大链路数量
+
+    Returns:
+        CrossValidationReport: 差异报告
+    """
+    notes = []
+    a = logical.link_packets.astype(float).ravel()
+    b = reference.link_packets.astype(float).ravel()
+
+    total_a, total_b = a.sum(), b.sum()
+    share_a = a / total_a if total_a else a
+    share_b = b / total_b if total_b else b
+    l1_distance = float(np.abs(share_a - share_b).sum())
+
+    diff = a - b
+    active = (a > 0) | (b > 0)
+    rel_error = np.abs(diff[active]) / np.maximum(b[active], 1)
+
+    worst_links = []
+    for index in np.argsort(-np.abs(diff), kind="stable")[:top]:
+        if diff[index] == 0:
+            break
+        node_id, port = divmod(int(index), len(LINK_DIRECTIONS))
+        worst_links.append({
+            "node": [node_id % mesh_size_x, node_id // mesh_size_x],
+            "direction": LINK_DIRECTIONS[port].value,
+            logical.backend: int(a[index]),
+            reference.backend: int(b[index]),
+        })
+
+    ejected_total_a = int(logical.ejected_packets.sum())
+    ejected_total_b = int(reference.ejected_packets.sum())
+    if ejected_total_a != ejected_total_b:
+        notes.append(f"两个后端送达的包数不同 ({ejected_total_a} vs {ejected_total_b})，流量可能不一致")
+
+    hop_rel_error = (abs(logical.mean_hops - reference.mean_hops) / reference.mean_hops
+                     if reference.mean_hops else math.nan)
+
+    mean_a = logical.latency_overall["mean"]
+    mean_b = reference.latency_overall["mean"]
+    latency_scale = mean_b / mean_a if mean_a and not math.isnan(mean_a) else math.nan
+    cv_a = logical.latency_overall["std"] / mean_a if mean_a else math.nan
+    cv_b = reference.latency_overall["std"] / mean_b if mean_b else math.nan
+
+    both = ~np.isnan(logical.latency_mean) & ~np.isnan(reference.latency_mean)
+    latency_node_correlation = _correlation(logical.latency_mean[both], reference.latency_mean[both])
+
+    agrees = l1_distance <= link_tolerance and (math.isnan(hop_rel_error) or hop_rel_error <= hop_tolerance)
+    if not agrees:
+        notes.append(f"超出容差: 链路L1距离 {l1_distance:.4f} (容差 {link_tolerance})，"
+                     f"跳数相对误差 {hop_rel_error:.4f} (容差 {hop_tolerance})")
+
+    return CrossValidationReport(
+        shape=f"{mesh_size_x}x{mesh_size_y}",
+        topology=topology,
+        total_packets={logical.backend: ejected_total_a, reference.backend: ejected_total_b},
+        link_correlation=_correlation(a, b),
+        link_l1_distance=l1_distance,
+        link_max_abs_error=int(np.abs(diff).max()) if diff.size else 0,
+        link_mean_rel_error=float(rel_error.mean()) if rel_error.size else 0.0,
+        worst_links=worst_links,
+        ejection_max_abs_error=int(np.abs(logical.ejected_packets - reference.ejected_packets).max()),
+        mean_hops={logical.backend: logical.mean_hops, reference.backend: reference.mean_hops},
+        hop_rel_error=hop_rel_error,
+        latency={
+            f"{logical.backend} ({logical.latency_unit})": logical.latency_overall,
+            f"{reference.backend} ({reference.latency_unit})": reference.latency_overall,
+        },
+        latency_scale=latency_scale,
+        latency_cv_diff=cv_a - cv_b,
+        latency_node_correlation=latency_node_correlation,
+        agrees=agrees,
+        notes=notes,
+    )
+
+
+def print_report(report: CrossValidationReport):
+    """打印交叉验证报告"""
+    print("\n=== 逻辑引擎 vs SST 交叉验证报告 ===")
+    print(f"拓扑: {report.topology.upper()} {report.shape}")
+    print(f"送达包数: {report.total_packets}")
+
+    print(f"\n🔗 链路包数对比:")
+    print(f"   相关系数: {report.link_correlation:.4f}")
+    print(f"   负载分布L1距离: {report.link_l1_distance:.4f}")
+    print(f"   最大链路包数差: {report.link_max_abs_error}")
+    print(f"   平均相对误差: {report.link_mean_rel_error*100:.2f}%")
+    if report.worst_links:
+        print("   差异最大的链路:")
+        for link in report.worst_links:
+            print(f"     {tuple(link['node'])} {link['direction']:>5}: {link}")
+
+    print(f"\n🧭 跳数对比: {report.mean_hops} (相对误差 {report.hop_rel_error*100:.2f}%)")
+
+    print(f"\n⏱️  延迟分布对比:")
+    for backend, summary in report.latency.items():
+        print(f"   {backend}: 平均 {summary['mean']:.3f}, 标准差 {summary['std']:.3f}, "
+              f"最小 {summary['min']:.3f}, 最大 {summary['max']:.3f}")
+    print(f"   尺度因子 (SST时间/周期): {report.latency_scale:.4f}")
+    print(f"   变异系数差: {report.latency_cv_diff:.4f}")
+    print(f"   每节点平均延迟相关系数: {report.latency_node_correlation:.4f}")
+
+    print(f"\n{'✅ 两个后端在容差范围内一致' if report.agrees else '⚠️  两个后端存在显著差异'}")
+    for note in report.notes:
+        print(f"   • {note}")
+
+
+def run_cross_validation(topology_config: TopoConfig, messages: Optional[List[Tuple[int, int, int]]],
+                         sst_csv: str, traffic_config: Optional[TrafficConfig] = None,
+                         **compare_kwargs) -> CrossValidationReport:
+    """
+    运行完整交叉验证: 逻辑引擎运行给定流量，与已记录的SST统计对比
+
+    Args:
+        topology_config: 拓扑配置
+        messages: (src, dst, 字节数) 列表，应与SST运行的流量一致
+        sst_csv: SST统计CSV路径
+        traffic_config: 合成流量配置 (SST端点由同一配置生成时使用)
+        **compare_kwargs: 传给 compare_results 的容差参数
+
+    Returns:
+        CrossValidationReport: 差异报告
+    """
+    mesh = run_logical(topology_config, messages, traffic_config)
+    stats = load_sst_statistics(sst_csv, topology_config.mesh_size_x, topology_config.mesh_size_y)
+    return compare_results(
+        logical_result(mesh), sst_result(stats),
+        topology_config.mesh_size_x, topology_config.mesh_size_y,
+        topology=topology_config.topology_type.value, **compare_kwargs
+    )
+
+
+# =============================================================================
+# 命令行入口
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="逻辑引擎与SST merlin结果交叉验证")
+    parser.add_argument("--shape", default="4x4", help="网格大小，如 4x4")
+    parser.add_argument("--topology", choices=["mesh", "torus"], default="mesh", help="拓扑类型")
+    parser.add_argument("--messages-per-node", type=int, default=10, help="每节点发送的消息数")
+    parser.add_argument("--message-size", type=int, default=64, help="消息大小 (字节)")
+    parser.add_argument("--seed", type=int, default=1, help="流量随机种子")
+    parser.add_argument("--pattern", choices=[p.value for p in TrafficPattern],
+                        help="使用合成流量模式 (与SST merlin.trafficgen端点同源)，替代均匀随机消息列表")
+    parser.add_argument("--load", type=float, default=0.1, help="合成流量提供负载 (包/节点/周期)")
+    parser.add_argument("--sst-csv", required=True, help="SST统计CSV (已记录或由 --run-sst 生成)")
+    parser.add_argument("--run-sst", metavar="SCRIPT", help="先用SST运行该配置脚本")
+    parser.add_argument("--model-options", default="", help="传给SST的 --model-options")
+    parser.add_argument("--link-tolerance", type=float, default=0.05, help="链路负载分布L1距离容差")
+    parser.add_argument("--hop-tolerance", type=float, default=0.05, help="平均跳数相对误差容差")
+    parser.add_argument("--json", metavar="FILE", help="将报告写入JSON文件")
+    args = parser.parse_args(argv)
+
+    size_x, size_y = (int(v) for v in args.shape.lower().split("x"))
+    topology_type = TopologyType(args.topology)
+    config = TopoConfig(topology_type, mesh_size_x=size_x, mesh_size_y=size_y, total_nodes=size_x * size_y)
+    traffic_config = None
+    messages = None
+    if args.pattern:
+        traffic_config = TrafficConfig(
+            pattern=TrafficPattern(args.pattern),
+            injection_rate=args.load,
+            message_size_min=args.message_size,
+            message_size_max=args.message_size,
+            packets_per_node=args.messages_per_node,
+        )
+    else:
+        messages = uniform_random_messages(size_x * size_y, args.messages_per_node, args.message_size, args.seed)
+
+    if args.run_sst:
+        run_sst(args.run_sst, args.model_options)
+
+    report = run_cross_validation(config, messages, args.sst_csv, traffic_config=traffic_config,
+                                  link_tolerance=args.link_tolerance, hop_tolerance=args.hop_tolerance)
+    print_report(report)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(asdict(report), f, indent=2, ensure_ascii=False)
+        print(f"\n交叉验证报告已导出: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,9 +23,20 @@ import csv
 import time
 import os
 import random
+import math
+import statistics
+import hashlib
+import itertools
+import heapq
+import builtins
+import atexit
+import queue
+import sys
+import threading
+from collections import deque
 from enum import Enum
-from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional, Any
+from dataclasses import dataclass, field, replace, asdict
+from typing import Dict, List, Tuple, Optional, Any, Callable
 
 # SST仿真框架
 import sst
@@ -95,6 +106,16 @@ class Direction(Enum):
     LOCAL = "local"    # 本地节点 (目标节点)
 
 
+# 链路另一端对应的输入端口方向
+OPPOSITE_DIRECTIONS: Dict[Direction, Direction] = {
+    Direction.NORTH: Direction.SOUTH,
+    Direction.SOUTH: Direction.NORTH,
+    Direction.EAST: Direction.WEST,
+    Direction.WEST: Direction.EAST,
+    Direction.LOCAL: Direction.LOCAL,
+}
+
+
 class TopologyType(Enum):
     """
     支持的网络拓扑类型
@@ -105,6 +126,74 @@ class TopologyType(Enum):
     TORUS = "torus"    # 2D环形拓扑 (边缘节点有环绕连接)
 
 
+class RoutingMode(Enum):
+    """
+    逻辑路由模式
+    
+    维序路由为确定性路由；其余为无死锁的部分自适应最小路由，
+    在多个有效方向中按本地输出队列占用选择
+    """
+    DOR = "dor"                       # 维序路由 (Mesh: XY, Torus: 最短环绕XY)
+    WEST_FIRST = "west_first"         # 西向优先转向模型 (仅Mesh)
+    ODD_EVEN = "odd_even"             # 奇偶转向模型 (仅Mesh)
+    MIN_ADAPTIVE = "min_adaptive"     # 最小自适应 + 维序逃逸通道 (仅Torus)
+    VALIANT = "valiant"               # Valiant随机中间节点两阶段路由
+    ROMM = "romm"                     # 最小象限内随机中间节点两阶段路由
+    O1TURN = "o1turn"                 # 每个数据包随机选择XY或YX维序
+
+
+class AllocatorType(Enum):
+    """逻辑路由器的交换分配模型"""
+    IDEAL = "ideal"                   # 理想模型: 输入队列每周期全部路由，无交换冲突 (原有行为)
+    ROUND_ROBIN = "round_robin"       # 可分离输入优先轮询分配器
+    ISLIP = "islip"                   # iSLIP迭代分配器
+
+
+class TieBreak(Enum):
+    """Torus维度上直接路径与环绕路径距离相等时的方向选择策略"""
+    DIRECT = "direct"                 # 总是走直接路径 (原有行为)
+    RANDOM = "random"                 # 随机选择正向或反向
+    ALTERNATE = "alternate"           # 每个路由器按维度交替选择正向和反向
+
+
+# 各路由模式支持的拓扑类型
+ROUTING_MODE_TOPOLOGIES: Dict[RoutingMode, Tuple[TopologyType, ...]] = {
+    RoutingMode.DOR: (TopologyType.MESH, TopologyType.TORUS),
+    RoutingMode.WEST_FIRST: (TopologyType.MESH,),
+    RoutingMode.ODD_EVEN: (TopologyType.MESH,),
+    RoutingMode.MIN_ADAPTIVE: (TopologyType.TORUS,),
+    RoutingMode.VALIANT: (TopologyType.MESH, TopologyType.TORUS),
+    RoutingMode.ROMM: (TopologyType.MESH, TopologyType.TORUS),
+    RoutingMode.O1TURN: (TopologyType.MESH, TopologyType.TORUS),
+}
+
+# 两阶段遗忘路由模式 (经随机中间节点，各阶段使用维序路由)
+TWO_PHASE_ROUTING_MODES = (RoutingMode.VALIANT, RoutingMode.ROMM)
+
+# 逻辑引擎版本: 路由、仲裁或统计口径等影响结果的行为变化时递增 (使结果缓存失效)
+ENGINE_VERSION = 13
+
+# 随机数子系统: 每个子系统的每个节点使用由运行种子派生的独立随机数流
+RNG_SUBSYSTEMS = ("traffic", "routing", "fault")
+
+
+def derive_rng(seed: int, subsystem: str, node_id: int) -> random.Random:
+    """
+    由运行种子派生子系统/节点的随机数流
+
+    派生只依赖 (种子, 子系统, 节点ID)，与进程划分、节点处理顺序和PYTHONHASHSEED无关
+
+    Args:
+        seed: 运行种子
+        subsystem: 子系统名称 (见RNG_SUBSYSTEMS)
+        node_id: 节点ID
+    """
+    if subsystem not in RNG_SUBSYSTEMS:
+        raise ValueError(f"未知的随机数子系统: {subsystem} (可选: {', '.join(RNG_SUBSYSTEMS)})")
+    digest = hashlib.sha256(f"{seed}/{subsystem}/{node_id}".encode("ascii")).digest()
+    return random.Random(int.from_bytes(digest[:16], "big"))
+
+
 @dataclass
 class TopoConfig:
     """
@@ -116,6 +205,14 @@ class TopoConfig:
     total_nodes: int = 16          # 总节点数
     mesh_size_x: int = 4           # X方向网格大小
     mesh_size_y: int = 4           # Y方向网格大小
+    routing_mode: RoutingMode = RoutingMode.DOR  # 逻辑路由模式
+    escape_threshold: int = 4      # 自适应方向队列占用达到该值时改走逃逸通道 (MIN_ADAPTIVE)
+    tie_break: TieBreak = TieBreak.DIRECT  # Torus半环距离相等时的方向选择
+    virtual_channels: int = 1      # 每个网络输出端口的虚拟通道数 (Torus上≥2时启用日期线划分)
+    buffer_depth: int = 0          # 每个虚拟通道的缓冲深度 (数据包数)，0表示无界缓冲
+    switch_allocator: AllocatorType = AllocatorType.IDEAL  # 交换分配器模型
+    islip_iterations: int = 1      # iSLIP迭代次数
+    ejection_rate: int = 1         # 本地弹出端口每周期可接收的数据包数 (非理想分配器)
 
 
 @dataclass
@@ -134,6 +231,498 @@ class Packet:
     size_bytes: int = 64           # 数据包大小 (字节)
     timestamp: float = 0.0         # 发送时间戳
     creation_time: float = 0.0     # 创建时间戳
+    injection_cycle: int = 0       # 注入时的仿真周期
+    escape: bool = False           # 是否已进入维序逃逸子网络 (MIN_ADAPTIVE，进入后各跳均走逃逸通道)
+    intermediate: Optional[Tuple[int, int]] = None  # 两阶段路由的中间节点坐标
+    phase: int = 0                 # 两阶段路由阶段 (0: 前往中间节点, 1: 前往目标节点)
+    yx_order: Optional[bool] = None  # O1TURN维序 (True: 先Y后X)，在源节点选择
+    vc: int = 0                    # 当前占用的虚拟通道
+    vc_dimension: int = -1         # 当前所在维度 (0: X, 1: Y)，用于日期线状态
+    dateline_crossed: bool = False # 在当前维度上是否已越过日期线 (环绕链路)
+    arrival_cycle: int = 0         # 进入当前路由器输入端口的周期
+    switch_wait_cycles: int = 0    # 在各路由器输入端口等待交换分配的累计周期
+    measured: bool = False         # 是否在测量窗口内注入 (只有测量包计入测量统计)
+    # 延迟分解 (见LATENCY_COMPONENTS，各分量之和等于端到端延迟周期数)
+    stage_cycle: int = 0           # 进入当前队列 (注入队列/输入端口/输出虚拟通道) 的周期
+    port_mark: int = 0             # 进入输出虚拟通道时该输出端口已发送的包数
+    source_queueing_cycles: int = 0
+    pipeline_cycles: int = 0
+    link_cycles: int = 0
+    serialization_cycles: int = 0
+    contention_cycles: int = 0
+
+
+@dataclass
+class StatisticsProfile:
+    """
+    SST统计配置档案
+
+    只启用选定的merlin.hr_router和merlin.linkcontrol统计项，
+    避免全量统计导致输出文件过大、仿真变慢
+    """
+    name: str                          # 档案名称
+    router_statistics: List[str]       # merlin.hr_router统计项
+    linkcontrol_statistics: List[str]  # merlin.linkcontrol统计项
+    load_level: int = 1                # SST统计加载级别
+    rate: str = "0ns"                  # 周期性输出间隔 ("0ns"表示仅在仿真结束时输出)
+    description: str = ""              # 档案说明
+
+
+# 预定义统计档案
+STATISTICS_PROFILES: Dict[str, StatisticsProfile] = {
+    "minimal": StatisticsProfile(
+        name="minimal",
+        router_statistics=["send_packet_count"],
+        linkcontrol_statistics=["packet_latency"],
+        load_level=1,
+        rate="0ns",
+        description="每端口包数 + 端到端延迟，仅在结束时输出",
+    ),
+    "links": StatisticsProfile(
+        name="links",
+        router_statistics=["send_packet_count", "send_bit_count", "output_port_stalls"],
+        linkcontrol_statistics=["packet_latency", "send_bit_count", "recv_bit_count"],
+        load_level=1,
+        rate="10us",
+        description="每端口包数/比特数/阻塞时间，周期性输出",
+    ),
+    "full": StatisticsProfile(
+        name="full",
+        router_statistics=["send_packet_count", "send_bit_count", "output_port_stalls",
+                           "xbar_stalls", "idle_time", "width_adj_count"],
+        linkcontrol_statistics=["packet_latency", "send_bit_count", "recv_bit_count",
+                                "output_port_stalls", "idle_time"],
+        load_level=5,
+        rate="1us",
+        description="全部路由器和网络接口统计，细粒度周期输出",
+    ),
+}
+
+# 统计输出格式: 格式名 -> (SST输出模块, 文件扩展名)
+STATISTICS_OUTPUT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("sst.statOutputCSV", "csv"),
+    "csv.gz": ("sst.statOutputCSVGZ", "csv.gz"),
+    "json": ("sst.statOutputJSON", "json"),
+    "hdf5": ("sst.statOutputHDF5", "h5"),
+}
+
+
+class TrafficPattern(Enum):
+    """
+    合成流量模式
+
+    逻辑引擎和SST merlin.trafficgen端点共用同一组模式定义
+    """
+    UNIFORM = "uniform"                # 均匀随机目标
+    TRANSPOSE = "transpose"            # 转置: (x, y) -> (y, x)
+    BIT_COMPLEMENT = "bit_complement"  # 位补: (x, y) -> (X-1-x, Y-1-y)
+    TORNADO = "tornado"                # 龙卷风: 每维偏移 ceil(k/2)-1
+    NEIGHBOR = "neighbor"              # 东邻居: (x, y) -> (x+1, y)
+    HOTSPOT = "hotspot"                # 热点: 按比例发往热点节点，其余均匀随机
+
+
+@dataclass
+class TrafficConfig:
+    """
+    合成流量配置
+
+    一份配置同时驱动逻辑引擎 (每周期按注入率注入) 和SST端点参数
+    注入率以"包/节点/周期"为单位，一个周期对应以链路带宽串行化一个平均大小数据包的时间，
+    因此在SST中等价于链路带宽的同一比例 (offered load)
+    """
+    pattern: TrafficPattern = TrafficPattern.UNIFORM
+    injection_rate: float = 0.1                      # 提供负载 (包/节点/周期，即链路带宽比例)
+    message_size_min: int = 64                       # 消息大小下限 (字节)
+    message_size_max: int = 64                       # 消息大小上限 (字节，均匀分布)
+    packets_per_node: int = 10                       # 每节点发送的包数 (0表示不限)
+    hotspot_targets: List[int] = field(default_factory=list)  # 热点节点ID
+    hotspot_fraction: float = 0.2                    # 发往热点节点的流量比例
+
+
+# 配置数据类中的枚举字段 (序列化为枚举值)
+CONFIG_ENUM_FIELDS: Dict[str, type] = {
+    "topology_type": TopologyType,
+    "routing_mode": RoutingMode,
+    "tie_break": TieBreak,
+    "switch_allocator": AllocatorType,
+    "pattern": TrafficPattern,
+}
+
+
+def config_to_dict(config) -> Dict[str, Any]:
+    """将配置数据类 (TopoConfig/TrafficConfig/MeasurementConfig等) 转换为可JSON序列化的字典"""
+    return {key: value.value if isinstance(value, Enum) else value for key, value in asdict(config).items()}
+
+
+def config_from_dict(cls, values: Dict[str, Any]):
+    """config_to_dict的逆操作"""
+    return cls(**{key: CONFIG_ENUM_FIELDS[key](value) if key in CONFIG_ENUM_FIELDS else value
+                  for key, value in values.items()})
+
+
+@dataclass
+class QueueSnapshot:
+    """停滞诊断中一个非空队列的快照"""
+    node_id: int                               # 所在节点ID
+    position: Tuple[int, int]                  # 所在节点坐标
+    queue: str                                 # 队列名称 (inject / in:<端口>:vc<n> / out:<端口>:vc<n>)
+    occupancy: int                             # 队列中的数据包数
+    head_packet_id: int                        # 队首数据包ID
+    head_source: Tuple[int, int]               # 队首数据包源节点
+    head_destination: Tuple[int, int]          # 队首数据包目标节点
+    head_hop_count: int                        # 队首数据包已走跳数
+    head_injection_cycle: int                  # 队首数据包注入周期
+    waits_for: Optional[Tuple[int, str]] = None  # 队首数据包等待的下游队列 (节点ID, 队列名称)
+
+
+@dataclass
+class StallDiagnostics:
+    """
+    停滞诊断快照
+
+    看门狗连续若干周期未观察到进展时生成: 所有非空队列及其队首数据包，
+    以及沿"队首数据包等待的下游队列"追踪得到的等待链 (成环即为死锁)
+    """
+    cycle: int                                 # 检测到停滞时的仿真周期
+    stalled_cycles: int                        # 连续无进展的周期数
+    packets_in_flight: int                     # 在途数据包数
+    queues: List[QueueSnapshot] = field(default_factory=list)
+    wait_for_chain: List[Tuple[int, str]] = field(default_factory=list)  # 等待链上的队列 (节点ID, 队列名称)
+    is_cycle: bool = False                     # 等待链是否成环
+
+    def chain_nodes(self) -> List[int]:
+        """等待链经过的节点ID序列 (合并相邻的同节点队列)"""
+        nodes: List[int] = []
+        for node_id, _ in self.wait_for_chain:
+            if not nodes or nodes[-1] != node_id:
+                nodes.append(node_id)
+        return nodes
+
+    def print_report(self, max_queues: int = 10):
+        """打印停滞诊断报告"""
+        print(f"\n=== 停滞诊断 (周期 {self.cycle}) ===")
+        print(f"连续 {self.stalled_cycles} 个周期无进展，在途数据包 {self.packets_in_flight} 个，"
+              f"非空队列 {len(self.queues)} 个")
+        for snapshot in sorted(self.queues, key=lambda q: -q.occupancy)[:max_queues]:
+            waits = f" -> 等待 节点{snapshot.waits_for[0]} {snapshot.waits_for[1]}" if snapshot.waits_for else ""
+            print(f"  节点{snapshot.node_id}{snapshot.position} {snapshot.queue}: {snapshot.occupancy}包, "
+                  f"队首包{snapshot.head_packet_id} {snapshot.head_source}->{snapshot.head_destination} "
+                  f"(跳数 {snapshot.head_hop_count}, 注入周期 {snapshot.head_injection_cycle}){waits}")
+        if len(self.queues) > max_queues:
+            print(f"  ... 另有 {len(self.queues) - max_queues} 个非空队列")
+        if self.wait_for_chain:
+            kind = "循环等待 (死锁)" if self.is_cycle else "等待链"
+            chain = " -> ".join(f"节点{node_id}:{queue}" for node_id, queue in self.wait_for_chain)
+            print(f"{kind}: {chain}")
+
+
+@dataclass
+class SimulationResult:
+    """simulate() 的运行结果，停滞时携带诊断快照而不是无限运行"""
+    completed: bool                            # 是否运行完全部周期
+    cycles: int                                # 本次实际运行的周期数
+    stall: Optional[StallDiagnostics] = None   # 看门狗触发时的停滞诊断
+    sampling: Optional["SamplingResult"] = None  # 采样模式的统计结果
+
+
+class SimulationPhase(Enum):
+    """测量方法学中的仿真阶段"""
+    WARMUP = "warmup"            # 预热: 网络从空载进入稳态，不计入统计
+    MEASUREMENT = "measurement"  # 测量: 本阶段注入的数据包标记为测量包
+    DRAIN = "drain"              # 排空: 继续运行 (流量照常注入) 直到所有测量包被接收
+
+
+@dataclass
+class MeasurementConfig:
+    """预热/测量/排空三阶段测量配置 (周期数)"""
+    warmup_cycles: int = 1000             # 预热周期上限 (稳态检测可提前结束)
+    measurement_cycles: int = 1000        # 测量窗口长度
+    drain_limit: int = 10000              # 排空阶段周期上限
+    window_cycles: int = 100              # 窗口统计长度
+    steady_state_tolerance: float = 0.05  # 相邻预热窗口平均延迟和吞吐量相对变化均不超过该值即判定稳态，0表示禁用
+    min_warmup_cycles: int = 200          # 判定稳态前的最少预热周期
+
+
+@dataclass
+class WindowStats:
+    """一个统计窗口内接收的全部数据包 (不区分是否测量包) 的统计"""
+    phase: SimulationPhase
+    start_cycle: int                  # 窗口起始周期 (不含)
+    cycles: int                       # 窗口长度
+    ejected: int                      # 窗口内接收的数据包数
+    accepted_throughput: float        # 包/节点/周期
+    avg_latency_cycles: float         # 窗口内接收数据包的平均延迟
+
+
+@dataclass
+class MeasurementResult:
+    """三阶段测量结果，延迟只统计测量包，吞吐量统计测量窗口内的全部接收"""
+    warmup_cycles: int                    # 实际预热周期数
+    steady_state_detected: bool           # 预热是否因稳态检测提前结束
+    measurement_cycles: int
+    drain_cycles: int
+    drained: bool                         # 所有测量包是否都已被接收
+    measured_packets: int                 # 测量窗口内注入的数据包数
+    measured_received: int                # 已接收的测量包数
+    offered_load: float                   # 测量窗口注入率 (包/节点/周期)
+    accepted_throughput: float            # 测量窗口接收率 (包/节点/周期)
+    avg_latency_cycles: float             # 测量包平均延迟
+    p99_latency_cycles: float             # 测量包99分位延迟
+    avg_hop_count: float                  # 测量包平均跳数
+    windows: List[WindowStats] = field(default_factory=list)
+    stall: Optional[StallDiagnostics] = None  # 看门狗中止时的停滞诊断
+
+    def print_report(self):
+        """打印测量结果和窗口统计"""
+        warmup_note = " (稳态检测提前结束)" if self.steady_state_detected else ""
+        print(f"   阶段: 预热 {self.warmup_cycles} 周期{warmup_note}, 测量 {self.measurement_cycles} 周期, "
+              f"排空 {self.drain_cycles} 周期{'' if self.drained else ' (未排空)'}")
+        print(f"   测量包: 注入 {self.measured_packets:,}, 接收 {self.measured_received:,}")
+        print(f"   提供负载 {self.offered_load:.4f}, 接收吞吐量 {self.accepted_throughput:.4f} 包/节点/周期")
+        print(f"   测量包延迟: 平均 {self.avg_latency_cycles:.2f} 周期, p99 {self.p99_latency_cycles:.0f} 周期, "
+              f"平均跳数 {self.avg_hop_count:.2f}")
+        if self.stall is not None:
+            print(f"   ⚠️ 周期 {self.stall.cycle} 看门狗中止 (在途 {self.stall.packets_in_flight} 包)")
+
+
+@dataclass
+class SamplingConfig:
+    """
+    SMARTS式采样配置 (周期数)
+
+    每个采样周期开头做一次详细仿真 (预热 + 测量单元 + 排空测量包)，
+    周期的其余部分功能快进
+    """
+    sample_period: int = 10000      # 相邻采样单元起点的间隔
+    warmup_cycles: int = 200        # 每个采样单元前的详细预热 (网络从空载重建队列状态)
+    sample_cycles: int = 500        # 采样单元 (测量窗口) 长度
+    drain_limit: int = 2000         # 每个采样单元排空测量包的周期上限
+    confidence: float = 0.95        # 置信区间的置信水平
+
+
+@dataclass
+class SamplingResult:
+    """采样模式结果: 以各采样单元的平均延迟和吞吐量为样本估计总体均值及置信区间"""
+    samples: List[MeasurementResult]
+    detailed_cycles: int            # 详细仿真的周期数 (预热 + 测量 + 排空)
+    fast_forward_cycles: int        # 功能快进的周期数
+    confidence: float
+    mean_latency_cycles: float
+    latency_ci: float               # 平均延迟置信区间半宽
+    mean_throughput: float          # 包/节点/周期
+    throughput_ci: float            # 吞吐量置信区间半宽
+
+    def print_report(self):
+        """打印采样估计和置信区间"""
+        total = self.detailed_cycles + self.fast_forward_cycles
+        detailed_share = self.detailed_cycles / total * 100 if total else 0.0
+        level = self.confidence * 100
+        print(f"   采样单元: {len(self.samples)} 个, 详细仿真 {self.detailed_cycles:,} 周期 "
+              f"({detailed_share:.1f}%), 功能快进 {self.fast_forward_cycles:,} 周期")
+        print(f"   平均延迟: {self.mean_latency_cycles:.2f} ± {self.latency_ci:.2f} 周期 ({level:.0f}%置信区间)")
+        print(f"   接收吞吐量: {self.mean_throughput:.4f} ± {self.throughput_ci:.4f} 包/节点/周期 ({level:.0f}%置信区间)")
+
+
+# =============================================================================
+# 延迟分解
+# =============================================================================
+
+# 延迟分量 (逻辑引擎以整包为单位传输，每个输出端口每周期发送一个数据包)
+LATENCY_COMPONENTS: Dict[str, str] = {
+    "source_queueing": "源端排队",          # 注入队列中超出1周期注入流水线的等待
+    "router_pipeline": "路由器流水线",      # 源路由器的1个注入周期 (路由计算/交换分配)
+    "link_traversal": "链路传输",           # 每跳跨越链路1周期 (与分配器无关，总和等于跳数)
+    "serialization": "串行化",              # 在输出端口等待同端口其他数据包发送 (链路带宽占用)
+    "contention": "争用等待",               # 交换分配失败、虚拟通道仲裁、下游缓冲已满 (反压)
+}
+
+# 直方图与跳数距离类别均按2的幂分桶: 0, 1, 2-3, 4-7, ...
+LATENCY_HISTOGRAM_BUCKETS = 12
+HOP_DISTANCE_CLASSES = 7
+
+
+def _power_of_two_label(index: int, count: int) -> str:
+    """第index个2的幂分桶的标签 (最后一个桶为开区间)"""
+    if index == 0:
+        return "0"
+    low = 1 << (index - 1)
+    if index == count - 1:
+        return f"{low}+"
+    high = (1 << index) - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+class LatencyBreakdown:
+    """
+    按延迟分量和最短跳数距离类别聚合的延迟分解
+    
+    数据包在每次离开队列时把等待周期计入对应分量 (O(1))，弹出时把各分量
+    计入所属跳数类别的总和与直方图；整个网格共享一个实例
+    """
+    
+    def __init__(self):
+        self.measured_only = False
+        self.reset()
+    
+    def reset(self, measured_only: bool = False):
+        """清零 (measured_only=True 时只记录测量包)"""
+        self.measured_only = measured_only
+        components = len(LATENCY_COMPONENTS)
+        self.packets = [0] * HOP_DISTANCE_CLASSES
+        self.total_cycles = [[0] * components for _ in range(HOP_DISTANCE_CLASSES)]
+        self.histograms = [[[0] * LATENCY_HISTOGRAM_BUCKETS for _ in range(components)]
+                           for _ in range(HOP_DISTANCE_CLASSES)]
+    
+    def record(self, packet: Packet, minimal_hops: int):
+        """记录一个已弹出数据包的延迟分量"""
+        if self.measured_only and not packet.measured:
+            return
+        hop_class = min(minimal_hops.bit_length(), HOP_DISTANCE_CLASSES - 1)
+        self.packets[hop_class] += 1
+        totals = self.total_cycles[hop_class]
+        histograms = self.histograms[hop_class]
+        last_bucket = LATENCY_HISTOGRAM_BUCKETS - 1
+        for index, cycles in enumerate((packet.source_queueing_cycles, packet.pipeline_cycles, packet.link_cycles,
+                                        packet.serialization_cycles, packet.contention_cycles)):
+            totals[index] += cycles
+            histograms[index][min(cycles.bit_length(), last_bucket)] += 1
+    
+    def component_means(self) -> Dict[str, float]:
+        """全部数据包的各分量平均周期数"""
+        packets = sum(self.packets)
+        return {name: (sum(totals[index] for totals in self.total_cycles) / packets if packets else 0.0)
+                for index, name in enumerate(LATENCY_COMPONENTS)}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """可JSON序列化的聚合结果 (total_cycles/histograms按 [跳数类别][分量][分桶] 索引)"""
+        return {
+            "components": list(LATENCY_COMPONENTS),
+            "hop_classes": [_power_of_two_label(i, HOP_DISTANCE_CLASSES) for i in range(HOP_DISTANCE_CLASSES)],
+            "buckets": [_power_of_two_label(i, LATENCY_HISTOGRAM_BUCKETS) for i in range(LATENCY_HISTOGRAM_BUCKETS)],
+            "measured_only": self.measured_only,
+            "packets": list(self.packets),
+            "mean_cycles": self.component_means(),
+            "total_cycles": [list(totals) for totals in self.total_cycles],
+            "histograms": [[list(bins) for bins in histograms] for histograms in self.histograms],
+        }
+    
+    def print_report(self):
+        """打印各分量平均值和按跳数距离类别的分解"""
+        packets = sum(self.packets)
+        if not packets:
+            print("   无已弹出的数据包")
+            return
+        means = self.component_means()
+        total = sum(means.values())
+        for name, label in LATENCY_COMPONENTS.items():
+            share = means[name] / total * 100 if total else 0.0
+            print(f"   {label:<8} {means[name]:>7.2f} 周期 ({share:5.1f}%)")
+        print(f"   {'合计':<8} {total:>7.2f} 周期 ({packets:,} 包)")
+        
+        header = "".join(f"{label:>10}" for label in LATENCY_COMPONENTS.values())
+        print(f"\n   {'最短跳数':>8} {'包数':>8}{header}")
+        for hop_class, count in enumerate(self.packets):
+            if not count:
+                continue
+            row = "".join(f"{cycles / count:>10.2f}" for cycles in self.total_cycles[hop_class])
+            print(f"   {_power_of_two_label(hop_class, HOP_DISTANCE_CLASSES):>8} {count:>8}{row}")
+
+
+# =============================================================================
+# 逐流统计
+# =============================================================================
+
+# 延迟分位数草图: 不超过SKETCH_EXACT_LIMIT的周期数精确计数，更大的值按相对精度
+# SKETCH_RELATIVE_ACCURACY做对数分桶 (DDSketch)，每条流的桶数与延迟取值范围的对数成正比
+SKETCH_EXACT_LIMIT = 100
+SKETCH_RELATIVE_ACCURACY = 0.01
+_SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_SKETCH_LOG_GAMMA = math.log(_SKETCH_GAMMA)
+
+# 可用于worst_flows排序的流指标 (越大越差，throughput除外)
+FLOW_METRICS: Dict[str, str] = {
+    "p99_latency_cycles": "p99延迟 (周期)",
+    "p50_latency_cycles": "p50延迟 (周期)",
+    "avg_latency_cycles": "平均延迟 (周期)",
+    "max_latency_cycles": "最大延迟 (周期)",
+    "avg_hop_count": "平均跳数",
+    "throughput": "吞吐量 (包/周期)",
+}
+
+
+def _sketch_value(key: int) -> float:
+    """草图桶键对应的代表值 (非负键为精确值，负键-i为第i个对数桶的中点)"""
+    if key >= 0:
+        return float(key)
+    return 2 * _SKETCH_GAMMA ** -key / (_SKETCH_GAMMA + 1)
+
+
+@dataclass
+class FlowStats:
+    """一条 (源, 目标) 流的接收统计，由目标节点按源节点ID稀疏存储"""
+    packets: int = 0
+    bytes: int = 0
+    total_latency_cycles: int = 0
+    total_hop_count: int = 0
+    max_latency_cycles: int = 0
+    sketch: Dict[int, int] = field(default_factory=dict)   # 延迟分位数草图: 桶键 -> 包数
+    
+    def record(self, latency_cycles: int, size_bytes: int, hop_count: int):
+        """记录一个弹出的数据包 (O(1))"""
+        self.packets += 1
+        self.bytes += size_bytes
+        self.total_latency_cycles += latency_cycles
+        self.total_hop_count += hop_count
+        if latency_cycles > self.max_latency_cycles:
+            self.max_latency_cycles = latency_cycles
+        if latency_cycles <= SKETCH_EXACT_LIMIT:
+            key = latency_cycles
+        else:
+            key = -math.ceil(math.log(latency_cycles) / _SKETCH_LOG_GAMMA)
+        self.sketch[key] = self.sketch.get(key, 0) + 1
+    
+    def quantile(self, fraction: float) -> float:
+        """延迟的最近秩分位数估计 (大于SKETCH_EXACT_LIMIT时相对误差不超过SKETCH_RELATIVE_ACCURACY)"""
+        if not self.packets:
+            return 0.0
+        rank = max(0, math.ceil(fraction * self.packets) - 1)
+        seen = 0
+        for value, count in sorted((_sketch_value(key), count) for key, count in self.sketch.items()):
+            seen += count
+            if seen > rank:
+                return min(value, float(self.max_latency_cycles))
+        return float(self.max_latency_cycles)
+    
+    def metric(self, name: str, cycles: int) -> float:
+        """FLOW_METRICS中的一个指标 (只有分位数需要排序草图)"""
+        if name == "p99_latency_cycles":
+            return self.quantile(0.99)
+        if name == "p50_latency_cycles":
+            return self.quantile(0.50)
+        if name == "max_latency_cycles":
+            return float(self.max_latency_cycles)
+        if name == "throughput":
+            return self.packets / cycles
+        if not self.packets:
+            return 0.0
+        if name == "avg_latency_cycles":
+            return self.total_latency_cycles / self.packets
+        return self.total_hop_count / self.packets
+
+
+@dataclass
+class FlowSummary:
+    """一条流的汇总指标 (worst_flows查询结果)"""
+    source: Tuple[int, int]
+    destination: Tuple[int, int]
+    packets: int
+    bytes: int
+    throughput: float               # 包/周期
+    avg_latency_cycles: float
+    p50_latency_cycles: float
+    p99_latency_cycles: float
+    max_latency_cycles: int
+    avg_hop_count: float
 
 
 # =============================================================================
@@ -149,7 +738,8 @@ class MultiTopologyRouter:
     根据拓扑类型自动选择最优路由策略
     """
     
-    def __init__(self, node_id: int, position: Tuple[int, int], topology_config: TopoConfig):
+    def __init__(self, node_id: int, position: Tuple[int, int], topology_config: TopoConfig,
+                 rng: Optional[random.Random] = None):
         """
         初始化多拓扑路由器
         
@@ -157,30 +747,414 @@ class MultiTopologyRouter:
             node_id: 节点唯一标识符
             position: 节点在网格中的位置坐标
             topology_config: 拓扑配置参数
+            rng: 随机路由决策使用的随机数生成器，None时新建
         """
         self.node_id = node_id
         self.position = position
         self.x, self.y = position
         self.topology_config = topology_config
+        self.rng = rng if rng is not None else random.Random()
+        self._tie_toggle = [0, 0]   # ALTERNATE策略下X/Y维度的交替状态 (平局方向的跳提交时翻转)
         
-    def route_packet(self, packet: Packet) -> Direction:
+        mode = topology_config.routing_mode
+        if topology_config.topology_type not in ROUTING_MODE_TOPOLOGIES[mode]:
+            raise ValueError(f"路由模式 {mode.value} 不支持 {topology_config.topology_type.value} 拓扑")
+        if topology_config.virtual_channels < 1:
+            raise ValueError(f"虚拟通道数必须≥1: {topology_config.virtual_channels}")
+        if topology_config.buffer_depth < 0:
+            raise ValueError(f"缓冲深度不能为负: {topology_config.buffer_depth}")
+        if topology_config.islip_iterations < 1 or topology_config.ejection_rate < 1:
+            raise ValueError("iSLIP迭代次数和弹出端口速率必须≥1")
+        
+        self.vc_classes = self._build_vc_classes()
+        # 预留逃逸通道时，自适应通道全部占满即视为拥塞，保证受阻的数据包总能转入逃逸通道
+        self.escape_threshold = topology_config.escape_threshold
+        if self.has_escape_vcs and topology_config.buffer_depth:
+            adaptive_vcs = len(self.vc_classes[0][0])
+            self.escape_threshold = min(self.escape_threshold, adaptive_vcs * topology_config.buffer_depth)
+        
+    def route_packet(self, packet: Packet,
+                     port_occupancy: Optional[Dict[Direction, int]] = None) -> Direction:
         """
-        根据拓扑类型选择路由算法
+        根据拓扑类型和路由模式选择下一跳方向
+        
+        确定性模式直接返回唯一方向；自适应模式在有效方向中选择
+        本地输出队列占用最少的方向 (占用相同时按候选顺序)
         
         Args:
             packet: 待路由的数据包
+            port_occupancy: 本地各输出端口的队列占用，None时视为全部空闲
             
         Returns:
             Direction: 下一跳的路由方向
         """
+        mode = self.topology_config.routing_mode
+        
+        if mode == RoutingMode.DOR:
+            return self._route_dor(packet)
+        if mode in TWO_PHASE_ROUTING_MODES:
+            return self._route_two_phase(packet)
+        if mode == RoutingMode.O1TURN:
+            return self._route_o1turn(packet)
+        
+        candidates = self.candidate_directions(packet)
+        if mode == RoutingMode.MIN_ADAPTIVE:
+            return self._select_with_escape(packet, candidates, port_occupancy)
+        return self._select_least_occupied(candidates, port_occupancy)
+    
+    def peek_route(self, packet: Packet,
+                   port_occupancy: Optional[Dict[Direction, int]] = None) -> Tuple[Packet, Direction]:
+        """
+        无副作用地试算路由: 在数据包副本上调用route_packet，并恢复随机数和交替状态
+        
+        供停滞诊断等只读分析使用，保证同一种子的运行不因诊断而改变
+        
+        Returns:
+            Tuple[Packet, Direction]: 路由后的数据包副本 (阶段、逃逸等已更新) 及下一跳方向
+        """
+        probe = replace(packet)
+        rng_state = self.rng.getstate()
+        tie_toggle = list(self._tie_toggle)
+        try:
+            return probe, self.route_packet(probe, port_occupancy)
+        finally:
+            self.rng.setstate(rng_state)
+            self._tie_toggle[:] = tie_toggle
+    
+    def candidate_directions(self, packet: Packet) -> List[Direction]:
+        """
+        路由函数: 返回当前路由模式允许的全部下一跳方向
+        
+        Args:
+            packet: 待路由的数据包
+            
+        Returns:
+            List[Direction]: 允许的方向 (按优先顺序)，到达目标时为 [LOCAL]
+        """
+        mode = self.topology_config.routing_mode
+        if mode == RoutingMode.WEST_FIRST:
+            return self._west_first_candidates(packet)
+        elif mode == RoutingMode.ODD_EVEN:
+            return self._odd_even_candidates(packet)
+        elif mode == RoutingMode.MIN_ADAPTIVE:
+            return self._torus_minimal_candidates(packet)
+        elif mode in TWO_PHASE_ROUTING_MODES:
+            return [self._route_two_phase(packet)]
+        elif mode == RoutingMode.O1TURN:
+            return [self._route_o1turn(packet)]
+        return [self._route_dor(packet)]
+    
+    def _route_dor(self, packet: Packet, target: Optional[Tuple[int, int]] = None) -> Direction:
+        """按拓扑类型选择维序路由，target为None时以数据包目标节点为终点"""
         if self.topology_config.topology_type == TopologyType.MESH:
-            return self._route_mesh(packet)
+            return self._route_mesh(packet, target)
         elif self.topology_config.topology_type == TopologyType.TORUS:
-            return self._route_torus(packet)
+            return self._route_torus(packet, target)
         else:
             return Direction.LOCAL
     
-    def _route_mesh(self, packet: Packet) -> Direction:
+    # =========================================================================
+    # 虚拟通道 (日期线死锁避免)
+    # =========================================================================
+    
+    def crosses_dateline(self, direction: Direction) -> bool:
+        """从本节点沿direction输出是否经过Torus环绕链路 (每个维度的日期线)"""
+        if self.topology_config.topology_type != TopologyType.TORUS:
+            return False
+        if direction == Direction.EAST:
+            return self.x == self.topology_config.mesh_size_x - 1
+        if direction == Direction.WEST:
+            return self.x == 0
+        if direction == Direction.SOUTH:
+            return self.y == self.topology_config.mesh_size_y - 1
+        if direction == Direction.NORTH:
+            return self.y == 0
+        return False
+    
+    def _build_vc_classes(self) -> List[Tuple[range, bool]]:
+        """
+        虚拟通道类划分: [(通道范围, 是否按日期线再分为两半), ...]，按vc_group索引
+        
+        MIN_ADAPTIVE: 类0为自适应通道，类1为预留的维序逃逸通道 (Torus上按日期线分为两个)；
+        VALIANT/ROMM: 类0/类1分别供阶段0/阶段1使用；O1TURN: 类0/类1分别供XY/YX维序使用
+        (各自再按日期线划分)；
+        虚拟通道不足以划分时所有数据包共享全部通道 (Torus上仍按日期线划分)
+        """
+        num_vcs = self.topology_config.virtual_channels
+        torus = self.topology_config.topology_type == TopologyType.TORUS
+        dateline_vcs = 2 if torus else 1
+        mode = self.topology_config.routing_mode
+        if mode == RoutingMode.MIN_ADAPTIVE and num_vcs > dateline_vcs:
+            return [(range(dateline_vcs, num_vcs), False), (range(0, dateline_vcs), torus)]
+        if (mode in TWO_PHASE_ROUTING_MODES or mode == RoutingMode.O1TURN) and num_vcs >= 2 * dateline_vcs:
+            half = num_vcs // 2
+            return [(range(0, half), torus), (range(half, num_vcs), torus)]
+        return [(range(num_vcs), torus and num_vcs >= 2)]
+    
+    @property
+    def has_escape_vcs(self) -> bool:
+        """MIN_ADAPTIVE是否有预留的逃逸虚拟通道"""
+        return self.topology_config.routing_mode == RoutingMode.MIN_ADAPTIVE and len(self.vc_classes) == 2
+    
+    def vc_group(self, packet: Packet) -> int:
+        """数据包所属的虚拟通道类 (MIN_ADAPTIVE: 1为逃逸通道; VALIANT/ROMM: 路由阶段; O1TURN: 1为YX维序)"""
+        mode = self.topology_config.routing_mode
+        if mode in TWO_PHASE_ROUTING_MODES:
+            return packet.phase
+        if mode == RoutingMode.O1TURN:
+            return int(bool(packet.yx_order))
+        return int(packet.escape)
+    
+    def class_vcs(self, group: int, crossed: bool) -> range:
+        """
+        虚拟通道类group中可申请的通道
+        
+        按日期线划分的类: 越过本维度日期线之前使用低半部分，经过环绕链路及之后
+        使用高半部分，从而打断每个环上的循环依赖
+        """
+        vcs, dateline = self.vc_classes[min(group, len(self.vc_classes) - 1)]
+        if not dateline:
+            return vcs
+        half = len(vcs) // 2
+        return vcs[half:] if crossed else vcs[:half]
+    
+    def allowed_vcs(self, packet: Packet, direction: Direction) -> range:
+        """数据包沿direction输出时可申请的虚拟通道 (见class_vcs)，弹出端口不限"""
+        if direction == Direction.LOCAL:
+            return range(self.topology_config.virtual_channels)
+        dim = 0 if direction in (Direction.EAST, Direction.WEST) else 1
+        crossed = packet.dateline_crossed and packet.vc_dimension == dim
+        return self.class_vcs(self.vc_group(packet), crossed or self.crosses_dateline(direction))
+    
+    def commit_hop(self, packet: Packet, direction: Direction, vc: int):
+        """数据包获得输出虚拟通道后更新其日期线状态；ALTERNATE策略下平局维度的跳提交后翻转交替状态"""
+        packet.vc = vc
+        if direction == Direction.LOCAL:
+            return
+        dim = 0 if direction in (Direction.EAST, Direction.WEST) else 1
+        if self.topology_config.tie_break == TieBreak.ALTERNATE and self._is_tie(packet, dim):
+            self._tie_toggle[dim] ^= 1
+        if dim != packet.vc_dimension:
+            packet.vc_dimension = dim
+            packet.dateline_crossed = False
+        if self.crosses_dateline(direction):
+            packet.dateline_crossed = True
+    
+    def minimal_hops(self, source: Tuple[int, int], destination: Tuple[int, int]) -> int:
+        """两节点间的最短路径跳数 (Torus考虑环绕链路)"""
+        dist_x = abs(destination[0] - source[0])
+        dist_y = abs(destination[1] - source[1])
+        if self.topology_config.topology_type == TopologyType.TORUS:
+            dist_x = min(dist_x, self.topology_config.mesh_size_x - dist_x)
+            dist_y = min(dist_y, self.topology_config.mesh_size_y - dist_y)
+        return dist_x + dist_y
+    
+    def _route_two_phase(self, packet: Packet) -> Direction:
+        """
+        两阶段遗忘路由 (Valiant / ROMM)
+        
+        源节点为数据包选择随机中间节点；阶段0维序路由到中间节点，
+        到达后切换到阶段1维序路由到目标节点。两个阶段使用不相交的虚拟通道类
+        (见_build_vc_classes)，阶段1重新开始日期线状态
+        """
+        if packet.intermediate is None:
+            packet.intermediate = self._pick_intermediate(packet)
+            packet.phase = 0
+        
+        if packet.phase == 0:
+            if self.position != packet.intermediate:
+                return self._route_dor(packet, packet.intermediate)
+            packet.phase = 1
+            packet.vc_dimension = -1
+            packet.dateline_crossed = False
+        return self._route_dor(packet)
+    
+    def _pick_intermediate(self, packet: Packet) -> Tuple[int, int]:
+        """
+        选择两阶段路由的中间节点
+        
+        VALIANT: 全网均匀随机；ROMM: 源和目标之间的最小象限内均匀随机
+        """
+        size_x = self.topology_config.mesh_size_x
+        size_y = self.topology_config.mesh_size_y
+        if self.topology_config.routing_mode == RoutingMode.VALIANT:
+            return (self.rng.randrange(size_x), self.rng.randrange(size_y))
+        
+        dest_x, dest_y = packet.destination
+        wrap = self.topology_config.topology_type == TopologyType.TORUS
+        return (self._pick_in_minimal_span(self.x, dest_x, size_x, wrap, 0),
+                self._pick_in_minimal_span(self.y, dest_y, size_y, wrap, 1))
+    
+    def _pick_in_minimal_span(self, current: int, dest: int, size: int, wrap: bool, dim: int) -> int:
+        """在一个维度的最短路径区间内均匀选择坐标 (方向选择与维序路由一致)"""
+        if current == dest:
+            return current
+        if wrap:
+            step = self._torus_step(current, dest, size, dim)
+            distance = (dest - current) % size if step > 0 else (current - dest) % size
+        else:
+            step = 1 if dest > current else -1
+            distance = abs(dest - current)
+        return (current + step * self.rng.randint(0, distance)) % size
+    
+    def _route_o1turn(self, packet: Packet) -> Direction:
+        """
+        O1TURN路由
+        
+        源节点为每个数据包等概率选择XY或YX维序，之后沿该维序最短路径前进。
+        两种维序使用不相交的虚拟通道类 (见_build_vc_classes)
+        """
+        if packet.yx_order is None:
+            packet.yx_order = self.rng.random() < 0.5
+        
+        for dim in ((1, 0) if packet.yx_order else (0, 1)):
+            direction = self._dimension_direction(packet.destination, dim)
+            if direction is not None:
+                return direction
+        return Direction.LOCAL
+    
+    def _dimension_direction(self, target: Tuple[int, int], dim: int) -> Optional[Direction]:
+        """单个维度 (0: X, 1: Y) 上朝向target的最短路径方向，该维度已对齐时返回None"""
+        current = self.position[dim]
+        dest = target[dim]
+        if current == dest:
+            return None
+        
+        positive, negative = (Direction.EAST, Direction.WEST) if dim == 0 else (Direction.SOUTH, Direction.NORTH)
+        if self.topology_config.topology_type == TopologyType.TORUS:
+            size = self.topology_config.mesh_size_x if dim == 0 else self.topology_config.mesh_size_y
+            return positive if self._torus_step(current, dest, size, dim) > 0 else negative
+        return positive if dest > current else negative
+    
+    def _torus_step(self, current: int, dest: int, size: int, dim: int) -> int:
+        """
+        Torus单个维度的最短路径方向 (+1为坐标增大方向)
+        
+        直接路径与环绕路径距离相等时按tie_break策略选择；
+        选定方向走一跳后剩余距离严格小于半环，后续路由器不会再次遇到平局
+        """
+        direct_step = 1 if dest > current else -1
+        direct_dist = abs(dest - current)
+        wrap_dist = size - direct_dist
+        if direct_dist < wrap_dist:
+            return direct_step
+        if direct_dist > wrap_dist:
+            return -direct_step
+        
+        tie_break = self.topology_config.tie_break
+        if tie_break == TieBreak.RANDOM:
+            return 1 if self.rng.random() < 0.5 else -1
+        if tie_break == TieBreak.ALTERNATE:
+            # 交替状态在平局方向的跳提交时翻转 (commit_hop)，重复路由同一数据包结果不变
+            return -1 if self._tie_toggle[dim] else 1
+        return direct_step
+    
+    def _is_tie(self, packet: Packet, dim: int) -> bool:
+        """数据包当前路由终点 (两阶段路由阶段0为中间节点) 在dim维度上是否处于Torus半环平局"""
+        if self.topology_config.topology_type != TopologyType.TORUS:
+            return False
+        target = packet.intermediate if packet.phase == 0 and packet.intermediate is not None else packet.destination
+        size = self.topology_config.mesh_size_x if dim == 0 else self.topology_config.mesh_size_y
+        distance = abs(target[dim] - self.position[dim])
+        return distance != 0 and distance * 2 == size
+    
+    @staticmethod
+    def _select_least_occupied(candidates: List[Direction],
+                               port_occupancy: Optional[Dict[Direction, int]]) -> Direction:
+        """在候选方向中选择输出队列占用最少的方向"""
+        if len(candidates) == 1 or not port_occupancy:
+            return candidates[0]
+        return min(candidates, key=lambda direction: port_occupancy.get(direction, 0))
+    
+    def _select_with_escape(self, packet: Packet, candidates: List[Direction],
+                            port_occupancy: Optional[Dict[Direction, int]]) -> Direction:
+        """
+        最小自适应选择 + 逃逸通道 (Duato协议)
+        
+        自适应跳使用自适应虚拟通道；自适应方向全部拥塞 (占用达到escape_threshold)
+        时数据包进入逃逸子网络，此后按维序路由使用预留的日期线逃逸通道直至目标
+        """
+        if packet.escape:
+            return self._route_torus(packet)
+        direction = self._select_least_occupied(candidates, port_occupancy)
+        if direction == Direction.LOCAL or not port_occupancy:
+            return direction
+        if port_occupancy.get(direction, 0) >= self.escape_threshold:
+            packet.escape = True
+            return self._route_torus(packet)
+        return direction
+    
+    def _west_first_candidates(self, packet: Packet) -> List[Direction]:
+        """
+        西向优先转向模型 (Mesh)
+        
+        需要向西时必须先完成全部西向跳；之后可在东、南、北的有效方向中自适应选择
+        """
+        dest_x, dest_y = packet.destination
+        if dest_x == self.x and dest_y == self.y:
+            return [Direction.LOCAL]
+        if dest_x < self.x:
+            return [Direction.WEST]
+        
+        candidates = []
+        if dest_x > self.x:
+            candidates.append(Direction.EAST)
+        if dest_y > self.y:
+            candidates.append(Direction.SOUTH)
+        elif dest_y < self.y:
+            candidates.append(Direction.NORTH)
+        return candidates
+    
+    def _odd_even_candidates(self, packet: Packet) -> List[Direction]:
+        """
+        奇偶转向模型 (Chiu, Mesh)
+        
+        偶数列禁止东->南/北转向，奇数列禁止南/北->西转向，
+        在不引入循环依赖的前提下保留最小路径上的自适应性
+        """
+        dest_x, dest_y = packet.destination
+        src_x = packet.source[0]
+        dx = dest_x - self.x
+        dy = dest_y - self.y
+        if dx == 0 and dy == 0:
+            return [Direction.LOCAL]
+        
+        vertical = Direction.SOUTH if dy > 0 else Direction.NORTH
+        if dx == 0:
+            return [vertical]
+        
+        candidates = []
+        if dx > 0:
+            if dy == 0:
+                return [Direction.EAST]
+            if self.x % 2 == 1 or self.x == src_x:
+                candidates.append(vertical)
+            if dest_x % 2 == 1 or dx != 1:
+                candidates.append(Direction.EAST)
+        else:
+            candidates.append(Direction.WEST)
+            if self.x % 2 == 0 and dy != 0:
+                candidates.append(vertical)
+        return candidates
+    
+    def _torus_minimal_candidates(self, packet: Packet) -> List[Direction]:
+        """
+        Torus最小路径上的全部有效方向
+        
+        每个维度选择直接或环绕中较短的一侧 (距离相等时按tie_break策略选择)
+        """
+        dest_x, dest_y = packet.destination
+        if dest_x == self.x and dest_y == self.y:
+            return [Direction.LOCAL]
+        
+        candidates = []
+        for dim in (0, 1):
+            direction = self._dimension_direction(packet.destination, dim)
+            if direction is not None:
+                candidates.append(direction)
+        return candidates
+    
+    def _route_mesh(self, packet: Packet, target: Optional[Tuple[int, int]] = None) -> Direction:
         """
         Mesh拓扑XY路由算法
         
@@ -189,11 +1163,12 @@ class MultiTopologyRouter:
         
         Args:
             packet: 待路由的数据包
+            target: 路由终点，None时使用数据包目标节点
             
         Returns:
             Direction: 下一跳方向
         """
-        dest_x, dest_y = packet.destination
+        dest_x, dest_y = target if target is not None else packet.destination
         
         # 检查是否已到达目标节点
         if dest_x == self.x and dest_y == self.y:
@@ -212,7 +1187,7 @@ class MultiTopologyRouter:
         
         return Direction.LOCAL
     
-    def _route_torus(self, packet: Packet) -> Direction:
+    def _route_torus(self, packet: Packet, target: Optional[Tuple[int, int]] = None) -> Direction:
         """
         Torus拓扑环形路由算法
         
@@ -221,43 +1196,157 @@ class MultiTopologyRouter:
         
         Args:
             packet: 待路由的数据包
+            target: 路由终点，None时使用数据包目标节点
             
         Returns:
             Direction: 下一跳方向
         """
-        dest_x, dest_y = packet.destination
+        dest_x, dest_y = target if target is not None else packet.destination
         
         # 检查是否已到达目标节点
         if dest_x == self.x and dest_y == self.y:
             return Direction.LOCAL
         
-        # X方向路由 - 选择最短路径（考虑环绕）
+        # X方向路由 - 选择最短路径（考虑环绕，距离相等时按tie_break策略）
         if dest_x != self.x:
-            direct_dist_x = abs(dest_x - self.x)
-            wrap_dist_x = self.topology_config.mesh_size_x - direct_dist_x
-            
-            if direct_dist_x <= wrap_dist_x:
-                # 直接路径更短或相等
-                return Direction.EAST if dest_x > self.x else Direction.WEST
-            else:
-                # 环绕路径更短
-                return Direction.WEST if dest_x > self.x else Direction.EAST
-        
-        # Y方向路由 - 选择最短路径（考虑环绕）
+            step = self._torus_step(self.x, dest_x, self.topology_config.mesh_size_x, 0)
+            return Direction.EAST if step > 0 else Direction.WEST
+        
+        # Y方向路由 - 选择最短路径（考虑环绕，距离相等时按tie_break策略）
         if dest_y != self.y:
-            direct_dist_y = abs(dest_y - self.y)
-            wrap_dist_y = self.topology_config.mesh_size_y - direct_dist_y
-            
-            if direct_dist_y <= wrap_dist_y:
-                # 直接路径更短或相等
-                return Direction.SOUTH if dest_y > self.y else Direction.NORTH
-            else:
-                # 环绕路径更短
-                return Direction.NORTH if dest_y > self.y else Direction.SOUTH
+            step = self._torus_step(self.y, dest_y, self.topology_config.mesh_size_y, 1)
+            return Direction.SOUTH if step > 0 else Direction.NORTH
         
         return Direction.LOCAL
 
 
+class SeparableSwitchAllocator:
+    """
+    可分离交换分配器
+    
+    为路由器输入虚拟通道的请求分配交叉开关: 每个输入端口每周期最多
+    传输一个数据包，每个输出端口最多接收一个 (本地弹出端口为ejection_rate个)
+    
+    - ROUND_ROBIN: 输入优先可分离分配，输入端口在请求的虚拟通道间轮询，
+      输出端口在请求的输入端口间轮询
+    - ISLIP: 请求-授权-接受迭代匹配，授权/接受指针仅在第一次迭代被接受时更新
+    """
+    
+    def __init__(self, allocator_type: AllocatorType, num_vcs: int,
+                 iterations: int = 1, ejection_rate: int = 1):
+        """
+        初始化交换分配器
+        
+        Args:
+            allocator_type: 分配器类型 (ROUND_ROBIN/ISLIP)
+            num_vcs: 每个输入端口的虚拟通道数
+            iterations: iSLIP迭代次数
+            ejection_rate: 本地弹出端口每周期可接收的数据包数
+        """
+        self.allocator_type = allocator_type
+        self.num_vcs = num_vcs
+        self.iterations = iterations
+        self.ejection_rate = ejection_rate
+        self.ports = list(Direction)
+        self.port_index = {port: index for index, port in enumerate(self.ports)}
+        
+        # 轮询指针
+        self.vc_pointer = {port: 0 for port in self.ports}       # 输入端口: 下一个优先的虚拟通道
+        self.grant_pointer = {port: 0 for port in self.ports}    # 输出端口: 下一个优先的输入端口
+        self.accept_pointer = {port: 0 for port in self.ports}   # 输入端口: 下一个优先的输出端口 (iSLIP)
+    
+    @staticmethod
+    def _round_robin(candidates: List[int], pointer: int, size: int) -> List[int]:
+        """按轮询指针排序候选索引 (从pointer开始循环)"""
+        return sorted(candidates, key=lambda index: (index - pointer) % size)
+    
+    def _capacity(self, output: Direction) -> int:
+        return self.ejection_rate if output == Direction.LOCAL else 1
+    
+    def allocate(self, requests: Dict[Tuple[Direction, int], Direction]) -> List[Tuple[Direction, int]]:
+        """
+        执行一个周期的交换分配
+        
+        Args:
+            requests: (输入端口, 输入虚拟通道) -> 请求的输出端口
+            
+        Returns:
+            List[Tuple[Direction, int]]: 获得交叉开关的 (输入端口, 输入虚拟通道)
+        """
+        if not requests:
+            return []
+        if self.allocator_type == AllocatorType.ISLIP:
+            matches = self._islip_match(requests)
+        else:
+            matches = self._input_first_match(requests)
+        
+        # 为每个匹配的输入端口在请求该输出的虚拟通道中轮询选择一个
+        grants = []
+        for port, output in matches.items():
+            vcs = [vc for (in_port, vc), out in requests.items() if in_port == port and out == output]
+            vc = self._round_robin(vcs, self.vc_pointer[port], self.num_vcs)[0]
+            self.vc_pointer[port] = (vc + 1) % self.num_vcs
+            grants.append((port, vc))
+        return grants
+    
+    def _input_first_match(self, requests: Dict[Tuple[Direction, int], Direction]) -> Dict[Direction, Direction]:
+        """输入优先可分离分配: 输入仲裁选出一个虚拟通道，输出仲裁在输入端口间轮询"""
+        # 输入仲裁
+        chosen: Dict[Direction, Direction] = {}
+        for port in self.ports:
+            vcs = [vc for (in_port, vc) in requests if in_port == port]
+            if vcs:
+                vc = self._round_robin(vcs, self.vc_pointer[port], self.num_vcs)[0]
+                chosen[port] = requests[(port, vc)]
+        
+        # 输出仲裁
+        matches: Dict[Direction, Direction] = {}
+        for output in self.ports:
+            inputs = [self.port_index[port] for port, out in chosen.items() if out == output]
+            if not inputs:
+                continue
+            winners = self._round_robin(inputs, self.grant_pointer[output], len(self.ports))[:self._capacity(output)]
+            for index in winners:
+                matches[self.ports[index]] = output
+            self.grant_pointer[output] = (winners[-1] + 1) % len(self.ports)
+        return matches
+    
+    def _islip_match(self, requests: Dict[Tuple[Direction, int], Direction]) -> Dict[Direction, Direction]:
+        """iSLIP迭代匹配"""
+        port_count = len(self.ports)
+        wanted: Dict[Direction, set] = {}
+        for (port, _vc), output in requests.items():
+            wanted.setdefault(port, set()).add(output)
+        
+        matches: Dict[Direction, Direction] = {}
+        capacity = {output: self._capacity(output) for output in self.ports}
+        for iteration in range(self.iterations):
+            # 授权: 每个仍有容量的输出端口在未匹配的请求输入中轮询选择
+            offers: Dict[Direction, List[Direction]] = {}
+            for output in self.ports:
+                if capacity[output] == 0:
+                    continue
+                inputs = [self.port_index[port] for port, outputs in wanted.items()
+                          if port not in matches and output in outputs]
+                if not inputs:
+                    continue
+                for index in self._round_robin(inputs, self.grant_pointer[output], port_count)[:capacity[output]]:
+                    offers.setdefault(self.ports[index], []).append(output)
+            if not offers:
+                break
+            
+            # 接受: 每个输入端口在收到的授权中轮询选择一个
+            for port, outputs in offers.items():
+                indices = [self.port_index[output] for output in outputs]
+                output = self.ports[self._round_robin(indices, self.accept_pointer[port], port_count)[0]]
+                matches[port] = output
+                capacity[output] -= 1
+                if iteration == 0:
+                    self.grant_pointer[output] = (self.port_index[port] + 1) % port_count
+                    self.accept_pointer[port] = (self.port_index[output] + 1) % port_count
+        return matches
+
+
 class LogicalRouter:
     """
     逻辑路由器
@@ -311,6 +1400,367 @@ class LogicalRouter:
         return Direction.LOCAL
 
 
+# =============================================================================
+# 合成流量生成
+# =============================================================================
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """最近秩分位数 (fraction取0~1)，空列表返回0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return float(ordered[rank])
+
+
+def _t_central_probability(t: float, dof: int) -> float:
+    """
+    学生t分布的中心概率 P(|T| < t) (Abramowitz & Stegun 26.7.3/26.7.4 整数自由度的精确级数)
+
+    Args:
+        t: 非负分位点
+        dof: 自由度 (正整数)
+    """
+    theta = math.atan(t / math.sqrt(dof))
+    sin_theta, cos_sq = math.sin(theta), math.cos(theta) ** 2
+    if dof % 2 == 1:
+        # 奇自由度: (2/π)[θ + sinθ·cosθ·(1 + 2/3·cos²θ + 2·4/(3·5)·cos⁴θ + ...)]
+        term, series = 1.0, 0.0
+        for k in range(1, (dof - 1) // 2 + 1):
+            series += term
+            term *= cos_sq * (2 * k) / (2 * k + 1)
+        return 2 / math.pi * (theta + sin_theta * math.cos(theta) * series)
+    # 偶自由度: sinθ·(1 + 1/2·cos²θ + 1·3/(2·4)·cos⁴θ + ...)
+    term, series = 1.0, 0.0
+    for k in range(1, dof // 2 + 1):
+        series += term
+        term *= cos_sq * (2 * k - 1) / (2 * k)
+    return sin_theta * series
+
+
+def _t_quantile(confidence: float, dof: int) -> float:
+    """
+    学生t分布双侧分位数 (对精确中心概率在θ=atan(t/√dof)上二分求解，任意整数自由度均精确)
+
+    Args:
+        confidence: 置信水平 (如0.95)
+        dof: 自由度
+    """
+    low, high = 0.0, math.pi / 2
+    for _ in range(60):
+        middle = (low + high) / 2
+        if _t_central_probability(math.sqrt(dof) * math.tan(middle), dof) < confidence:
+            low = middle
+        else:
+            high = middle
+    return math.sqrt(dof) * math.tan((low + high) / 2)
+
+
+def mean_confidence_interval(values: List[float], confidence: float) -> Tuple[float, float]:
+    """样本均值及其置信区间半宽 (少于两个样本时半宽为无穷大)"""
+    if not values:
+        return 0.0, math.inf
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, math.inf
+    return mean, _t_quantile(confidence, len(values) - 1) * statistics.stdev(values) / math.sqrt(len(values))
+
+
+def _parse_bandwidth(bandwidth: str) -> float:
+    """
+    解析SST带宽字符串为字节/秒
+
+    Args:
+        bandwidth: 如 "40GiB/s", "100Gb/s", "1.5GB/s"
+
+    Returns:
+        float: 字节/秒
+    """
+    value = bandwidth.strip()
+    if value.endswith("/s"):
+        value = value[:-2]
+    units = [("KiB", 1024), ("MiB", 1024**2), ("GiB", 1024**3), ("TiB", 1024**4),
+             ("KB", 1e3), ("MB", 1e6), ("GB", 1e9), ("TB", 1e12), ("B", 1),
+             ("Kib", 1024 / 8), ("Mib", 1024**2 / 8), ("Gib", 1024**3 / 8),
+             ("Kb", 1e3 / 8), ("Mb", 1e6 / 8), ("Gb", 1e9 / 8), ("b", 1 / 8)]
+    for unit, scale in units:
+        if value.endswith(unit):
+            return float(value[:-len(unit)]) * scale
+    raise ValueError(f"无法解析带宽: {bandwidth}")
+
+
+class SyntheticTrafficGenerator:
+    """
+    合成流量生成器
+
+    将TrafficConfig解释为每个节点的目标分布、消息大小分布和注入过程
+    逻辑引擎每周期调用 should_inject/pick_destination/pick_size 注入数据包，
+    实际发送后调用 record_injection 计入每节点包数上限 (无有效目标的注入不计数)；
+    SST端点通过 sst_endpoint_params 得到等价的 merlin.trafficgen 参数
+    """
+    
+    def __init__(self, traffic_config: TrafficConfig, topology_config: TopoConfig,
+                 rng: Optional[random.Random] = None,
+                 node_rngs: Optional[List[random.Random]] = None):
+        """
+        初始化合成流量生成器
+        
+        Args:
+            traffic_config: 流量配置
+            topology_config: 拓扑配置
+            rng: 随机数生成器，None时新建
+            node_rngs: 每个节点独立的随机数流 (按节点ID索引)，设置后各节点的抽样互不影响
+        """
+        self.traffic_config = traffic_config
+        self.topology_config = topology_config
+        self.rng = rng if rng is not None else random.Random()
+        self.node_rngs = node_rngs
+        self.num_nodes = topology_config.mesh_size_x * topology_config.mesh_size_y
+        self.injected: Dict[int, int] = {}   # 各节点已实际发送的包数 (用于packets_per_node上限)
+        
+        if (traffic_config.pattern == TrafficPattern.TRANSPOSE
+                and topology_config.mesh_size_x != topology_config.mesh_size_y):
+            raise ValueError(f"转置流量模式要求方形网格 (当前 {topology_config.mesh_size_x}×"
+                             f"{topology_config.mesh_size_y})，非方形时 (x, y) -> (y, x) 不是置换")
+        for target in traffic_config.hotspot_targets:
+            if not 0 <= target < self.num_nodes:
+                raise ValueError(f"热点节点 {target} 超出范围 (0-{self.num_nodes - 1})")
+        if traffic_config.pattern == TrafficPattern.HOTSPOT and not traffic_config.hotspot_targets:
+            raise ValueError("热点流量模式需要至少一个热点节点 (hotspot_targets)")
+        if traffic_config.message_size_min > traffic_config.message_size_max:
+            raise ValueError("message_size_min 不能大于 message_size_max")
+    
+    def fixed_destination(self, node_id: int) -> Optional[int]:
+        """
+        置换类流量模式的固定目标节点
+        
+        Returns:
+            int: 目标节点ID；随机类模式或目标为自身时返回None
+        """
+        size_x = self.topology_config.mesh_size_x
+        size_y = self.topology_config.mesh_size_y
+        x, y = node_id % size_x, node_id // size_x
+        pattern = self.traffic_config.pattern
+        
+        if pattern == TrafficPattern.TRANSPOSE:
+            dest = (y, x)
+        elif pattern == TrafficPattern.BIT_COMPLEMENT:
+            dest = (size_x - 1 - x, size_y - 1 - y)
+        elif pattern == TrafficPattern.TORNADO:
+            dest = ((x + (size_x + 1) // 2 - 1) % size_x, (y + (size_y + 1) // 2 - 1) % size_y)
+        elif pattern == TrafficPattern.NEIGHBOR:
+            dest = ((x + 1) % size_x, y)
+        else:
+            return None
+        
+        dest_id = dest[1] * size_x + dest[0]
+        return dest_id if dest_id != node_id else None
+    
+    def is_permutation(self) -> bool:
+        """流量模式是否为置换 (每个节点固定一个目标)"""
+        return self.traffic_config.pattern not in (TrafficPattern.UNIFORM, TrafficPattern.HOTSPOT)
+    
+    def node_rng(self, node_id: Optional[int]) -> random.Random:
+        """节点的随机数流 (未设置每节点流时为共享的rng)"""
+        return self.node_rngs[node_id] if self.node_rngs is not None and node_id is not None else self.rng
+    
+    def pick_destination(self, node_id: int) -> Optional[int]:
+        """按流量模式选择目标节点，无有效目标时返回None"""
+        if self.is_permutation():
+            return self.fixed_destination(node_id)
+        
+        config = self.traffic_config
+        rng = self.node_rng(node_id)
+        if config.pattern == TrafficPattern.HOTSPOT and rng.random() < config.hotspot_fraction:
+            dest_id = rng.choice(config.hotspot_targets)
+            return dest_id if dest_id != node_id else None
+        
+        if self.num_nodes < 2:
+            return None
+        dest_id = rng.randrange(self.num_nodes - 1)
+        return dest_id if dest_id < node_id else dest_id + 1
+    
+    def draw_destinations(self, node_id: int, count: int) -> List[int]:
+        """一次抽取count个数据包的目标节点 (功能快进用)，无有效目标的抽样被丢弃"""
+        if self.is_permutation():
+            dest_id = self.fixed_destination(node_id)
+            return [dest_id] * count if dest_id is not None else []
+        if self.traffic_config.pattern == TrafficPattern.UNIFORM and self.num_nodes >= 2:
+            others = [dest_id for dest_id in range(self.num_nodes) if dest_id != node_id]
+            return self.node_rng(node_id).choices(others, k=count)
+        destinations = (self.pick_destination(node_id) for _ in range(count))
+        return [dest_id for dest_id in destinations if dest_id is not None]
+    
+    def draw_sizes(self, node_id: int, count: int) -> List[int]:
+        """一次抽取count个数据包的消息大小 (字节)，固定大小时不消耗随机数"""
+        config = self.traffic_config
+        if config.message_size_min == config.message_size_max:
+            return [config.message_size_min] * count
+        return [self.pick_size(node_id) for _ in range(count)]
+    
+    def pick_size(self, node_id: Optional[int] = None) -> int:
+        """按均匀分布选择消息大小 (字节)"""
+        return self.node_rng(node_id).randint(self.traffic_config.message_size_min,
+                                              self.traffic_config.message_size_max)
+    
+    def remaining_budget(self, node_id: int) -> Optional[int]:
+        """节点在每节点包数上限内还可发送的包数，未设上限时返回None"""
+        budget = self.traffic_config.packets_per_node
+        if not budget:
+            return None
+        return max(budget - self.injected.get(node_id, 0), 0)
+    
+    def record_injection(self, node_id: int, count: int = 1):
+        """记录节点实际发送的数据包 (计入每节点包数上限)"""
+        self.injected[node_id] = self.injected.get(node_id, 0) + count
+    
+    def should_inject(self, node_id: int) -> bool:
+        """按注入率 (伯努利过程) 和每节点包数上限决定本周期是否注入 (不计数，见record_injection)"""
+        if self.remaining_budget(node_id) == 0:
+            return False
+        return self.node_rng(node_id).random() < self.traffic_config.injection_rate
+    
+    def draw_injections(self, node_id: int, cycles: int) -> int:
+        """
+        一次抽取节点在cycles个周期内的注入次数 (功能快进用，不计数)
+        
+        伯努利过程相邻两次注入之间的空闲周期数服从几何分布，逐次抽取间隔
+        而非逐周期抽样，开销与注入次数而非周期数成正比。每次注入都有有效目标时
+        结果以剩余包数上限为界；热点节点自身可能被抽为目标 (该次注入被丢弃且不计数)，
+        此时不设界，由调用方按剩余上限截取有效目标
+        """
+        rate = self.traffic_config.injection_rate
+        limit = cycles
+        remaining = self.remaining_budget(node_id)
+        if remaining is not None and not (self.traffic_config.pattern == TrafficPattern.HOTSPOT
+                                          and node_id in self.traffic_config.hotspot_targets):
+            limit = min(limit, remaining)
+        if limit <= 0 or rate <= 0:
+            return 0
+        if rate >= 1:
+            count = limit
+        else:
+            rng = self.node_rng(node_id)
+            log_miss = math.log1p(-rate)
+            count = 0
+            cycle = int(math.log(1.0 - rng.random()) / log_miss)
+            while cycle < cycles and count < limit:
+                count += 1
+                cycle += 1 + int(math.log(1.0 - rng.random()) / log_miss)
+        return count
+    
+    def mean_message_size(self) -> float:
+        """平均消息大小 (字节)"""
+        return (self.traffic_config.message_size_min + self.traffic_config.message_size_max) / 2
+    
+    def sst_endpoint_params(self, node_id: int, link_bandwidth: str) -> Dict[str, str]:
+        """
+        生成 merlin.trafficgen 端点参数
+        
+        置换模式使用范围为单个节点的均匀目标分布 (RangeMin == RangeMax)；
+        热点模式使用trafficgen的HotSpot分布 (仅支持一个热点目标，多个目标时取第一个并合并概率，
+        两个后端的负载不再相同，verify_endpoint_params会报告该不一致)；
+        提供负载换算为发包频率: 负载 × 链路带宽 / 平均消息大小
+        
+        Args:
+            node_id: 节点ID
+            link_bandwidth: 链路带宽字符串
+        
+        Returns:
+            Dict: 端点参数
+        """
+        config = self.traffic_config
+        packets_to_send = config.packets_per_node
+        dest_min, dest_max = 0, self.num_nodes - 1
+        
+        params = {
+            "id": node_id,
+            "num_peers": str(self.num_nodes),
+            "num_vns": "1",
+            "link_bw": link_bandwidth,
+        }
+        
+        if self.is_permutation():
+            dest_id = self.fixed_destination(node_id)
+            if dest_id is None:
+                packets_to_send = 0
+                dest_id = node_id
+            params["PacketDest:pattern"] = "Uniform"
+            dest_min = dest_max = dest_id
+        elif config.pattern == TrafficPattern.HOTSPOT:
+            params["PacketDest:pattern"] = "HotSpot"
+            params["PacketDest:HotSpot:target"] = str(config.hotspot_targets[0])
+            params["PacketDest:HotSpot:targetProbability"] = f"{config.hotspot_fraction:.6g}"
+        else:
+            params["PacketDest:pattern"] = "Uniform"
+        params["PacketDest:RangeMin"] = str(dest_min)
+        params["PacketDest:RangeMax"] = str(dest_max)
+        
+        params["packet_size"] = f"{config.message_size_min}B"
+        if config.message_size_max != config.message_size_min:
+            params["PacketSize:pattern"] = "Uniform"
+            params["PacketSize:RangeMin"] = f"{config.message_size_min}B"
+            params["PacketSize:RangeMax"] = f"{config.message_size_max}B"
+        
+        rate_hz = config.injection_rate * _parse_bandwidth(link_bandwidth) / self.mean_message_size()
+        params["message_rate"] = f"{rate_hz / 1e6:.6g}MHz"
+        params["packets_to_send"] = str(packets_to_send)
+        return params
+    
+    def verify_endpoint_params(self, node_id: int, params: Dict[str, Any], link_bandwidth: str) -> List[str]:
+        """
+        反向解析端点参数并与逻辑引擎的流量定义对比
+        
+        Args:
+            node_id: 节点ID
+            params: 端点参数 (例如sst_standin记录的组件参数)
+            link_bandwidth: 链路带宽字符串
+        
+        Returns:
+            List[str]: 发现的不一致问题，空列表表示一致
+        """
+        problems = []
+        config = self.traffic_config
+        
+        dest_pattern = params.get("PacketDest:pattern")
+        dest_range = (int(params.get("PacketDest:RangeMin", -1)), int(params.get("PacketDest:RangeMax", -1)))
+        if self.is_permutation():
+            expected = self.fixed_destination(node_id)
+            if expected is None:
+                if int(params.get("packets_to_send", -1)) != 0:
+                    problems.append(f"节点{node_id}: 无有效目标但仍会发包")
+            elif dest_pattern != "Uniform" or dest_range != (expected, expected):
+                problems.append(f"节点{node_id}: 目标 {dest_pattern}{dest_range} 应为固定节点 {expected}")
+        else:
+            if dest_range != (0, self.num_nodes - 1):
+                problems.append(f"节点{node_id}: 目标范围 {dest_range} 应覆盖全部节点")
+            if config.pattern == TrafficPattern.HOTSPOT:
+                if len(config.hotspot_targets) > 1:
+                    problems.append(f"节点{node_id}: merlin.trafficgen的HotSpot分布只支持一个热点目标，"
+                                    f"配置了 {len(config.hotspot_targets)} 个 (SST端全部热点流量发往 "
+                                    f"{config.hotspot_targets[0]})")
+                elif (dest_pattern != "HotSpot" or
+                        int(params.get("PacketDest:HotSpot:target", -1)) != config.hotspot_targets[0]):
+                    problems.append(f"节点{node_id}: 热点目标配置不一致")
+                elif abs(float(params.get("PacketDest:HotSpot:targetProbability", -1)) - config.hotspot_fraction) > 1e-6:
+                    problems.append(f"节点{node_id}: 热点概率配置不一致")
+            elif dest_pattern != "Uniform":
+                problems.append(f"节点{node_id}: 目标分布 {dest_pattern} 应为 Uniform")
+        
+        size_min = int(str(params.get("PacketSize:RangeMin", params.get("packet_size", "0B"))).rstrip("B"))
+        size_max = int(str(params.get("PacketSize:RangeMax", params.get("packet_size", "0B"))).rstrip("B"))
+        if (size_min, size_max) != (config.message_size_min, config.message_size_max):
+            problems.append(f"节点{node_id}: 消息大小 {size_min}-{size_max}B 与配置不一致")
+        
+        rate = str(params.get("message_rate", "0MHz"))
+        rate_hz = float(rate[:-3]) * 1e6 if rate.endswith("MHz") else math.nan
+        offered_load = rate_hz * self.mean_message_size() / _parse_bandwidth(link_bandwidth)
+        if not abs(offered_load - config.injection_rate) <= 1e-4 * max(config.injection_rate, 1e-9):
+            problems.append(f"节点{node_id}: 发包频率对应负载 {offered_load:.6g}，配置为 {config.injection_rate}")
+        
+        return problems
+
+
 # =============================================================================
 # Miranda CPU节点实现
 # =============================================================================
@@ -331,6 +1781,13 @@ class MirandaCPUNode:
                  link_bandwidth: str = "40GiB/s",
                  link_latency: str = "50ps",
                  stats_manager=None,
+                 stats_profile: Optional[StatisticsProfile] = None,
+                 stats_rate: Optional[str] = None,
+                 traffic_generator: Optional[SyntheticTrafficGenerator] = None,
+                 routing_rng: Optional[random.Random] = None,
+                 name_suffix: str = "m0",
+                 events: Optional["EventLog"] = None,
+                 latency_breakdown: Optional[LatencyBreakdown] = None,
                  verbose: bool = True):
         """
         初始化Miranda CPU节点
@@ -345,6 +1802,13 @@ class MirandaCPUNode:
             link_bandwidth: 链路带宽
             link_latency: 链路延迟
             stats_manager: 统计管理器
+            stats_profile: SST统计档案，None时不启用SST统计
+            stats_rate: 统计输出间隔，None时使用档案默认值
+            traffic_generator: 合成流量生成器，设置后SST端点使用merlin.trafficgen
+            routing_rng: 路由随机决策 (中间节点、维序、平局方向) 的随机数流，None时新建
+            name_suffix: SST组件和链路名称后缀 (同一进程中的多个网格互不冲突)
+            events: 结构化事件日志，None时verbose模式输出到控制台，否则不记录
+            latency_breakdown: 延迟分解聚合 (网格内共享)，None时新建
             verbose: 是否打印详细信息
         """
         # 基本属性
@@ -359,11 +1823,21 @@ class MirandaCPUNode:
         self.memory_size = memory_size
         self.link_bandwidth = link_bandwidth
         self.link_latency = link_latency
+        self.name_suffix = name_suffix
         self.verbose = verbose
+        self.events = events if events is not None else (EventLog.console_log() if verbose else NO_EVENTS)
         
         # 路由器和统计管理器
-        self.logical_router = MultiTopologyRouter(node_id, position, topology_config)
+        self.logical_router = MultiTopologyRouter(node_id, position, topology_config, rng=routing_rng)
+        self.switch_allocator = (SeparableSwitchAllocator(topology_config.switch_allocator,
+                                                          topology_config.virtual_channels,
+                                                          topology_config.islip_iterations,
+                                                          topology_config.ejection_rate)
+                                 if topology_config.switch_allocator != AllocatorType.IDEAL else None)
         self.stats_manager = stats_manager
+        self.stats_profile = stats_profile
+        self.stats_rate = stats_rate
+        self.traffic_generator = traffic_generator
         
         # 邻居节点连接映射
         self.neighbors: Dict[Direction, Optional['MirandaCPUNode']] = {
@@ -373,10 +1847,19 @@ class MirandaCPUNode:
             Direction.WEST: None,
         }
         
-        # 网络队列管理
+        # 网络队列管理 (每个输出方向按虚拟通道划分FIFO)
         self.input_queue: List[Packet] = []
-        self.output_queues: Dict[Direction, List[Packet]] = {
-            direction: [] for direction in Direction
+        self.output_queues: Dict[Direction, List[List[Packet]]] = {
+            direction: [[] for _ in range(topology_config.virtual_channels)] for direction in Direction
+        }
+        self.buffer_depth = topology_config.buffer_depth
+        self.occupancy_monitor: Optional["OccupancyMonitor"] = None   # 输出端口占用监测 (网格启用时设置)
+        self._vc_round_robin: Dict[Direction, int] = {direction: 0 for direction in Direction}
+        
+        # 输入端口虚拟通道队列 (仅非理想交换分配器使用，本地注入使用input_queue)
+        self.input_ports: Dict[Direction, List[List[Packet]]] = {
+            direction: [[] for _ in range(topology_config.virtual_channels)]
+            for direction in Direction if direction != Direction.LOCAL
         }
         
         # SST仿真组件引用
@@ -391,6 +1874,7 @@ class MirandaCPUNode:
         self.packets_sent = 0
         self.packets_received = 0
         self.packets_forwarded = 0
+        self.link_traversals = 0        # 经链路发往邻居节点的数据包数 (看门狗进展计数)
         self.bytes_sent = 0
         self.bytes_received = 0
         self.bytes_forwarded = 0
@@ -407,18 +1891,38 @@ class MirandaCPUNode:
         
         # 延迟统计
         self.packet_latencies = []
+        self.packet_latency_cycles = []
         self.total_hop_count = 0
+        self.total_minimal_hops = 0     # 已接收数据包的最短路径跳数之和 (用于计算路由跳数开销)
+        self.flow_stats: Dict[int, FlowStats] = {}   # 按源节点的接收流统计 (只为出现过的流分配): 源节点ID -> FlowStats
+        self.latency_breakdown = latency_breakdown if latency_breakdown is not None else LatencyBreakdown()
+        self.port_sent = {direction: 0 for direction in Direction}   # 各输出端口已发送的包数 (串行化分量)
+        
+        # 测量窗口统计 (只计测量包，由HybridMirandaMesh.run_measurement设置measuring)
+        self.measuring = False
+        self.measured_sent = 0
+        self.measured_received = 0
+        self.measured_hop_count = 0
+        self.measured_latency_cycles = []
+        
+        # 交换分配统计
+        self.switch_requests = 0
+        self.switch_grants = 0
+        self.total_switch_wait_cycles = 0
+        
+        # 当前仿真周期 (由HybridMirandaMesh在每个周期开始时更新)
+        self.current_cycle = 0
         
         # 工作负载配置
         self.workload_config = self._get_workload_config()
         
-        # SST统计
-        if self.stats_manager:
-            self._setup_sst_statistics()
-        
         # 初始化SST组件
         self._create_sst_components()
     
+        # SST统计 (需要在组件创建之后启用)
+        if self.stats_profile is not None:
+            self._setup_sst_statistics()
+    
     # =========================================================================
     # 工作负载配置方法
     # =========================================================================
@@ -468,19 +1972,33 @@ class MirandaCPUNode:
     # =========================================================================
     
     def _setup_sst_statistics(self):
-        """设置SST统计 - 简化版本"""
-        # 暂时禁用SST统计，仅使用内部计数器
-        pass
+        """
+        按统计档案为路由器和网络接口启用选定的SST统计
+
+        使用累加器统计并按固定间隔输出，只记录档案中列出的统计项
+        """
+        stat_params = {
+            "type": "sst.AccumulatorStatistic",
+            "rate": self.stats_rate or self.stats_profile.rate,
+        }
+
+        if self.stats_profile.router_statistics:
+            self.sst_router.enableStatistics(self.stats_profile.router_statistics, stat_params)
+        if self.stats_profile.linkcontrol_statistics:
+            self.netif.enableStatistics(self.stats_profile.linkcontrol_statistics, stat_params)
+
+        if self.events.construction:
+            self.events.emit(EventCategory.CONSTRUCTION, "sst_statistics", self.current_cycle, node=self.node_id,
+                             profile=self.stats_profile.name, rate=stat_params['rate'])
     
     def _create_sst_components(self):
         """创建SST组件 - 支持多种拓扑类型"""
-        if self.verbose:
-            print(f"  节点{self.node_id}({self.x},{self.y}): 创建SST组件 - {self.workload_config['description']}")
+        if self.events.construction:
+            self.events.emit(EventCategory.CONSTRUCTION, "create_components", self.current_cycle, node=self.node_id,
+                             x=self.x, y=self.y, workload=self.workload_config['description'])
         
-        # 生成唯一的组件名称
-        import time
-        timestamp = str(int(time.time() * 1000000))[-6:]
-        router_name = f"router_{self.node_id}_{timestamp}"
+        # 组件名称 (确定性后缀，不依赖时间)
+        router_name = f"router_{self.node_id}_{self.name_suffix}"
         
         # 根据拓扑类型确定端口数量
         num_ports = self._calculate_ports_for_topology()
@@ -502,15 +2020,19 @@ class MirandaCPUNode:
         # 配置拓扑子组件
         self._configure_topology_subcomponent()
         
-        # 创建端点组件
-        endpoint_name = f"endpoint_{self.node_id}_{timestamp}"
-        self.endpoint = sst.Component(endpoint_name, "merlin.test_nic")
-        self.endpoint.addParams({
-            "id": self.node_id,
-            "num_peers": str(self.topology_config.total_nodes),
-            "num_messages": "10",
-            "message_size": "64B",
-        })
+        # 创建端点组件 (配置了合成流量时使用与逻辑引擎一致的流量生成器)
+        endpoint_name = f"endpoint_{self.node_id}_{self.name_suffix}"
+        if self.traffic_generator is not None:
+            self.endpoint = sst.Component(endpoint_name, "merlin.trafficgen")
+            self.endpoint.addParams(self.traffic_generator.sst_endpoint_params(self.node_id, self.link_bandwidth))
+        else:
+            self.endpoint = sst.Component(endpoint_name, "merlin.test_nic")
+            self.endpoint.addParams({
+                "id": self.node_id,
+                "num_peers": str(self.topology_config.total_nodes),
+                "num_messages": "10",
+                "message_size": "64B",
+            })
         
         # 设置网络接口
         self.netif = self.endpoint.setSubComponent("networkIF", "merlin.linkcontrol")
@@ -521,7 +2043,7 @@ class MirandaCPUNode:
         })
         
         # 连接端点到路由器的本地端口
-        local_link_name = f"local_link_{self.node_id}_{timestamp}"
+        local_link_name = f"local_link_{self.node_id}_{self.name_suffix}"
         local_link = sst.Link(local_link_name)
         local_port = num_ports - 1  # 最后一个端口作为本地端口
         local_link.connect(
@@ -529,8 +2051,9 @@ class MirandaCPUNode:
             (self.netif, "rtr_port", self.link_latency)
         )
         
-        if self.verbose:
-            print(f"    SST路由器创建完成: {router_name} ({num_ports}端口配置)")
+        if self.events.construction:
+            self.events.emit(EventCategory.CONSTRUCTION, "router_created", self.current_cycle, node=self.node_id,
+                             router=router_name, ports=num_ports)
     
     def _calculate_ports_for_topology(self) -> int:
         """根据拓扑类型计算所需端口数量"""
@@ -560,8 +2083,9 @@ class MirandaCPUNode:
         """创建Miranda CPU组件 (可选)"""
         # 根据需要创建实际的Miranda CPU组件
         # 目前保持简化，专注于网络部分
-        if self.verbose:
-            print(f"    Miranda CPU配置: {self.workload_config['description']}")
+        if self.events.construction:
+            self.events.emit(EventCategory.CONSTRUCTION, "cpu_configured", self.current_cycle, node=self.node_id,
+                             workload=self.workload_config['description'])
         
         # 在真实SST环境中，这里会创建实际的CPU组件
         # self.cpu_core = sst.Component(f"cpu_{self.node_id}", "miranda.BaseCPU")
@@ -570,8 +2094,9 @@ class MirandaCPUNode:
     def _create_memory_hierarchy(self):
         """创建内存层次结构 - 简化版本"""
         # 在简化模式下，仅记录内存层次结构的概念
-        if self.verbose:
-            print(f"    配置内存: L1缓存({self.cache_size}) + 本地内存({self.memory_size})")
+        if self.events.construction:
+            self.events.emit(EventCategory.CONSTRUCTION, "memory_configured", self.current_cycle, node=self.node_id,
+                             cache=self.cache_size, memory=self.memory_size)
         
         # 注意：在真实SST环境中，这里会创建实际的内存组件
     
@@ -582,8 +2107,10 @@ class MirandaCPUNode:
         if self.sst_router and neighbor.sst_router:
             self._connect_sst_routers(direction, neighbor)
         
-        if self.verbose:
-            print(f"    连接: 节点{self.node_id}({self.x},{self.y}) -> {direction.value} -> 节点{neighbor.node_id}({neighbor.x},{neighbor.y})")
+        if self.events.construction:
+            self.events.emit(EventCategory.CONSTRUCTION, "connect", self.current_cycle, node=self.node_id, x=self.x, y=self.y,
+                             direction=direction.value, neighbor=neighbor.node_id,
+                             neighbor_x=neighbor.x, neighbor_y=neighbor.y)
     
     def _connect_sst_routers(self, direction: Direction, neighbor: 'MirandaCPUNode'):
         """连接SST路由器组件 - 标准Mesh/Torus端口配置"""
@@ -602,9 +2129,8 @@ class MirandaCPUNode:
         }
         
         if direction in port_map:
-            import time
-            timestamp = str(int(time.time() * 1000000))[-6:]
-            link_name = f"{self.topology_config.topology_type.value}_link_{self.node_id}_to_{neighbor.node_id}_{timestamp}"
+            link_name = (f"{self.topology_config.topology_type.value}_link_{self.node_id}_to_{neighbor.node_id}"
+                         f"_{self.name_suffix}")
             link = sst.Link(link_name)
             
             try:
@@ -613,11 +2139,12 @@ class MirandaCPUNode:
                     (neighbor.sst_router, reverse_port_map[direction], self.link_latency)
                 )
                 
-                if self.verbose:
-                    print(f"      SST链路: {port_map[direction]} <-> {reverse_port_map[direction]} ({link_name})")
+                if self.events.construction:
+                    self.events.emit(EventCategory.CONSTRUCTION, "sst_link", self.current_cycle, node=self.node_id,
+                                     port=port_map[direction], peer_port=reverse_port_map[direction], link=link_name)
             except Exception as e:
-                if self.verbose:
-                    print(f"      警告: 连接失败 - {e}")
+                if self.events.construction:
+                    self.events.emit(EventCategory.CONSTRUCTION, "sst_link_failed", self.current_cycle, node=self.node_id, error=str(e))
     
     def get_sst_router(self):
         """获取SST路由器组件引用"""
@@ -655,43 +2182,201 @@ class MirandaCPUNode:
             memory_request=memory_request,
             size_bytes=size_bytes,
             timestamp=current_time,
-            creation_time=current_time
+            creation_time=current_time,
+            injection_cycle=self.current_cycle,
+            arrival_cycle=self.current_cycle,
+            measured=self.measuring,
+            stage_cycle=self.current_cycle
         )
         self.input_queue.append(packet)
         
         # 更新发送统计
         self.packets_sent += 1
         self.bytes_sent += size_bytes
+        if self.measuring:
+            self.measured_sent += 1
         
         # 按类型统计
         packet_type = "memory_request" if memory_request else "data"
         self.traffic_by_type[packet_type]["packets"] += 1
         self.traffic_by_type[packet_type]["bytes"] += size_bytes
         
-        request_type = "内存请求" if memory_request else "数据包"
-        if self.verbose:
-            print(f"节点({self.x},{self.y})发送{request_type}{packet_id}到({destination[0]},{destination[1]}): {data} ({size_bytes}字节)")
+        if self.events.injection:
+            self.events.emit(EventCategory.INJECTION, "send", self.current_cycle, node=self.node_id,
+                             x=self.x, y=self.y, kind="内存请求" if memory_request else "数据包",
+                             packet_id=packet_id, dst_x=destination[0], dst_y=destination[1],
+                             data=data, size=size_bytes)
+    
+    def route_packets(self):
+        """
+        路由阶段: 把上一周期及更早到达的数据包从输入侧移入输出虚拟通道
+        
+        理想分配器 (无交换冲突):
+        无界缓冲时，邻居转发来的数据包进入输入队列，在下一周期的路由阶段路由；
+        有界缓冲时，数据包进入邻居节点对应输入端口的虚拟通道队列 (基于信用的流控)，
+        在下一周期按FIFO顺序路由，下一跳虚拟通道已满时阻塞其后的数据包 (反压)
+        
+        非理想分配器: 数据包进入邻居节点对应输入端口的虚拟通道队列，
+        经路由计算和交换分配后通过交叉开关进入输出虚拟通道
+        
+        本地注入的数据包在输入队列中等待
+        """
+        if self.switch_allocator is not None:
+            self._switch_allocation()
+        else:
+            # 处理输入队列中的数据包 (无法分配虚拟通道的数据包留在输入队列)
+            pending = self.input_queue
+            self.input_queue = []
+            for packet in pending:
+                if not self._route_packet(packet):
+                    self.input_queue.append(packet)
+            # 有界缓冲: 各输入虚拟通道按FIFO顺序路由
+            if self.buffer_depth:
+                for vc_queues in self.input_ports.values():
+                    for queue in vc_queues:
+                        while queue and self._route_packet(queue[0]):
+                            queue.pop(0)
+    
+    def forward_packets(self):
+        """
+        转发阶段: 把输出虚拟通道队首的数据包经链路送到邻居节点的输入侧
+        
+        网格在所有节点完成路由阶段后才执行转发阶段，本周期转发的数据包最早在
+        下一周期的路由阶段被邻居处理，因此每个数据包每周期至多前进一跳，
+        结果与节点处理顺序无关
+        """
+        # 每个方向每周期一个，在虚拟通道间轮询
+        for direction, vc_queues in self.output_queues.items():
+            if direction == Direction.LOCAL:
+                continue
+            neighbor = self.neighbors[direction]
+            if not neighbor:
+                continue
+            num_vcs = len(vc_queues)
+            for offset in range(num_vcs):
+                vc = (self._vc_round_robin[direction] + offset) % num_vcs
+                if vc_queues[vc] and self._forward_packet(direction, vc_queues[vc], neighbor):
+                    self._vc_round_robin[direction] = (vc + 1) % num_vcs
+                    break
     
     def process_packets(self):
-        """处理数据包队列 - 简化版本"""
-        # 处理输入队列中的数据包
-        while self.input_queue:
-            packet = self.input_queue.pop(0)
-            self._route_packet(packet)
-            
-        # 转发输出队列中的数据包到邻居节点
-        for direction, queue in self.output_queues.items():
-            if queue and direction != Direction.LOCAL:
-                neighbor = self.neighbors[direction]
-                if neighbor:
-                    packet = queue.pop(0)
-                    neighbor.input_queue.append(packet)
-                    packet.hop_count += 1
-    
-    def _route_packet(self, packet: Packet):
-        """路由数据包 - 使用逻辑路由器进行路由决策，包含流量统计"""
-        next_direction = self.logical_router.route_packet(packet)
+        """
+        处理一个周期的数据包 (路由阶段 + 转发阶段)，保留供逐节点驱动的旧代码使用
+        
+        网格的simulate_step对所有节点先执行route_packets再统一执行forward_packets；
+        逐节点调用本方法时，转发给尚未处理的节点的数据包可能在同一周期内再次前进
+        """
+        self.route_packets()
+        self.forward_packets()
+    
+    def _forward_packet(self, direction: Direction, queue: List[Packet], neighbor: 'MirandaCPUNode') -> bool:
+        """将虚拟通道队首数据包转发给邻居节点，下游无空闲缓冲时返回False"""
+        packet = queue[0]
+        if self.switch_allocator is None and self.buffer_depth == 0:
+            # 理想分配器无界缓冲: 进入邻居的输入队列
+            input_vc = neighbor.input_queue
+        else:
+            # 进入邻居输入端口的同号虚拟通道 (基于信用的流控)
+            input_vc = neighbor.input_ports[OPPOSITE_DIRECTIONS[direction]][packet.vc]
+            if self.buffer_depth and len(input_vc) >= self.buffer_depth:
+                return False
+        self._account_output_wait(packet, direction)
+        packet.arrival_cycle = self.current_cycle
+        input_vc.append(packet)
+        packet.hop_count += 1
+        queue.pop(0)
+        if self.occupancy_monitor is not None:
+            self.occupancy_monitor.dequeue(self.node_id, direction, self.current_cycle)
+        self.port_sent[direction] += 1
+        self.link_traversals += 1
+        return True
+    
+    def _account_output_wait(self, packet: Packet, direction: Direction):
+        """数据包离开输出虚拟通道: 等待周期计入串行化 (同端口其他包发送) 和争用"""
+        wait = self.current_cycle - packet.stage_cycle
+        serialization = min(self.port_sent[direction] - packet.port_mark, wait)
+        packet.serialization_cycles += serialization
+        packet.contention_cycles += wait - serialization
+        packet.stage_cycle = self.current_cycle
+    
+    def _account_input_wait(self, packet: Packet):
+        """
+        数据包离开注入队列或输入端口: 等待周期计入路由器流水线、链路传输和源端排队/争用
+        
+        所有分配器下转发的数据包均在下一周期才于邻居输入侧路由，该周期即链路传输
+        (每跳恰为1周期)；路由器流水线为源路由器的1个注入周期
+        """
+        wait = self.current_cycle - packet.stage_cycle
+        if packet.hop_count == 0:
+            # 注入的数据包最早在下一周期进入路由器
+            pipeline = min(wait, 1)
+            packet.pipeline_cycles += pipeline
+            packet.source_queueing_cycles += wait - pipeline
+        else:
+            link = min(wait, 1)
+            packet.link_cycles += link
+            packet.contention_cycles += wait - link
+        packet.stage_cycle = self.current_cycle
+    
+    def _input_vc_queues(self, port: Direction) -> List[List[Packet]]:
+        """输入端口的虚拟通道队列 (本地注入端口为单个input_queue)"""
+        return [self.input_queue] if port == Direction.LOCAL else self.input_ports[port]
+    
+    def _switch_allocation(self):
+        """
+        路由器微结构: 路由计算 -> 交换分配 -> 交叉开关传输
+        
+        每个输入虚拟通道仅队首数据包参与分配 (队头阻塞)，本周期到达的数据包
+        下一周期才参与；下一跳缓冲已满的数据包不发出请求
+        """
+        occupancy = self.port_occupancy()
+        requests: Dict[Tuple[Direction, int], Direction] = {}
+        for port in Direction:
+            for vc, queue in enumerate(self._input_vc_queues(port)):
+                if not queue or queue[0].arrival_cycle >= self.current_cycle:
+                    continue
+                packet = queue[0]
+                direction = self.logical_router.route_packet(packet, occupancy)
+                if direction != Direction.LOCAL and self._allocate_vc(packet, direction) is None:
+                    continue
+                requests[(port, vc)] = direction
+        
+        self.switch_requests += len(requests)
+        for port, vc in self.switch_allocator.allocate(requests):
+            packet = self._input_vc_queues(port)[vc].pop(0)
+            packet.switch_wait_cycles += self.current_cycle - packet.arrival_cycle - 1
+            self._deliver_packet(packet, requests[(port, vc)])
+            self.switch_grants += 1
+    
+    def _allocate_vc(self, packet: Packet, direction: Direction) -> Optional[int]:
+        """为数据包分配下一跳输出虚拟通道 (可用通道中占用最少者)，全部已满时返回None"""
+        vc_queues = self.output_queues[direction]
+        best_vc = None
+        for vc in self.logical_router.allowed_vcs(packet, direction):
+            occupancy = len(vc_queues[vc])
+            if self.buffer_depth and occupancy >= self.buffer_depth:
+                continue
+            if best_vc is None or occupancy < len(vc_queues[best_vc]):
+                best_vc = vc
+        return best_vc
+    
+    def port_occupancy(self) -> Dict[Direction, int]:
+        """各输出端口的队列占用 (所有虚拟通道之和)"""
+        return {direction: sum(len(queue) for queue in vc_queues)
+                for direction, vc_queues in self.output_queues.items()}
+    
+    def _route_packet(self, packet: Packet) -> bool:
+        """
+        路由数据包 - 使用逻辑路由器进行路由决策，包含流量统计
         
+        Returns:
+            bool: 数据包已被接收或放入输出虚拟通道；False表示下一跳虚拟通道已满
+        """
+        next_direction = self.logical_router.route_packet(packet, self.port_occupancy())
+        return self._deliver_packet(packet, next_direction)
+    
+    def _deliver_packet(self, packet: Packet, next_direction: Direction) -> bool:
+        """按路由结果接收数据包或放入输出虚拟通道，并更新流量统计"""
         if next_direction == Direction.LOCAL:
             # 到达目标节点
             import time
@@ -699,25 +2384,51 @@ class MirandaCPUNode:
             latency = arrival_time - packet.creation_time
             
             # 更新接收统计
+            self._account_input_wait(packet)
+            latency_cycles = self.current_cycle - packet.injection_cycle
             self.packets_received += 1
             self.bytes_received += packet.size_bytes
             self.packet_latencies.append(latency)
+            self.packet_latency_cycles.append(latency_cycles)
             self.total_hop_count += packet.hop_count
+            source_id = packet.source[1] * self.topology_config.mesh_size_x + packet.source[0]
+            flow = self.flow_stats.get(source_id)
+            if flow is None:
+                flow = self.flow_stats[source_id] = FlowStats()
+            flow.record(latency_cycles, packet.size_bytes, packet.hop_count)
+            minimal_hops = self.logical_router.minimal_hops(packet.source, packet.destination)
+            self.total_minimal_hops += minimal_hops
+            self.latency_breakdown.record(packet, minimal_hops)
+            self.total_switch_wait_cycles += packet.switch_wait_cycles
+            if packet.measured:
+                self.measured_received += 1
+                self.measured_hop_count += packet.hop_count
+                self.measured_latency_cycles.append(latency_cycles)
             
             # 按方向统计
             self.traffic_by_direction[Direction.LOCAL]["packets"] += 1
             self.traffic_by_direction[Direction.LOCAL]["bytes"] += packet.size_bytes
             
-            request_type = "内存请求" if packet.memory_request else "数据包"
-            if self.verbose:
-                print(f"节点({self.x},{self.y})接收到{request_type}{packet.packet_id}: {packet.data} (跳数: {packet.hop_count}, 延迟: {latency*1000:.2f}ms, {packet.size_bytes}字节)")
+            if self.events.ejection:
+                self.events.emit(EventCategory.EJECTION, "receive", self.current_cycle, node=self.node_id,
+                                 x=self.x, y=self.y, kind="内存请求" if packet.memory_request else "数据包",
+                                 packet_id=packet.packet_id, data=packet.data, hops=packet.hop_count,
+                                 latency_cycles=latency_cycles, latency_ms=latency * 1000, size=packet.size_bytes)
             
             # 如果是内存请求，可以触发内存层次结构的处理
             if packet.memory_request:
                 self._handle_memory_request(packet)
         else:
-            # 转发到下一跳
-            self.output_queues[next_direction].append(packet)
+            # 分配虚拟通道并转发到下一跳
+            vc = self._allocate_vc(packet, next_direction)
+            if vc is None:
+                return False
+            self._account_input_wait(packet)
+            packet.port_mark = self.port_sent[next_direction]
+            self.logical_router.commit_hop(packet, next_direction, vc)
+            self.output_queues[next_direction][vc].append(packet)
+            if self.occupancy_monitor is not None:
+                self.occupancy_monitor.enqueue(self.node_id, next_direction, self.current_cycle)
             
             # 更新转发统计
             self.packets_forwarded += 1
@@ -727,15 +2438,97 @@ class MirandaCPUNode:
             self.traffic_by_direction[next_direction]["packets"] += 1
             self.traffic_by_direction[next_direction]["bytes"] += packet.size_bytes
             
-            if self.verbose:
-                print(f"节点({self.x},{self.y})转发包{packet.packet_id}到{next_direction.value}方向 ({packet.size_bytes}字节)")
+            if self.events.routing:
+                self.events.emit(EventCategory.ROUTING, "forward", self.current_cycle, node=self.node_id,
+                                 x=self.x, y=self.y, packet_id=packet.packet_id, direction=next_direction.value,
+                                 vc=vc, size=packet.size_bytes)
+        return True
+    
+    def record_functional_send(self, size_bytes: int, packets: int = 1):
+        """功能快进: 只记录发送统计 (packets个包共size_bytes字节)，不创建数据包"""
+        self.packets_sent += packets
+        self.bytes_sent += size_bytes
+        self.traffic_by_type["data"]["packets"] += packets
+        self.traffic_by_type["data"]["bytes"] += size_bytes
+    
+    def record_functional_receive(self, size_bytes: int, packets: int = 1):
+        """功能快进: 只记录接收统计 (packets个包共size_bytes字节)，不计入延迟和跳数"""
+        self.packets_received += packets
+        self.bytes_received += size_bytes
+        self.traffic_by_direction[Direction.LOCAL]["packets"] += packets
+        self.traffic_by_direction[Direction.LOCAL]["bytes"] += size_bytes
+    
+    def take_queued_packets(self) -> List[Packet]:
+        """取出并清空节点上所有队列中的数据包"""
+        packets = self.input_queue
+        self.input_queue = []
+        for vc_queues in list(self.input_ports.values()) + list(self.output_queues.values()):
+            for queue in vc_queues:
+                packets.extend(queue)
+                queue.clear()
+        return packets
+    
+    def reset_measurement(self):
+        """清零测量统计 (开始新一轮测量前调用)"""
+        self.measuring = False
+        self.measured_sent = 0
+        self.measured_received = 0
+        self.measured_hop_count = 0
+        self.measured_latency_cycles = []
+    
+    def queue_snapshots(self) -> List[QueueSnapshot]:
+        """
+        非空队列快照 (停滞诊断用)
+        
+        对每个非空队列记录队首数据包以及它等待的下游队列: 输入侧等待本节点的
+        输出虚拟通道，输出侧等待邻居节点的输入虚拟通道 (有界缓冲或非理想分配器)
+        """
+        snapshots = []
+        input_side = [("inject", self.input_queue)]
+        uses_input_ports = self.switch_allocator is not None or self.buffer_depth > 0
+        if uses_input_ports:
+            input_side += [(f"in:{port.value}:vc{vc}", queue)
+                           for port, vc_queues in self.input_ports.items()
+                           for vc, queue in enumerate(vc_queues)]
+        for name, queue in input_side:
+            if queue:
+                snapshots.append(self._queue_snapshot(name, queue, self._next_hop_queue(queue[0])))
+        
+        for direction, vc_queues in self.output_queues.items():
+            neighbor = self.neighbors.get(direction)
+            for vc, queue in enumerate(vc_queues):
+                if not queue:
+                    continue
+                waits_for = None
+                if neighbor is not None and uses_input_ports:
+                    waits_for = (neighbor.node_id, f"in:{OPPOSITE_DIRECTIONS[direction].value}:vc{queue[0].vc}")
+                snapshots.append(self._queue_snapshot(f"out:{direction.value}:vc{vc}", queue, waits_for))
+        return snapshots
+    
+    def _queue_snapshot(self, name: str, queue: List[Packet],
+                        waits_for: Optional[Tuple[int, str]]) -> QueueSnapshot:
+        head = queue[0]
+        return QueueSnapshot(self.node_id, self.position, name, len(queue), head.packet_id,
+                             head.source, head.destination, head.hop_count, head.injection_cycle,
+                             waits_for)
+    
+    def _next_hop_queue(self, packet: Packet) -> Optional[Tuple[int, str]]:
+        """数据包在本节点将进入的输出虚拟通道 (无副作用地试算路由，弹出时返回None)"""
+        probe, direction = self.logical_router.peek_route(packet, self.port_occupancy())
+        if direction == Direction.LOCAL:
+            return None
+        vc = self._allocate_vc(probe, direction)
+        if vc is None:
+            vc = self.logical_router.allowed_vcs(probe, direction)[0]
+        return (self.node_id, f"out:{direction.value}:vc{vc}")
     
     def _handle_memory_request(self, packet: Packet):
         """处理内存请求"""
         # 这里可以添加与SST内存层次结构的交互逻辑
         # 例如触发缓存访问、内存访问等
-        if self.verbose:
-            print(f"  节点({self.x},{self.y})处理内存请求: {packet.data}")
+        if self.events.ejection:
+            self.events.emit(EventCategory.EJECTION, "memory_request", self.current_cycle, node=self.node_id,
+                             x=self.x, y=self.y, packet_id=packet.packet_id, data=packet.data)
     
     def simulate_cpu_cycle(self):
         """模拟CPU周期 - 简化版本"""
@@ -745,6 +2538,10 @@ class MirandaCPUNode:
         """获取节点信息 - 包含详细流量统计"""
         avg_latency = sum(self.packet_latencies) / len(self.packet_latencies) if self.packet_latencies else 0
         avg_hop_count = self.total_hop_count / self.packets_received if self.packets_received > 0 else 0
+        hop_overhead = self.total_hop_count / self.total_minimal_hops if self.total_minimal_hops > 0 else 1.0
+        avg_switch_wait = self.total_switch_wait_cycles / self.packets_received if self.packets_received > 0 else 0
+        avg_latency_cycles = (sum(self.packet_latency_cycles) / len(self.packet_latency_cycles)
+                              if self.packet_latency_cycles else 0)
         
         return {
             "position": self.position,
@@ -759,12 +2556,541 @@ class MirandaCPUNode:
             "total_packets": self.packets_sent + self.packets_received + self.packets_forwarded,
             "total_bytes": self.bytes_sent + self.bytes_received + self.bytes_forwarded,
             "avg_latency_ms": avg_latency * 1000,
+            "avg_latency_cycles": avg_latency_cycles,
             "avg_hop_count": avg_hop_count,
+            "hop_overhead": hop_overhead,
+            "avg_switch_wait_cycles": avg_switch_wait,
             "traffic_by_direction": self.traffic_by_direction.copy(),
             "traffic_by_type": self.traffic_by_type.copy()
         }
 
 
+# =============================================================================
+# 结构化事件日志
+# =============================================================================
+
+class EventLevel(Enum):
+    """事件级别"""
+    DEBUG = 10      # 逐包/逐跳/逐周期事件
+    INFO = 20       # 构建过程事件
+    WARNING = 30    # 运行中的拥塞告警
+
+
+class EventCategory(Enum):
+    """事件类别 (值同时是EventLog上对应开关属性的名称)"""
+    INJECTION = "injection"         # 数据包注入
+    ROUTING = "routing"             # 逐跳转发
+    EJECTION = "ejection"           # 数据包弹出和内存请求处理
+    CONSTRUCTION = "construction"   # 组件创建和节点连接
+    SIMULATION = "simulation"       # 模拟周期
+    CONGESTION = "congestion"       # 端口占用告警 (OccupancyMonitor)
+
+
+# 各类别事件的级别
+CATEGORY_LEVELS: Dict[EventCategory, EventLevel] = {
+    EventCategory.INJECTION: EventLevel.DEBUG,
+    EventCategory.ROUTING: EventLevel.DEBUG,
+    EventCategory.EJECTION: EventLevel.DEBUG,
+    EventCategory.CONSTRUCTION: EventLevel.INFO,
+    EventCategory.SIMULATION: EventLevel.DEBUG,
+    EventCategory.CONGESTION: EventLevel.WARNING,
+}
+
+# 文本格式的事件模板 (与原verbose输出一致)
+EVENT_TEXT: Dict[str, str] = {
+    "send": "节点({x},{y})发送{kind}{packet_id}到({dst_x},{dst_y}): {data} ({size}字节)",
+    "receive": "节点({x},{y})接收到{kind}{packet_id}: {data} (跳数: {hops}, 延迟: {latency_ms:.2f}ms, {size}字节)",
+    "forward": "节点({x},{y})转发包{packet_id}到{direction}方向 ({size}字节)",
+    "memory_request": "  节点({x},{y})处理内存请求: {data}",
+    "create_node": "创建混合节点{node}({x},{y}) - SST路由器ID: {node}",
+    "create_components": "  节点{node}({x},{y}): 创建SST组件 - {workload}",
+    "sst_statistics": "    SST统计: 档案'{profile}' (间隔 {rate})",
+    "router_created": "    SST路由器创建完成: {router} ({ports}端口配置)",
+    "cpu_configured": "    Miranda CPU配置: {workload}",
+    "memory_configured": "    配置内存: L1缓存({cache}) + 本地内存({memory})",
+    "connect": "    连接: 节点{node}({x},{y}) -> {direction} -> 节点{neighbor}({neighbor_x},{neighbor_y})",
+    "sst_link": "      SST链路: {port} <-> {peer_port} ({link})",
+    "sst_link_failed": "      警告: 连接失败 - {error}",
+    "cycle": "\n--- 时钟周期 {step} ---",
+    "congestion_alert": "⚠️ 拥塞告警: 节点({x},{y}) {direction}端口占用 ≥ {threshold_pct:.0f}% 已持续 {duration} 周期 "
+                        "(当前 {occupancy}/{capacity}, EWMA {ewma:.2f})",
+}
+
+
+class EventLog:
+    """
+    结构化事件日志
+    
+    每个事件类别对应一个布尔属性 (events.injection、events.routing ...)，调用点先检查
+    该属性再调用emit，因此被过滤的类别和级别只有一次属性读取的开销，也不构造事件参数。
+    
+    输出到文件时事件先在调用线程中按批缓冲，由后台线程格式化为JSON行 (或文本) 写入；
+    输出到控制台时同步写出，保持与其他print输出的先后顺序
+    """
+    
+    def __init__(self, path: Optional[str] = None, console: bool = False, fmt: Optional[str] = None,
+                 level: EventLevel = EventLevel.DEBUG, categories: Optional[List[EventCategory]] = None,
+                 sample_rates: Optional[Dict[EventCategory, float]] = None,
+                 batch_size: int = 4096, seed: int = 0):
+        """
+        Args:
+            path: 输出文件路径 (后台线程写入)
+            console: 同步写到当前标准输出 (path为None时)
+            fmt: "jsonl" 或 "text"，默认文件为jsonl、控制台为text
+            level: 最低事件级别
+            categories: 启用的事件类别，None表示全部
+            sample_rates: 按类别的采样率 (0, 1]，未列出的类别全部记录
+            batch_size: 文件输出时每批交给后台线程的事件数
+            seed: 采样随机数种子 (独立于仿真随机数流)
+        """
+        fmt = fmt or ("jsonl" if path is not None else "text")
+        if fmt not in ("jsonl", "text"):
+            raise ValueError(f"未知的事件日志格式: {fmt} (可选: jsonl, text)")
+        if batch_size <= 0:
+            raise ValueError(f"batch_size必须为正数: {batch_size}")
+        self.fmt = fmt
+        self.level = level
+        self.categories = set(categories) if categories is not None else set(EventCategory)
+        self.sample_rates: Dict[EventCategory, float] = {}
+        for category, rate in (sample_rates or {}).items():
+            if not 0 < rate <= 1:
+                raise ValueError(f"采样率必须在(0, 1]内: {category.value}={rate}")
+            if rate < 1:
+                self.sample_rates[EventCategory(category)] = rate
+        self.batch_size = batch_size if path is not None else 1
+        self.emitted = 0
+        self.sampled_out = 0
+        self._rng = random.Random(seed)
+        self._buffer: List[tuple] = []
+        self._file = None
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._console = console and path is None
+        
+        has_sink = path is not None or self._console
+        for category in EventCategory:
+            enabled = (has_sink and category in self.categories
+                       and CATEGORY_LEVELS[category].value >= level.value)
+            setattr(self, category.value, enabled)
+        
+        if path is not None:
+            self._file = open(path, "w", encoding="utf-8")
+            self._queue = queue.SimpleQueue()
+            self._thread = threading.Thread(target=self._writer, name="event-log-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+    
+    @classmethod
+    def console_log(cls) -> "EventLog":
+        """verbose模式默认日志: 全部类别以文本格式同步写到标准输出"""
+        return cls(console=True)
+    
+    def emit(self, category: EventCategory, event: str, cycle: int, **fields):
+        """记录一个事件 (调用前应已检查对应类别开关)"""
+        rate = self.sample_rates.get(category)
+        if rate is not None and self._rng.random() >= rate:
+            self.sampled_out += 1
+            return
+        self.emitted += 1
+        self._buffer.append((category.value, event, cycle, fields))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+    
+    def _format(self, record: tuple) -> str:
+        category, event, cycle, fields = record
+        if self.fmt == "text":
+            template = EVENT_TEXT.get(event)
+            return (template.format(**fields) if template is not None
+                    else f"[{cycle}] {category}.{event} {fields}") + "\n"
+        return json.dumps({"cycle": cycle, "category": category, "event": event, **fields},
+                          ensure_ascii=False, separators=(",", ":")) + "\n"
+    
+    def _write(self, batch: List[tuple]):
+        text = "".join(self._format(record) for record in batch)
+        if self._file is not None:
+            self._file.write(text)
+        else:
+            sys.stdout.write(text)
+    
+    def _writer(self):
+        """后台写线程: 逐批格式化并写入文件，收到None时退出"""
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            self._write(batch)
+        self._file.flush()
+    
+    def flush(self):
+        """把已缓冲的事件交给写线程 (控制台输出时直接写出)"""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        if self._queue is not None:
+            self._queue.put(batch)
+        elif self._console:
+            self._write(batch)
+    
+    def close(self):
+        """写出剩余事件并结束写线程 (可重复调用)"""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._file.close()
+            atexit.unregister(self.close)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# 未配置日志且非verbose时使用的空日志 (全部类别关闭)
+NO_EVENTS = EventLog()
+
+
+# =============================================================================
+# 端口占用监测
+# =============================================================================
+
+# 被监测的输出端口 (链路方向)
+MONITORED_DIRECTIONS = [direction for direction in Direction if direction != Direction.LOCAL]
+_MONITORED_INDEX = {direction: index for index, direction in enumerate(MONITORED_DIRECTIONS)}
+
+# 占用率直方图: 按占用率等宽分为10桶 (0-10%, ..., 90-100%)，另加超过容量的一桶 (无界缓冲)
+OCCUPANCY_HISTOGRAM_BUCKETS = 10
+
+# 无界缓冲 (buffer_depth=0) 时计算占用率所用的参考缓冲深度
+UNBOUNDED_REFERENCE_DEPTH = 4
+
+
+@dataclass
+class CongestionThreshold:
+    """拥塞告警阈值: 端口占用率不低于occupancy的状态持续cycles个周期时告警"""
+    occupancy: float       # 占用率 (0, 1]，相对端口容量 (虚拟通道数 × 缓冲深度)
+    cycles: int            # 持续周期数
+    name: str = ""
+
+
+@dataclass
+class CongestionAlert:
+    """一次拥塞告警 (每个超过阈值的区间最多告警一次)"""
+    threshold: CongestionThreshold
+    node_id: int
+    position: Tuple[int, int]
+    direction: Direction
+    cycle: int             # 告警周期
+    since_cycle: int       # 开始超过阈值的周期
+    occupancy: int         # 告警时的占用 (包数)
+    capacity: int
+    ewma: float
+
+
+@dataclass
+class PortOccupancy:
+    """一个输出端口的占用摘要"""
+    node_id: int
+    position: Tuple[int, int]
+    direction: Direction
+    occupancy: int
+    ewma: float
+    mean_occupancy: float           # 按周期加权的平均占用
+    histogram: List[int]            # 各占用率分桶的周期数
+
+
+class OccupancyMonitor:
+    """
+    各节点输出端口 (MirandaCPUNode.output_queues 的所有虚拟通道之和) 的运行中占用监测
+    
+    每个周期以周期末的占用计入一次。每次入队/出队只更新该端口: 把上次变化以来的
+    周期按原占用计入直方图，按经过的周期数一次性衰减EWMA (等价于每周期末以
+    ewma_alpha采样一次)，
+    并在跨越阈值时记录区间起点；每个阈值的告警截止周期按时间顺序进入一个FIFO，
+    check()每周期只检查已到期的条目，因此开销与端口数无关
+    """
+    
+    def __init__(self, mesh_size_x: int, num_nodes: int, capacity: int,
+                 thresholds: Optional[List[CongestionThreshold]] = None, ewma_alpha: float = 0.1,
+                 callbacks: Optional[List[Callable[[CongestionAlert], None]]] = None,
+                 events: Optional[EventLog] = None, start_cycle: int = 0):
+        """
+        Args:
+            mesh_size_x: 网格X方向大小 (由节点ID换算坐标)
+            num_nodes: 节点数
+            capacity: 每个输出端口的容量 (包)
+            thresholds: 告警阈值
+            ewma_alpha: EWMA平滑系数 (0, 1]
+            callbacks: 告警回调，每次告警按顺序调用
+            events: 事件日志 (congestion类别启用时记录告警)
+            start_cycle: 开始监测时已完成的周期 (从下一周期开始计入)
+        """
+        if not 0 < ewma_alpha <= 1:
+            raise ValueError(f"ewma_alpha必须在(0, 1]内: {ewma_alpha}")
+        if capacity <= 0:
+            raise ValueError(f"端口容量必须为正数: {capacity}")
+        self.thresholds = list(thresholds or [])
+        for threshold in self.thresholds:
+            if not 0 < threshold.occupancy <= 1 or threshold.cycles < 0:
+                raise ValueError(f"无效的拥塞阈值: {threshold}")
+        self.mesh_size_x = mesh_size_x
+        self.capacity = capacity
+        self.ewma_alpha = ewma_alpha
+        self.callbacks = list(callbacks or [])
+        self.events = events if events is not None else NO_EVENTS
+        self.alerts: List[CongestionAlert] = []
+        self._decay = 1 - ewma_alpha
+        # 各阈值对应的占用包数下限
+        self._limits = [max(1, math.ceil(threshold.occupancy * capacity - 1e-9)) for threshold in self.thresholds]
+        
+        ports = num_nodes * len(MONITORED_DIRECTIONS)
+        self.occupancy = [0] * ports
+        self.ewma = [0.0] * ports
+        self.last_change = [start_cycle + 1] * ports   # 第一个尚未计入的周期
+        self.occupancy_cycles = [0] * ports     # 占用 × 周期的累计 (平均占用)
+        self.histograms = [[0] * (OCCUPANCY_HISTOGRAM_BUCKETS + 1) for _ in range(ports)]
+        self.start_cycle = start_cycle
+        self._above_since = [[-1] * ports for _ in self.thresholds]
+        self._below_cycle = [[-1] * ports for _ in self.thresholds]
+        self._pending: List[deque] = [deque() for _ in self.thresholds]
+    
+    def _bucket(self, occupancy: int) -> int:
+        return min(occupancy * OCCUPANCY_HISTOGRAM_BUCKETS // self.capacity, OCCUPANCY_HISTOGRAM_BUCKETS)
+    
+    def _advance(self, port: int, cycle: int):
+        """把上次变化以来、cycle之前的周期按原占用计入直方图、占用累计和EWMA"""
+        elapsed = cycle - self.last_change[port]
+        if elapsed > 0:
+            occupancy = self.occupancy[port]
+            self.ewma[port] = occupancy + (self.ewma[port] - occupancy) * self._decay ** elapsed
+            self.histograms[port][self._bucket(occupancy)] += elapsed
+            self.occupancy_cycles[port] += occupancy * elapsed
+            self.last_change[port] = cycle
+    
+    def enqueue(self, node_id: int, direction: Direction, cycle: int):
+        """输出端口入队一个数据包 (O(1))"""
+        port = node_id * len(MONITORED_DIRECTIONS) + _MONITORED_INDEX[direction]
+        self._advance(port, cycle)
+        occupancy = self.occupancy[port] = self.occupancy[port] + 1
+        for index, limit in enumerate(self._limits):
+            if occupancy == limit:
+                above_since = self._above_since[index]
+                # 同一周期内先出队后入队 (端口在周期末仍超过阈值) 时延续原区间
+                if above_since[port] < 0 or self._below_cycle[index][port] != cycle:
+                    above_since[port] = cycle
+                    self._pending[index].append((cycle + self.thresholds[index].cycles, port, cycle))
+    
+    def dequeue(self, node_id: int, direction: Direction, cycle: int):
+        """输出端口出队一个数据包 (O(1))"""
+        port = node_id * len(MONITORED_DIRECTIONS) + _MONITORED_INDEX[direction]
+        self._advance(port, cycle)
+        occupancy = self.occupancy[port] = self.occupancy[port] - 1
+        for index, limit in enumerate(self._limits):
+            if occupancy == limit - 1:
+                self._below_cycle[index][port] = cycle
+    
+    def check(self, cycle: int) -> List[CongestionAlert]:
+        """检查到期的阈值区间并触发告警 (每周期末调用一次)"""
+        fired = []
+        for index, pending in enumerate(self._pending):
+            limit = self._limits[index]
+            above_since = self._above_since[index]
+            while pending and pending[0][0] <= cycle:
+                _, port, since = pending.popleft()
+                if above_since[port] == since and self.occupancy[port] >= limit:
+                    fired.append(self._alert(self.thresholds[index], port, since, cycle))
+        return fired
+    
+    def _alert(self, threshold: CongestionThreshold, port: int, since: int, cycle: int) -> CongestionAlert:
+        node_id, direction_index = divmod(port, len(MONITORED_DIRECTIONS))
+        position = (node_id % self.mesh_size_x, node_id // self.mesh_size_x)
+        alert = CongestionAlert(threshold, node_id, position, MONITORED_DIRECTIONS[direction_index], cycle, since,
+                                self.occupancy[port], self.capacity, self.ewma_at(port, cycle))
+        self.alerts.append(alert)
+        if self.events.congestion:
+            self.events.emit(EventCategory.CONGESTION, "congestion_alert", cycle, node=node_id, x=position[0],
+                             y=position[1], direction=alert.direction.value, threshold=threshold.name,
+                             threshold_pct=threshold.occupancy * 100, duration=cycle - since,
+                             occupancy=alert.occupancy, capacity=self.capacity, ewma=alert.ewma)
+        for callback in self.callbacks:
+            callback(alert)
+        return alert
+    
+    def ewma_at(self, port: int, cycle: int) -> float:
+        """端口在cycle周期末的EWMA (不修改状态)"""
+        occupancy = self.occupancy[port]
+        return occupancy + (self.ewma[port] - occupancy) * self._decay ** max(cycle + 1 - self.last_change[port], 0)
+    
+    def resync(self, nodes: List["MirandaCPUNode"], cycle: int):
+        """
+        批量修改队列后 (快进、检查点恢复) 按当前队列重新设置占用
+        
+        在cycle周期末调用，新的占用从下一周期开始计入；已有的超阈值区间结束，
+        仍超过阈值的端口从下一周期开始新的区间
+        """
+        width = len(MONITORED_DIRECTIONS)
+        for node in nodes:
+            for direction, index in _MONITORED_INDEX.items():
+                port = node.node_id * width + index
+                self._advance(port, cycle + 1)
+                self.occupancy[port] = sum(len(queue) for queue in node.output_queues[direction])
+        for index, limit in enumerate(self._limits):
+            above_since = self._above_since[index]
+            for port, occupancy in enumerate(self.occupancy):
+                above_since[port] = -1
+                if occupancy >= limit:
+                    above_since[port] = cycle + 1
+                    self._pending[index].append((cycle + 1 + self.thresholds[index].cycles, port, cycle + 1))
+    
+    def port_summary(self, port: int, cycle: int) -> PortOccupancy:
+        """端口截至cycle的占用摘要 (不修改状态)"""
+        node_id, direction_index = divmod(port, len(MONITORED_DIRECTIONS))
+        occupancy = self.occupancy[port]
+        elapsed = max(cycle + 1 - self.last_change[port], 0)
+        histogram = list(self.histograms[port])
+        histogram[self._bucket(occupancy)] += elapsed
+        observed = max(cycle - self.start_cycle, 1)
+        return PortOccupancy(node_id, (node_id % self.mesh_size_x, node_id // self.mesh_size_x),
+                             MONITORED_DIRECTIONS[direction_index], occupancy, self.ewma_at(port, cycle),
+                             (self.occupancy_cycles[port] + occupancy * elapsed) / observed, histogram)
+    
+    def hottest_ports(self, cycle: int, top: int = 8) -> List[PortOccupancy]:
+        """按EWMA占用排序的最繁忙端口"""
+        ports = heapq.nlargest(top, range(len(self.occupancy)), key=lambda port: self.ewma_at(port, cycle))
+        return [self.port_summary(port, cycle) for port in ports]
+    
+    def to_dict(self, cycle: int) -> Dict[str, Any]:
+        """可JSON序列化的监测结果 (端口按 节点ID × 4 + 方向序号 排列)"""
+        summaries = [self.port_summary(port, cycle) for port in range(len(self.occupancy))]
+        return {
+            "directions": [direction.value for direction in MONITORED_DIRECTIONS],
+            "capacity": self.capacity,
+            "ewma_alpha": self.ewma_alpha,
+            "start_cycle": self.start_cycle,
+            "ewma": [summary.ewma for summary in summaries],
+            "mean_occupancy": [summary.mean_occupancy for summary in summaries],
+            "histograms": [summary.histogram for summary in summaries],
+            "alerts": [{"threshold": asdict(alert.threshold), "node": alert.node_id,
+                        "direction": alert.direction.value, "cycle": alert.cycle, "since_cycle": alert.since_cycle,
+                        "occupancy": alert.occupancy, "ewma": alert.ewma} for alert in self.alerts],
+        }
+    
+    def print_report(self, cycle: int, top: int = 8):
+        """打印最繁忙端口和告警摘要"""
+        print(f"{'节点':^8} {'方向':^6} {'当前':>4} {'EWMA':>6} {'平均':>6}  占用率分布 (0%→100%+, 各桶周期占比)")
+        for summary in self.hottest_ports(cycle, top):
+            total = sum(summary.histogram) or 1
+            shares = " ".join(f"{count * 100 // total:>2}" for count in summary.histogram)
+            x, y = summary.position
+            print(f"({x},{y}):  {summary.direction.value:^6} {summary.occupancy:>4} {summary.ewma:>6.2f} "
+                  f"{summary.mean_occupancy:>6.2f}  [{shares}]")
+        for threshold in self.thresholds:
+            count = sum(alert.threshold is threshold for alert in self.alerts)
+            print(f"   阈值 {threshold.name or '-'} (≥{threshold.occupancy * 100:.0f}% 持续 {threshold.cycles} 周期): "
+                  f"{count} 次告警")
+
+
+# =============================================================================
+# 性能剖析
+# =============================================================================
+
+# 剖析阶段: 阶段名 -> 说明 (按模拟循环中的嵌套顺序)
+PROFILE_PHASES: Dict[str, str] = {
+    "simulate_step": "周期推进 (节点周期同步)",
+    "progress": "看门狗进展统计",
+    "inject": "合成流量注入",
+    "send_message": "数据包创建与入队",
+    "route_packets": "节点路由阶段 (输入侧 → 输出虚拟通道)",
+    "forward_packets": "节点转发阶段 (输出端口轮询)",
+    "switch_allocation": "交换分配",
+    "route_packet": "路由 (理想分配器)",
+    "routing_decision": "路由决策",
+    "port_occupancy": "端口占用统计",
+    "vc_allocation": "虚拟通道分配",
+    "deliver_packet": "弹出/入队与流量统计",
+    "forward_packet": "链路转发 (队列操作)",
+    "logging": "日志输出",
+}
+
+
+class PhaseProfiler:
+    """
+    按阶段累计墙钟时间和调用次数的轻量剖析器
+    
+    由HybridMirandaMesh.enable_profiling在实例上用计时包装函数覆盖被剖析的方法，
+    disable_profiling删除这些实例属性后恢复为类方法，因此未启用时模拟循环没有任何额外开销。
+    嵌套阶段同时记录含子阶段的总时间和扣除子阶段后的自身时间
+    """
+    
+    def __init__(self):
+        self.calls: Dict[str, int] = {phase: 0 for phase in PROFILE_PHASES}
+        self.inclusive: Dict[str, float] = {phase: 0.0 for phase in PROFILE_PHASES}
+        self.exclusive: Dict[str, float] = {phase: 0.0 for phase in PROFILE_PHASES}
+        self._child_time: List[float] = [0.0]    # 各嵌套层已完成子阶段的累计时间
+    
+    def wrap(self, phase: str, function):
+        """返回累计phase计时的包装函数"""
+        calls, inclusive, exclusive = self.calls, self.inclusive, self.exclusive
+        child_time = self._child_time
+        clock = time.perf_counter
+        
+        def timed(*args, **kwargs):
+            child_time.append(0.0)
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                children = child_time.pop()
+                child_time[-1] += elapsed
+                calls[phase] += 1
+                inclusive[phase] += elapsed
+                exclusive[phase] += elapsed - children
+        
+        return timed
+    
+    def reset(self):
+        for phase in PROFILE_PHASES:
+            self.calls[phase] = 0
+            self.inclusive[phase] = 0.0
+            self.exclusive[phase] = 0.0
+    
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return {phase: {"calls": self.calls[phase], "inclusive_seconds": self.inclusive[phase],
+                        "exclusive_seconds": self.exclusive[phase]}
+                for phase in PROFILE_PHASES if self.calls[phase]}
+    
+    def print_report(self):
+        """按自身时间从高到低打印各阶段耗时"""
+        total = sum(self.exclusive.values())
+        print("\n=== 阶段耗时剖析 ===")
+        print(f"{'阶段':<20} {'调用次数':>10} {'总时间(s)':>10} {'自身时间(s)':>11} {'占比':>7} {'每次(μs)':>9}")
+        for phase in sorted(PROFILE_PHASES, key=lambda name: self.exclusive[name], reverse=True):
+            calls = self.calls[phase]
+            if not calls:
+                continue
+            share = self.exclusive[phase] / total * 100 if total else 0.0
+            print(f"{phase:<20} {calls:>10} {self.inclusive[phase]:>10.3f} {self.exclusive[phase]:>11.3f} "
+                  f"{share:>6.1f}% {self.inclusive[phase] / calls * 1e6:>9.2f}")
+        print(f"   (自身时间合计 {total:.3f}s; 计时包装本身会使总耗时增加)")
+
+
+# 启用剖析的网格的剖析器 (模块级print包装由它们共享)
+_PRINT_PROFILERS: List[PhaseProfiler] = []
+
+
+def _install_print_profiling():
+    """按当前启用的剖析器重建模块级print包装，没有剖析器时恢复内置print"""
+    globals().pop("print", None)
+    if not _PRINT_PROFILERS:
+        return
+    wrapped = builtins.print
+    for profiler in _PRINT_PROFILERS:
+        wrapped = profiler.wrap("logging", wrapped)
+    globals()["print"] = wrapped
+
 
 # =============================================================================
 # 混合Miranda网格系统主类
@@ -786,6 +3112,9 @@ class HybridMirandaMesh:
     - TORUS: 二维环形拓扑，边缘节点有环绕连接
     """
     
+    # 进程内网格实例编号 (用作SST组件名称后缀)
+    _instance_counter = itertools.count()
+    
     def __init__(self, 
                  topology_type: TopologyType = TopologyType.MESH,
                  topology_config: TopoConfig = None,
@@ -794,8 +3123,15 @@ class HybridMirandaMesh:
                  memory_size: str = "128MiB",
                  link_bandwidth: str = "40GiB/s",
                  link_latency: str = "50ps",
-                 enable_sst_stats: bool = True,
+                 enable_sst_stats: bool = False,
+                 stats_profile: str = "minimal",
+                 stats_rate: Optional[str] = None,
+                 stats_format: str = "csv",
+                 traffic_config: Optional[TrafficConfig] = None,
                  output_dir: str = "./statistics_output",
+                 stall_limit: int = 1000,
+                 seed: Optional[int] = None,
+                 events: Optional[EventLog] = None,
                  verbose: bool = True):
         """
         初始化混合Miranda网格系统
@@ -808,8 +3144,16 @@ class HybridMirandaMesh:
             memory_size: 内存大小
             link_bandwidth: 网络链路带宽
             link_latency: 网络链路延迟
-            enable_sst_stats: 是否启用SST统计功能
+            enable_sst_stats: 是否启用SST统计功能 (默认关闭；启用时创建output_dir并配置全局SST统计输出)
+            stats_profile: SST统计档案名称 (minimal/links/full)
+            stats_rate: 统计周期输出间隔，None时使用档案默认值
+            stats_format: 统计输出格式 (csv/csv.gz/json/hdf5)
+            traffic_config: 合成流量配置，同时驱动逻辑引擎注入和SST端点参数
             output_dir: 统计输出目录
+            stall_limit: 看门狗阈值，有在途数据包但连续该周期数无进展时simulate()终止，0表示禁用
+            seed: 运行种子，派生各节点的流量/路由/故障注入随机数流；None时随机选取并记录在self.seed
+            events: 结构化事件日志 (注入/转发/弹出/构建/周期事件)，None时verbose模式以文本输出到控制台，
+                    否则不记录
             verbose: 是否输出详细日志
         """
         # 拓扑配置
@@ -827,15 +3171,64 @@ class HybridMirandaMesh:
         # 系统配置
         self.output_dir = output_dir
         self.verbose = verbose
+        self.events = events if events is not None else (EventLog.console_log() if verbose else NO_EVENTS)
         self.enable_sst_stats = enable_sst_stats
         
+        # SST统计配置
+        if stats_profile not in STATISTICS_PROFILES:
+            raise ValueError(f"未知的统计档案: {stats_profile} (可选: {', '.join(STATISTICS_PROFILES)})")
+        if stats_format not in STATISTICS_OUTPUT_FORMATS:
+            raise ValueError(f"未知的统计输出格式: {stats_format} (可选: {', '.join(STATISTICS_OUTPUT_FORMATS)})")
+        self.stats_profile = STATISTICS_PROFILES[stats_profile]
+        self.stats_rate = stats_rate
+        self.stats_format = stats_format
+        self.stats_output_file = None
+
+        # 运行种子 (相同种子和配置的运行结果逐周期一致)
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**63)
+        self.name_suffix = f"m{next(HybridMirandaMesh._instance_counter)}"
+        
+        # 合成流量配置
+        self.traffic_config = traffic_config
+        self.traffic_generator = (SyntheticTrafficGenerator(
+                                      traffic_config, self.topology_config,
+                                      rng=derive_rng(self.seed, "traffic", -1),
+                                      node_rngs=[derive_rng(self.seed, "traffic", node_id)
+                                                 for node_id in range(self.total_nodes)])
+                                  if traffic_config is not None else None)
+
         # 网络状态管理
         self.nodes: Dict[int, MirandaCPUNode] = {}  # 节点映射表 (node_id -> MirandaCPUNode)
         self.packet_counter = 0                     # 全局数据包计数器
+        self.current_cycle = 0                      # 已仿真的时钟周期数
+        
+        # 进展看门狗 (进展 = 数据包被接收、进入输出虚拟通道或经过链路)
+        if stall_limit < 0:
+            raise ValueError(f"stall_limit不能为负数: {stall_limit}")
+        self.stall_limit = stall_limit
+        self._progress_count = 0
+        self._last_progress_cycle = 0
+        
+        # 测量方法学状态 (run_measurement)
+        self.phase: Optional[SimulationPhase] = None
+        self.measurement: Optional[MeasurementResult] = None
+        self.sampling: Optional[SamplingResult] = None
+        
+        # 延迟分解 (所有节点共享)
+        self.latency_breakdown = LatencyBreakdown()
+        
+        # 阶段剖析器 (enable_profiling启用时设置)
+        self.profiler: Optional[PhaseProfiler] = None
+        
+        # 输出端口占用监测 (enable_occupancy_monitor启用时设置)
+        self.occupancy_monitor: Optional[OccupancyMonitor] = None
         
         # 统计管理器（简化版本，不依赖SST统计）
         self.stats_manager = None
         
+        if self.enable_sst_stats:
+            self._configure_sst_statistics_output()
+
         # 系统构建
         self._create_topology()
         self._connect_nodes()
@@ -843,6 +3236,95 @@ class HybridMirandaMesh:
         if verbose:
             self._print_system_summary()
     
+    def enable_occupancy_monitor(self, thresholds: Optional[List[CongestionThreshold]] = None,
+                                 ewma_alpha: float = 0.1,
+                                 callbacks: Optional[List[Callable[[CongestionAlert], None]]] = None
+                                 ) -> OccupancyMonitor:
+        """
+        启用输出端口占用监测
+        
+        从当前周期开始跟踪每个节点每个输出端口的占用EWMA和占用率直方图，端口占用率
+        持续超过阈值时调用回调并记录congestion事件；未启用时节点只多一次属性检查
+        
+        Args:
+            thresholds: 告警阈值，如 [CongestionThreshold(0.75, 50)]
+            ewma_alpha: EWMA平滑系数
+            callbacks: 告警回调 (参数为CongestionAlert)
+        
+        Returns:
+            OccupancyMonitor: 监测器 (告警列表见monitor.alerts)
+        """
+        config = self.topology_config
+        capacity = config.virtual_channels * (config.buffer_depth or UNBOUNDED_REFERENCE_DEPTH)
+        monitor = OccupancyMonitor(config.mesh_size_x, self.total_nodes, capacity, thresholds, ewma_alpha,
+                                   callbacks, self.events, start_cycle=self.current_cycle)
+        nodes = list(self.nodes.values())
+        monitor.resync(nodes, self.current_cycle)
+        for node in nodes:
+            node.occupancy_monitor = monitor
+        self.occupancy_monitor = monitor
+        return monitor
+    
+    def disable_occupancy_monitor(self):
+        """停止端口占用监测"""
+        for node in self.nodes.values():
+            node.occupancy_monitor = None
+        self.occupancy_monitor = None
+    
+    def _profiled_methods(self):
+        """被剖析的 (对象, 方法名, 阶段)"""
+        targets = [(self, "simulate_step", "simulate_step"), (self, "_update_progress", "progress"),
+                   (self, "_inject_synthetic_traffic", "inject"), (self, "send_message", "send_message")]
+        for node in self.nodes.values():
+            targets += [(node, "route_packets", "route_packets"),
+                        (node, "forward_packets", "forward_packets"),
+                        (node, "_switch_allocation", "switch_allocation"),
+                        (node, "_route_packet", "route_packet"),
+                        (node.logical_router, "route_packet", "routing_decision"),
+                        (node, "port_occupancy", "port_occupancy"),
+                        (node, "_allocate_vc", "vc_allocation"),
+                        (node, "_deliver_packet", "deliver_packet"),
+                        (node, "_forward_packet", "forward_packet")]
+        if self.events is not NO_EVENTS:
+            targets.append((self.events, "emit", "logging"))
+        return targets
+    
+    def enable_profiling(self) -> PhaseProfiler:
+        """
+        启用阶段剖析
+        
+        在本网格及其节点实例上用计时包装覆盖模拟循环中的方法，并把事件日志的emit和
+        本模块的print计入 logging 阶段 (print为模块级，由所有启用剖析的网格共享，
+        每次print计入每个仍启用的剖析器，最后一个网格停用时才恢复内置print)
+        
+        Returns:
+            PhaseProfiler: 累计各阶段耗时的剖析器 (重复调用时返回同一个)
+        """
+        if self.profiler is not None:
+            return self.profiler
+        self.profiler = PhaseProfiler()
+        for owner, name, phase in self._profiled_methods():
+            setattr(owner, name, self.profiler.wrap(phase, getattr(owner, name)))
+        _PRINT_PROFILERS.append(self.profiler)
+        _install_print_profiling()
+        return self.profiler
+    
+    def disable_profiling(self) -> Optional[PhaseProfiler]:
+        """停用阶段剖析，恢复原方法，返回已累计的剖析器"""
+        profiler = self.profiler
+        if profiler is None:
+            return None
+        for owner, name, _ in self._profiled_methods():
+            vars(owner).pop(name, None)
+        _PRINT_PROFILERS.remove(profiler)
+        _install_print_profiling()
+        self.profiler = None
+        return profiler
+    
+    def rng_stream(self, subsystem: str, node_id: int) -> random.Random:
+        """由运行种子派生的子系统/节点随机数流 (如故障注入使用 "fault")"""
+        return derive_rng(self.seed, subsystem, node_id)
+    
     def _get_default_topology_config(self) -> TopoConfig:
         """根据拓扑类型获取默认配置"""
         if self.topology_type == TopologyType.MESH:
@@ -857,6 +3339,36 @@ class HybridMirandaMesh:
         # Mesh/Torus都使用相同的计算方式
         return self.topology_config.mesh_size_x * self.topology_config.mesh_size_y
     
+    def _configure_sst_statistics_output(self):
+        """
+        配置全局SST统计输出
+
+        设置统计加载级别和输出模块；具体统计项由各节点按档案逐个启用，
+        不再对整个组件类型启用全部统计
+        """
+        output_module, extension = STATISTICS_OUTPUT_FORMATS[self.stats_format]
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.stats_output_file = os.path.join(
+            self.output_dir,
+            f"sst_{self.topology_type.value}_{self.stats_profile.name}_stats.{extension}"
+        )
+
+        output_params = {"filepath": self.stats_output_file}
+        if self.stats_format in ("csv", "csv.gz"):
+            # 紧凑CSV: 逗号分隔，去掉rank列
+            output_params.update({
+                "separator": ",",
+                "outputtopheader": "1",
+                "outputsimtime": "1",
+                "outputrank": "0",
+            })
+
+        sst.setStatisticLoadLevel(self.stats_profile.load_level)
+        sst.setStatisticOutput(output_module, output_params)
+
+        if self.verbose:
+            print(f"SST统计输出: {output_module} -> {self.stats_output_file}")
+
     def _create_topology(self):
         """创建混合拓扑 - 支持Mesh和Torus拓扑类型"""
         if self.verbose:
@@ -878,11 +3390,18 @@ class HybridMirandaMesh:
                     link_bandwidth=self.link_bandwidth,
                     link_latency=self.link_latency,
                     stats_manager=self.stats_manager,
+                    stats_profile=self.stats_profile if self.enable_sst_stats else None,
+                    stats_rate=self.stats_rate,
+                    traffic_generator=self.traffic_generator,
+                    routing_rng=self.rng_stream("routing", node_id),
+                    name_suffix=self.name_suffix,
+                    events=self.events,
+                    latency_breakdown=self.latency_breakdown,
                     verbose=self.verbose
                 )
                 self.nodes[node_id] = node
-                if self.verbose:
-                    print(f"创建混合节点{node_id}({x},{y}) - SST路由器ID: {node.node_id}")
+                if self.events.construction:
+                    self.events.emit(EventCategory.CONSTRUCTION, "create_node", self.current_cycle, node=node_id, x=x, y=y)
     
     def _connect_nodes(self):
         """连接节点形成指定拓扑"""
@@ -984,8 +3503,12 @@ class HybridMirandaMesh:
         print(f"   • 拓扑类型: {self.topology_type.value.upper()}")
         print(f"   • 节点架构: Miranda CPU + L1缓存({self.cache_size}) + 本地内存({self.memory_size})")
         print(f"   • 网络拓扑: SST merlin.hr_router (多端口配置)")
-        print(f"   • 路由算法: 多拓扑路由 (逻辑层) + merlin 拓扑 (SST层)")
+        print(f"   • 路由算法: 多拓扑路由 (逻辑层, {self.topology_config.routing_mode.value}) + merlin 拓扑 (SST层)")
         print(f"   • 链路性能: {self.link_bandwidth} 带宽, {self.link_latency} 延迟")
+        print(f"   • 运行种子: {self.seed}")
+        buffer_desc = f"{self.topology_config.buffer_depth} 包/通道" if self.topology_config.buffer_depth else "无界"
+        print(f"   • 虚拟通道: {self.topology_config.virtual_channels} 个/端口, 缓冲 {buffer_desc}")
+        print(f"   • 交换分配: {self.topology_config.switch_allocator.value}")
         print(f"   • CPU频率: {self.cpu_clock}")
         
         print(f"\n🧠 节点工作负载分布:")
@@ -1003,9 +3526,18 @@ class HybridMirandaMesh:
         else:
             print(f"   • 拓扑子组件: merlin.mesh (fallback)")
         
-        print(f"   • 端点组件: 独立merlin.test_nic")
+        if self.traffic_generator is not None:
+            print(f"   • 端点组件: merlin.trafficgen ({self.traffic_config.pattern.value}, 负载 {self.traffic_config.injection_rate})")
+        else:
+            print(f"   • 端点组件: 独立merlin.test_nic")
         print(f"   • 连接协议: 符合SST端口协议要求")
         
+        if self.enable_sst_stats:
+            print(f"\n📊 SST统计配置:")
+            print(f"   • 统计档案: {self.stats_profile.name} - {self.stats_profile.description}")
+            print(f"   • 输出间隔: {self.stats_rate or self.stats_profile.rate}")
+            print(f"   • 输出文件: {self.stats_output_file}")
+        
         print(f"\n🚀 混合SST {self.topology_type.value}系统构建完成!")
     
     def get_node(self, node_id: int) -> MirandaCPUNode:
@@ -1029,32 +3561,406 @@ class HybridMirandaMesh:
         dest_node = self.nodes[dst_node_id]
         dest_position = dest_node.position
         
-        self.packet_counter += 1
-        source_node.send_packet(dest_position, message, self.packet_counter, memory_request, size_bytes)
+        self.packet_counter += 1
+        source_node.send_packet(dest_position, message, self.packet_counter, memory_request, size_bytes)
+    
+    def send_message_by_position(self, src_x: int, src_y: int, dst_x: int, dst_y: int, message: str, memory_request: bool = False, size_bytes: int = 64):
+        """根据坐标在两个节点间发送消息(仅适用于Mesh/Torus拓扑)"""
+        if self.topology_type not in [TopologyType.MESH, TopologyType.TORUS]:
+            print("错误: 坐标发送仅适用于Mesh/Torus拓扑")
+            return
+        
+        src_id = src_y * self.topology_config.mesh_size_x + src_x
+        dst_id = dst_y * self.topology_config.mesh_size_x + dst_x
+        self.send_message(src_id, dst_id, message, memory_request, size_bytes)
+    
+    def simulate_step(self):
+        """模拟一个时钟周期"""
+        self.current_cycle += 1
+        
+        # 处理网络数据包: 所有节点先完成路由阶段再统一转发 (节点间传输在周期末提交，
+        # 每个数据包每周期至多前进一跳，与节点处理顺序无关)
+        nodes = self.nodes.values()
+        for node in nodes:
+            node.current_cycle = self.current_cycle
+        for node in nodes:
+            node.route_packets()
+        for node in nodes:
+            node.forward_packets()
+            node.simulate_cpu_cycle()
+        self._update_progress()
+        if self.occupancy_monitor is not None:
+            self.occupancy_monitor.check(self.current_cycle)
+    
+        # 按合成流量配置注入新数据包 (与周期之间手动发送的消息一样，从下一周期开始传输)
+        if self.traffic_generator is not None:
+            self._inject_synthetic_traffic()
+    
+    def _update_progress(self):
+        """更新看门狗进展计数，网络为空时不视为停滞"""
+        progress = sum(node.packets_received + node.packets_forwarded + node.link_traversals
+                       for node in self.nodes.values())
+        if progress != self._progress_count or self.packets_in_flight() == 0:
+            self._progress_count = progress
+            self._last_progress_cycle = self.current_cycle
+    
+    def stalled_cycles(self) -> int:
+        """有在途数据包而没有任何进展的连续周期数"""
+        return self.current_cycle - self._last_progress_cycle
+    
+    def diagnose_stall(self) -> StallDiagnostics:
+        """
+        生成停滞诊断快照
+        
+        每个非空队列的队首数据包恰好等待一个下游队列，从各队列出发沿等待关系追踪，
+        优先报告回到自身路径上的循环等待 (死锁)，否则报告最长的等待链
+        """
+        queues = [snapshot for node in self.nodes.values() for snapshot in node.queue_snapshots()]
+        waits_for = {(q.node_id, q.queue): q.waits_for for q in queues}
+        
+        best_chain: List[Tuple[int, str]] = []
+        is_cycle = False
+        visited = set()
+        for start in waits_for:
+            if start in visited:
+                continue
+            path: List[Tuple[int, str]] = []
+            on_path: Dict[Tuple[int, str], int] = {}
+            current = start
+            while current is not None and current in waits_for and current not in on_path:
+                if current in visited:
+                    break
+                on_path[current] = len(path)
+                path.append(current)
+                current = waits_for[current]
+            visited.update(path)
+            if current is not None and current in on_path:
+                best_chain = path[on_path[current]:] + [current]
+                is_cycle = True
+                break
+            if current is not None and current not in waits_for:
+                path.append(current)
+            if len(path) > len(best_chain):
+                best_chain = path
+        
+        return StallDiagnostics(cycle=self.current_cycle, stalled_cycles=self.stalled_cycles(),
+                                packets_in_flight=self.packets_in_flight(), queues=queues,
+                                wait_for_chain=best_chain, is_cycle=is_cycle)
+    
+    def _inject_synthetic_traffic(self):
+        """按流量生成器为每个节点注入本周期的数据包"""
+        generator = self.traffic_generator
+        for node_id in self.nodes:
+            if not generator.should_inject(node_id):
+                continue
+            dst_id = generator.pick_destination(node_id)
+            if dst_id is None:
+                continue
+            generator.record_injection(node_id)
+            self.send_message(node_id, dst_id, f"{generator.traffic_config.pattern.value} traffic",
+                              size_bytes=generator.pick_size(node_id))
+    
+    def verify_sst_traffic_endpoints(self) -> List[str]:
+        """
+        检查SST端点参数与逻辑引擎流量定义是否一致
+        
+        需要可读取组件参数的SST接口 (如离线替身模块sst_standin)
+        
+        Returns:
+            List[str]: 发现的不一致问题
+        """
+        if self.traffic_generator is None:
+            return ["未配置合成流量"]
+        
+        problems = []
+        for node_id, node in sorted(self.nodes.items()):
+            params = getattr(node.endpoint, "params", None)
+            if params is None:
+                return ["当前SST接口不支持读取组件参数，请使用sst_standin离线验证"]
+            if getattr(node.endpoint, "type", "merlin.trafficgen") != "merlin.trafficgen":
+                problems.append(f"节点{node_id}: 端点类型为 {node.endpoint.type}")
+            problems.extend(self.traffic_generator.verify_endpoint_params(node_id, params, self.link_bandwidth))
+        return problems
+    
+    def packets_in_flight(self) -> int:
+        """统计已发送但尚未到达目标节点的数据包数量"""
+        return sum(node.packets_sent - node.packets_received for node in self.nodes.values())
+    
+    def hop_overhead(self) -> float:
+        """已接收数据包的实际跳数与最短路径跳数之比 (两阶段路由大于1)"""
+        total_hops = sum(node.total_hop_count for node in self.nodes.values())
+        minimal_hops = sum(node.total_minimal_hops for node in self.nodes.values())
+        return total_hops / minimal_hops if minimal_hops > 0 else 1.0
+    
+    def accepted_throughput(self) -> float:
+        """已接收吞吐量 (每节点每周期接收的数据包数)"""
+        if self.current_cycle == 0:
+            return 0.0
+        received = sum(node.packets_received for node in self.nodes.values())
+        return received / (self.total_nodes * self.current_cycle)
+    
+    def measured_packets_outstanding(self) -> int:
+        """已注入但尚未被接收的测量包数量"""
+        return sum(node.measured_sent - node.measured_received for node in self.nodes.values())
+    
+    def run_measurement(self, config: Optional[MeasurementConfig] = None,
+                        reset_breakdown: bool = True) -> MeasurementResult:
+        """
+        按预热/测量/排空三阶段运行仿真
+        
+        预热阶段的数据包不计入统计，并可在相邻窗口的平均延迟和吞吐量趋于稳定时提前结束；
+        测量窗口内注入的数据包标记为测量包；排空阶段流量照常注入，直到所有测量包被接收。
+        看门狗触发时提前结束并在结果中携带停滞诊断
+        
+        Args:
+            config: 测量配置，None时使用默认配置
+            reset_breakdown: 是否清零延迟分解；采样模拟只在第一个采样单元前清零，
+                             使延迟分解累计全部采样单元的测量包
+        
+        Returns:
+            MeasurementResult: 只基于测量包的延迟统计和测量窗口吞吐量
+        """
+        config = config if config is not None else MeasurementConfig()
+        if config.measurement_cycles <= 0 or config.window_cycles <= 0:
+            raise ValueError("measurement_cycles和window_cycles必须为正数")
+        if config.warmup_cycles < 0 or config.drain_limit < 0 or config.steady_state_tolerance < 0:
+            raise ValueError("warmup_cycles、drain_limit和steady_state_tolerance不能为负数")
+        
+        for node in self.nodes.values():
+            node.reset_measurement()
+        if reset_breakdown:
+            self.latency_breakdown.reset(measured_only=True)
+        windows: List[WindowStats] = []
+        
+        def steady() -> bool:
+            warmup_windows = [w for w in windows
+                              if w.phase == SimulationPhase.WARMUP and w.cycles == config.window_cycles]
+            if (not config.steady_state_tolerance or len(warmup_windows) < 2
+                    or warmup_windows[-1].start_cycle + config.window_cycles - start_cycle < config.min_warmup_cycles):
+                return False
+            previous, latest = warmup_windows[-2], warmup_windows[-1]
+            if previous.ejected == 0 or latest.ejected == 0:
+                return False
+            return (abs(latest.avg_latency_cycles - previous.avg_latency_cycles)
+                    <= config.steady_state_tolerance * previous.avg_latency_cycles
+                    and abs(latest.accepted_throughput - previous.accepted_throughput)
+                    <= config.steady_state_tolerance * previous.accepted_throughput)
+        
+        start_cycle = self.current_cycle
+        warmup_cycles, steady_state = self._run_phase(SimulationPhase.WARMUP, config.warmup_cycles,
+                                                      config.window_cycles, windows, steady)
+        
+        received_before = sum(node.packets_received for node in self.nodes.values())
+        measurement_cycles = 0
+        if not self._watchdog_tripped():
+            measurement_cycles, _ = self._run_phase(SimulationPhase.MEASUREMENT, config.measurement_cycles,
+                                                    config.window_cycles, windows)
+        received_in_window = sum(node.packets_received for node in self.nodes.values()) - received_before
+        
+        drain_cycles, drained = 0, self.measured_packets_outstanding() == 0
+        if not self._watchdog_tripped():
+            drain_cycles, drained = self._run_phase(SimulationPhase.DRAIN, config.drain_limit, config.window_cycles,
+                                                    windows, lambda: self.measured_packets_outstanding() == 0)
+        self.phase = None
+        
+        latencies = [lat for node in self.nodes.values() for lat in node.measured_latency_cycles]
+        measured_packets = sum(node.measured_sent for node in self.nodes.values())
+        measured_received = sum(node.measured_received for node in self.nodes.values())
+        node_cycles = self.total_nodes * measurement_cycles
+        self.measurement = MeasurementResult(
+            warmup_cycles=warmup_cycles,
+            steady_state_detected=steady_state,
+            measurement_cycles=measurement_cycles,
+            drain_cycles=drain_cycles,
+            drained=drained,
+            measured_packets=measured_packets,
+            measured_received=measured_received,
+            offered_load=measured_packets / node_cycles if node_cycles else 0.0,
+            accepted_throughput=received_in_window / node_cycles if node_cycles else 0.0,
+            avg_latency_cycles=sum(latencies) / len(latencies) if latencies else 0.0,
+            p99_latency_cycles=_percentile(latencies, 0.99),
+            avg_hop_count=(sum(node.measured_hop_count for node in self.nodes.values()) / measured_received
+                           if measured_received else 0.0),
+            windows=windows,
+            stall=self.diagnose_stall() if self._watchdog_tripped() else None,
+        )
+        if self.verbose:
+            print("\n📏 测量结果:")
+            self.measurement.print_report()
+        return self.measurement
+    
+    def _run_phase(self, phase: SimulationPhase, max_cycles: int, window_cycles: int,
+                   windows: List[WindowStats], stop=None) -> Tuple[int, bool]:
+        """
+        运行一个测量阶段，按窗口记录统计
+        
+        Returns:
+            Tuple[int, bool]: (运行周期数, 是否因stop()为真而结束)
+        """
+        self.phase = phase
+        for node in self.nodes.values():
+            node.measuring = phase == SimulationPhase.MEASUREMENT
+        
+        marks = [len(node.packet_latency_cycles) for node in self.nodes.values()]
+        window_start = self.current_cycle
+        cycles = 0
+        stopped = False
+        while True:
+            if stop is not None and stop():
+                stopped = True
+                break
+            if cycles >= max_cycles or self._watchdog_tripped():
+                break
+            self.simulate_step()
+            cycles += 1
+            if self.current_cycle - window_start >= window_cycles:
+                windows.append(self._window_stats(phase, window_start, marks))
+                marks = [len(node.packet_latency_cycles) for node in self.nodes.values()]
+                window_start = self.current_cycle
+        if self.current_cycle > window_start:
+            windows.append(self._window_stats(phase, window_start, marks))
+        
+        for node in self.nodes.values():
+            node.measuring = False
+        return cycles, stopped
     
-    def send_message_by_position(self, src_x: int, src_y: int, dst_x: int, dst_y: int, message: str, memory_request: bool = False, size_bytes: int = 64):
-        """根据坐标在两个节点间发送消息(仅适用于Mesh/Torus拓扑)"""
-        if self.topology_type not in [TopologyType.MESH, TopologyType.TORUS]:
-            print("错误: 坐标发送仅适用于Mesh/Torus拓扑")
-            return
-        
-        src_id = src_y * self.topology_config.mesh_size_x + src_x
-        dst_id = dst_y * self.topology_config.mesh_size_x + dst_x
-        self.send_message(src_id, dst_id, message, memory_request, size_bytes)
+    def _window_stats(self, phase: SimulationPhase, window_start: int, marks: List[int]) -> WindowStats:
+        """统计窗口内 (marks之后) 接收的数据包"""
+        latencies = [lat for node, mark in zip(self.nodes.values(), marks)
+                     for lat in node.packet_latency_cycles[mark:]]
+        cycles = self.current_cycle - window_start
+        return WindowStats(phase=phase, start_cycle=window_start, cycles=cycles, ejected=len(latencies),
+                           accepted_throughput=len(latencies) / (self.total_nodes * cycles),
+                           avg_latency_cycles=sum(latencies) / len(latencies) if latencies else 0.0)
     
-    def simulate_step(self):
-        """模拟一个时钟周期"""
-        # 处理网络数据包
+    def _watchdog_tripped(self) -> bool:
+        return bool(self.stall_limit) and self.stalled_cycles() >= self.stall_limit
+    
+    def fast_forward(self, cycles: int):
+        """
+        功能快进
+        
+        按流量生成器一次抽取每个节点整个快进区间的注入次数 (几何分布间隔)，
+        每个数据包立即记为源节点发送、目标节点接收，发送/接收统计按节点汇总后
+        一次写入；不建模逐跳传输，也不产生延迟样本。
+        快进开始时网络中剩余的数据包同样直接记为到达
+        """
+        size_x = self.topology_config.mesh_size_x
         for node in self.nodes.values():
-            node.process_packets()
-            node.simulate_cpu_cycle()
+            for packet in node.take_queued_packets():
+                dest_x, dest_y = packet.destination
+                self.nodes[dest_y * size_x + dest_x].record_functional_receive(packet.size_bytes)
+        if self.occupancy_monitor is not None:
+            self.occupancy_monitor.resync(list(self.nodes.values()), self.current_cycle)
+        
+        generator = self.traffic_generator
+        if generator is not None:
+            received_packets = [0] * self.total_nodes
+            received_bytes = [0] * self.total_nodes
+            for node_id, node in self.nodes.items():
+                destinations = generator.draw_destinations(node_id, generator.draw_injections(node_id, cycles))
+                remaining = generator.remaining_budget(node_id)
+                if remaining is not None:
+                    destinations = destinations[:remaining]
+                if not destinations:
+                    continue
+                generator.record_injection(node_id, len(destinations))
+                sizes = generator.draw_sizes(node_id, len(destinations))
+                for dst_id, size_bytes in zip(destinations, sizes):
+                    received_packets[dst_id] += 1
+                    received_bytes[dst_id] += size_bytes
+                self.packet_counter += len(destinations)
+                node.record_functional_send(sum(sizes), len(destinations))
+            for dst_id, packets in enumerate(received_packets):
+                if packets:
+                    self.nodes[dst_id].record_functional_receive(received_bytes[dst_id], packets)
+        
+        self.current_cycle += cycles
+        for node in self.nodes.values():
+            node.current_cycle = self.current_cycle
+        self._update_progress()
+    
+    def _simulate_sampled(self, steps: int, sampling: SamplingConfig) -> SimulationResult:
+        """SMARTS式采样模拟: 周期性详细采样单元 + 功能快进，见 simulate()"""
+        if sampling.sample_cycles <= 0 or sampling.warmup_cycles < 0 or sampling.drain_limit < 0:
+            raise ValueError("sample_cycles必须为正数，warmup_cycles和drain_limit不能为负数")
+        if sampling.sample_period < sampling.warmup_cycles + sampling.sample_cycles:
+            raise ValueError("sample_period不能小于warmup_cycles + sample_cycles")
+        if not 0 < sampling.confidence < 1:
+            raise ValueError(f"confidence必须在0和1之间: {sampling.confidence}")
+        
+        if self.verbose:
+            print(f"\n开始采样模拟 {steps} 个时钟周期 (采样周期 {sampling.sample_period}, "
+                  f"每个采样单元详细预热 {sampling.warmup_cycles} + 测量 {sampling.sample_cycles} 周期)...")
+        unit = MeasurementConfig(warmup_cycles=sampling.warmup_cycles, measurement_cycles=sampling.sample_cycles,
+                                 drain_limit=sampling.drain_limit, window_cycles=sampling.sample_cycles,
+                                 steady_state_tolerance=0)
+        begin = self.current_cycle
+        end = begin + steps
+        samples: List[MeasurementResult] = []
+        detailed_cycles = fast_forward_cycles = 0
+        stall = None
+        self.latency_breakdown.reset(measured_only=True)
+        while self.current_cycle < end:
+            unit_start = self.current_cycle
+            if end - unit_start < sampling.warmup_cycles + sampling.sample_cycles:
+                fast_forward_cycles += end - unit_start
+                self.fast_forward(end - unit_start)
+                break
+            sample = self.run_measurement(unit, reset_breakdown=False)
+            detailed_cycles += self.current_cycle - unit_start
+            if sample.stall is not None:
+                stall = sample.stall
+                break
+            samples.append(sample)
+            skip = max(0, min(end, unit_start + sampling.sample_period) - self.current_cycle)
+            fast_forward_cycles += skip
+            self.fast_forward(skip)
+        
+        mean_latency, latency_ci = mean_confidence_interval(
+            [sample.avg_latency_cycles for sample in samples], sampling.confidence)
+        mean_throughput, throughput_ci = mean_confidence_interval(
+            [sample.accepted_throughput for sample in samples], sampling.confidence)
+        self.measurement = None
+        self.sampling = SamplingResult(samples=samples, detailed_cycles=detailed_cycles,
+                                       fast_forward_cycles=fast_forward_cycles, confidence=sampling.confidence,
+                                       mean_latency_cycles=mean_latency, latency_ci=latency_ci,
+                                       mean_throughput=mean_throughput, throughput_ci=throughput_ci)
+        if self.verbose:
+            print("\n📐 采样估计:")
+            self.sampling.print_report()
+        if stall is not None:
+            stall.print_report()
+        return SimulationResult(completed=stall is None, cycles=self.current_cycle - begin,
+                                stall=stall, sampling=self.sampling)
     
-    def simulate(self, steps: int = 10):
-        """运行网络模拟"""
-        print(f"\n开始混合系统模拟 {steps} 个时钟周期...")
+    def simulate(self, steps: int = 10, sampling: Optional[SamplingConfig] = None) -> SimulationResult:
+        """
+        运行网络模拟
+        
+        有在途数据包但连续stall_limit个周期无进展时提前终止，
+        打印并返回停滞诊断而不是继续空转
+        
+        Args:
+            steps: 仿真周期数
+            sampling: 采样配置，设置后只在周期性采样单元内详细仿真，其余周期功能快进，
+                      并由各采样单元的测量结果给出平均延迟和吞吐量的置信区间
+        """
+        if sampling is not None:
+            return self._simulate_sampled(steps, sampling)
+        
+        if self.verbose:
+            print(f"\n开始混合系统模拟 {steps} 个时钟周期...")
         for step in range(steps):
-            print(f"\n--- 时钟周期 {step + 1} ---")
+            if self.events.simulation:
+                self.events.emit(EventCategory.SIMULATION, "cycle", self.current_cycle + 1, step=step + 1)
             self.simulate_step()
+            if self._watchdog_tripped():
+                diagnostics = self.diagnose_stall()
+                print(f"\n⚠️ 连续 {diagnostics.stalled_cycles} 个周期无进展，终止模拟")
+                diagnostics.print_report()
+                return SimulationResult(completed=False, cycles=step + 1, stall=diagnostics)
+        return SimulationResult(completed=True, cycles=steps)
     
     def print_statistics(self):
         """打印详细的网络流量统计信息"""
@@ -1139,6 +4045,36 @@ class HybridMirandaMesh:
         if total_hop_counts:
             avg_hops = sum(total_hop_counts) / len(total_hop_counts)
             print(f"   平均跳数: {avg_hops:.2f}")
+            print(f"   路由跳数开销: {self.hop_overhead():.3f}× 最短路径 ({self.topology_config.routing_mode.value})")
+        
+        if self.topology_config.switch_allocator != AllocatorType.IDEAL:
+            requests = sum(node.switch_requests for node in self.nodes.values())
+            grants = sum(node.switch_grants for node in self.nodes.values())
+            wait = sum(node.total_switch_wait_cycles for node in self.nodes.values())
+            print(f"   交换分配 ({self.topology_config.switch_allocator.value}): "
+                  f"授权率 {grants / requests * 100 if requests else 0:.1f}%, "
+                  f"平均输入端口等待 {wait / total_packets_received if total_packets_received else 0:.2f} 周期/包")
+        
+        # 测量窗口统计 (只计测量包，排除预热阶段的冷启动瞬态)
+        if self.measurement is not None:
+            print(f"\n📏 测量窗口统计 (仅测量包):")
+            self.measurement.print_report()
+        if self.sampling is not None:
+            print(f"\n📐 采样估计 (仅采样单元内的测量包):")
+            self.sampling.print_report()
+        
+        # 延迟分解 (各分量之和等于端到端延迟周期数)
+        if not self.latency_breakdown.measured_only:
+            scope = "全部已接收数据包"
+        else:
+            scope = "仅采样单元内的测量包" if self.sampling is not None else "仅测量包"
+        print(f"\n⏱️ 延迟分解 ({scope}):")
+        self.latency_breakdown.print_report()
+        
+        # 尾部延迟最差的流 (按目标节点稀疏存储，只包含出现过的流)
+        active_flows = sum(len(node.flow_stats) for node in self.nodes.values())
+        print(f"\n🐢 p99延迟最差的流 (活跃流 {active_flows:,} 条，全部已接收数据包):")
+        self.print_worst_flows()
         
         # 方向流量分析
         print(f"\n🧭 按方向流量分析:")
@@ -1262,6 +4198,55 @@ class HybridMirandaMesh:
         
         return traffic_matrix, link_utilization
     
+    def _flow_summary(self, source_id: int, destination_id: int, flow: FlowStats) -> FlowSummary:
+        size_x = self.topology_config.mesh_size_x
+        return FlowSummary(
+            source=(source_id % size_x, source_id // size_x),
+            destination=(destination_id % size_x, destination_id // size_x),
+            packets=flow.packets,
+            bytes=flow.bytes,
+            throughput=flow.packets / max(self.current_cycle, 1),
+            avg_latency_cycles=flow.total_latency_cycles / flow.packets,
+            p50_latency_cycles=flow.quantile(0.50),
+            p99_latency_cycles=flow.quantile(0.99),
+            max_latency_cycles=flow.max_latency_cycles,
+            avg_hop_count=flow.total_hop_count / flow.packets,
+        )
+    
+    def worst_flows(self, metric: str = "p99_latency_cycles", top: int = 10,
+                    min_packets: int = 1) -> List[FlowSummary]:
+        """
+        按指标返回最差的若干条流
+        
+        Args:
+            metric: 排序指标 (见FLOW_METRICS)；throughput按从小到大，其余按从大到小
+            top: 返回的流数
+            min_packets: 只考虑至少接收了这么多包的流 (少量样本的尾部分位数没有意义)
+        
+        Returns:
+            List[FlowSummary]: 按指标从差到好排序
+        """
+        if metric not in FLOW_METRICS:
+            raise ValueError(f"未知的流指标: {metric} (可选: {', '.join(FLOW_METRICS)})")
+        candidates = [(source, node.node_id, flow) for node in self.nodes.values()
+                      for source, flow in node.flow_stats.items() if flow.packets >= min_packets]
+        sign = -1 if metric == "throughput" else 1
+        cycles = max(self.current_cycle, 1)
+        worst = heapq.nlargest(top, candidates, key=lambda item: sign * item[2].metric(metric, cycles))
+        return [self._flow_summary(source, destination, flow) for source, destination, flow in worst]
+    
+    def print_worst_flows(self, metric: str = "p99_latency_cycles", top: int = 5, min_packets: int = 5):
+        """打印最差的若干条流"""
+        flows = self.worst_flows(metric, top, min_packets)
+        if not flows:
+            print(f"   无接收包数 ≥ {min_packets} 的流")
+            return
+        print(f"   {'源':>8} → {'目标':<8} {'包数':>6} {'平均延迟':>8} {'p50':>6} {'p99':>7} {'最大':>5} {'平均跳数':>8}")
+        for flow in flows:
+            print(f"   {str(flow.source):>8} → {str(flow.destination):<8} {flow.packets:>6} "
+                  f"{flow.avg_latency_cycles:>8.2f} {flow.p50_latency_cycles:>6.0f} {flow.p99_latency_cycles:>7.0f} "
+                  f"{flow.max_latency_cycles:>5} {flow.avg_hop_count:>8.2f}")
+    
     def analyze_hotspots(self):
         """分析网络热点和拥塞"""
         print("\n=== 网络热点分析 ===")
@@ -1303,6 +4288,11 @@ class HybridMirandaMesh:
                 print(f"   节点({x},{y}): 转发比例 {ratio*100:.1f}%")
         else:
             print(f"\n✅ 无明显拥塞节点")
+        
+        # 输出端口占用 (启用占用监测时)
+        if self.occupancy_monitor is not None:
+            print(f"\n🚦 输出端口占用 (按EWMA排序，容量 {self.occupancy_monitor.capacity} 包):")
+            self.occupancy_monitor.print_report(self.current_cycle)
     
     def generate_traffic_report(self):
         """生成完整的流量分析报告"""
@@ -1321,6 +4311,83 @@ class HybridMirandaMesh:
         
         print("\n" + "="*80)
     
+    def collect_statistics(self) -> Dict[str, Any]:
+        """
+        收集可JSON序列化的运行统计
+        
+        汇总指标在运行过run_measurement时只基于测量包，否则基于全部已接收数据包；
+        每节点和每条输出链路的计数按节点ID顺序存为列，每条 (源, 目标) 流一行，
+        按 (目标, 源) 排序存为列 (便于按列比较和入库)
+        
+        Returns:
+            Dict: engine_version/seed/cycles/mesh_size/summary/measurement/latency_breakdown/port_occupancy/
+                  nodes/links/flows
+        """
+        nodes = list(self.nodes.values())
+        if self.measurement is not None:
+            latencies = [lat for node in nodes for lat in node.measured_latency_cycles]
+            received = sum(node.measured_received for node in nodes)
+            hops = sum(node.measured_hop_count for node in nodes)
+            throughput = self.measurement.accepted_throughput
+        else:
+            latencies = [lat for node in nodes for lat in node.packet_latency_cycles]
+            received = sum(node.packets_received for node in nodes)
+            hops = sum(node.total_hop_count for node in nodes)
+            throughput = self.accepted_throughput()
+        
+        measurement = None
+        if self.measurement is not None:
+            measurement = {key: value for key, value in asdict(self.measurement).items()
+                           if key not in ("windows", "stall")}
+        
+        flows = [(node.node_id, source, flow) for node in nodes for source, flow in sorted(node.flow_stats.items())]
+        
+        return {
+            "engine_version": ENGINE_VERSION,
+            "seed": self.seed,
+            "cycles": self.current_cycle,
+            "mesh_size": [self.topology_config.mesh_size_x, self.topology_config.mesh_size_y],
+            "summary": {
+                "packets_sent": sum(node.packets_sent for node in nodes),
+                "packets_received": sum(node.packets_received for node in nodes),
+                "packets_in_flight": self.packets_in_flight(),
+                "accepted_throughput": throughput,
+                "avg_latency_cycles": sum(latencies) / len(latencies) if latencies else 0.0,
+                "p99_latency_cycles": _percentile(latencies, 0.99),
+                "avg_hop_count": hops / received if received else 0.0,
+                "hop_overhead": self.hop_overhead(),
+            },
+            "measurement": measurement,
+            "latency_breakdown": self.latency_breakdown.to_dict(),
+            "port_occupancy": (self.occupancy_monitor.to_dict(self.current_cycle)
+                               if self.occupancy_monitor is not None else None),
+            "nodes": {
+                "packets_sent": [node.packets_sent for node in nodes],
+                "packets_received": [node.packets_received for node in nodes],
+                "packets_forwarded": [node.packets_forwarded for node in nodes],
+                "bytes_received": [node.bytes_received for node in nodes],
+                "total_latency_cycles": [sum(node.packet_latency_cycles) for node in nodes],
+                "p50_latency_cycles": [_percentile(node.packet_latency_cycles, 0.50) for node in nodes],
+                "p99_latency_cycles": [_percentile(node.packet_latency_cycles, 0.99) for node in nodes],
+                "total_hop_count": [node.total_hop_count for node in nodes],
+            },
+            "links": {
+                direction.value: [node.traffic_by_direction[direction]["packets"] for node in nodes]
+                for direction in Direction if direction != Direction.LOCAL
+            },
+            "flows": {
+                "source": [source for _, source, _ in flows],
+                "destination": [destination for destination, _, _ in flows],
+                "packets": [flow.packets for _, _, flow in flows],
+                "bytes": [flow.bytes for _, _, flow in flows],
+                "total_latency_cycles": [flow.total_latency_cycles for _, _, flow in flows],
+                "total_hop_count": [flow.total_hop_count for _, _, flow in flows],
+                "p50_latency_cycles": [flow.quantile(0.50) for _, _, flow in flows],
+                "p99_latency_cycles": [flow.quantile(0.99) for _, _, flow in flows],
+                "max_latency_cycles": [flow.max_latency_cycles for _, _, flow in flows],
+            },
+        }
+    
     def export_sst_statistics(self, output_dir=None):
         """导出统计数据到文件 - 简化版本"""
         if output_dir is None:
@@ -1342,6 +4409,12 @@ class HybridMirandaMesh:
             json.dump(stats_data, f, indent=2, ensure_ascii=False)
         print(f"混合系统统计数据已导出到JSON文件: {json_file}")
         
+        # 按列组织的完整运行统计 (供 stats_diff.py 对比两次运行)
+        run_file = f"{output_dir}/hybrid_mesh_run_{timestamp}.json"
+        with open(run_file, 'w', encoding='utf-8') as f:
+            json.dump(self.collect_statistics(), f, separators=(",", ":"))
+        print(f"运行统计已导出到JSON文件: {run_file}")
+        
         # 生成简化的统计报告
         self._generate_simple_report(stats_data, f"{output_dir}/hybrid_mesh_report_{timestamp}.txt")
     
@@ -1579,6 +4652,722 @@ def test_hybrid_workload_patterns():
     return mesh
 
 
+def test_sst_traffic_endpoints():
+    """
+    合成流量端点参数测试
+    
+    对每种流量模式构建系统，检查SST merlin.trafficgen端点参数
+    与逻辑引擎的流量定义一致，并在逻辑引擎中运行同一配置
+    需要可读取组件参数的SST接口 (在SST-Core之外使用sst_standin)
+    
+    Returns:
+        Dict: 每种流量模式的检查问题列表
+    """
+    print("\n\n=== 合成流量端点参数测试 ===")
+    
+    results = {}
+    for pattern in TrafficPattern:
+        traffic = TrafficConfig(
+            pattern=pattern,
+            injection_rate=0.2,
+            message_size_min=32,
+            message_size_max=256,
+            packets_per_node=5,
+            hotspot_targets=[5] if pattern == TrafficPattern.HOTSPOT else [],
+        )
+        mesh = HybridMirandaMesh(enable_sst_stats=False, traffic_config=traffic, verbose=False)
+        if getattr(mesh.nodes[0].endpoint, "params", None) is None:
+            print("  ⚠️ 当前SST接口不支持读取组件参数，跳过 (请使用sst_standin离线验证)")
+            return results
+        problems = mesh.verify_sst_traffic_endpoints()
+        
+        for _ in range(200):
+            mesh.simulate_step()
+        sent = sum(node.packets_sent for node in mesh.nodes.values())
+        received = sum(node.packets_received for node in mesh.nodes.values())
+        
+        results[pattern.value] = problems
+        status = "✅" if not problems else "❌"
+        print(f"  {status} {pattern.value:>14}: 逻辑引擎发送 {sent} 包, 接收 {received} 包")
+        for problem in problems:
+            print(f"       - {problem}")
+        assert not problems, f"{pattern.value}: SST端点参数与逻辑引擎流量定义不一致"
+    
+    # 多个热点目标无法用merlin.trafficgen表达，必须报告为不一致
+    traffic = TrafficConfig(pattern=TrafficPattern.HOTSPOT, hotspot_targets=[5, 10], packets_per_node=5)
+    mesh = HybridMirandaMesh(enable_sst_stats=False, traffic_config=traffic, verbose=False)
+    problems = mesh.verify_sst_traffic_endpoints()
+    results["hotspot (多目标)"] = problems
+    print(f"  {'✅' if problems else '❌'} 多热点目标: 报告 {len(problems)} 个不一致")
+    assert problems, "多个热点目标的SST端点参数未被报告为不一致"
+    
+    return results
+
+
+
+
+def test_adaptive_routing_throughput():
+    """
+    自适应路由吞吐量测试
+    
+    在对抗性流量 (转置、热点) 下比较维序路由、各自适应路由模式和
+    两阶段遗忘路由 (Valiant/ROMM) 的已接收吞吐量、平均延迟和跳数开销
+    
+    Returns:
+        Dict: (拓扑, 流量模式, 路由模式) -> (吞吐量, 平均延迟周期)
+    """
+    print("\n\n=== 自适应路由吞吐量测试 ===")
+    
+    cases = [
+        (TopologyType.MESH, [RoutingMode.DOR, RoutingMode.WEST_FIRST, RoutingMode.ODD_EVEN,
+                             RoutingMode.VALIANT, RoutingMode.ROMM]),
+        (TopologyType.TORUS, [RoutingMode.DOR, RoutingMode.MIN_ADAPTIVE, RoutingMode.VALIANT, RoutingMode.ROMM]),
+    ]
+    patterns = [TrafficPattern.TRANSPOSE, TrafficPattern.HOTSPOT]
+    cycles = 300
+    
+    results = {}
+    for topo_type, modes in cases:
+        for pattern in patterns:
+            print(f"\n  {topo_type.value.upper()} 8×8, {pattern.value} 流量:")
+            for mode in modes:
+                config = TopoConfig(topo_type, mesh_size_x=8, mesh_size_y=8, total_nodes=64, routing_mode=mode)
+                traffic = TrafficConfig(
+                    pattern=pattern,
+                    injection_rate=0.5,
+                    packets_per_node=cycles,
+                    hotspot_targets=[27, 36] if pattern == TrafficPattern.HOTSPOT else [],
+                    hotspot_fraction=0.3,
+                )
+                mesh = HybridMirandaMesh(topology_type=topo_type, topology_config=config,
+                                         enable_sst_stats=False, traffic_config=traffic, seed=3, verbose=False)
+                for _ in range(cycles):
+                    mesh.simulate_step()
+                
+                latencies = [lat for node in mesh.nodes.values() for lat in node.packet_latency_cycles]
+                avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
+                throughput = mesh.accepted_throughput()
+                results[(topo_type.value, pattern.value, mode.value)] = (throughput, avg_latency)
+                print(f"    {mode.value:>13}: 吞吐量 {throughput:.3f} 包/节点/周期, "
+                      f"平均延迟 {avg_latency:.1f} 周期, 跳数开销 {mesh.hop_overhead():.2f}×, "
+                      f"在途 {mesh.packets_in_flight()} 包")
+                # Valiant经任意中间节点绕行，其余模式 (含ROMM) 只走最短路径
+                minimal = mode != RoutingMode.VALIANT
+                assert throughput > 0, f"{topo_type.value}/{pattern.value}/{mode.value}: 没有接收到数据包"
+                assert (abs(mesh.hop_overhead() - 1.0) < 1e-9) == minimal, \
+                    f"{topo_type.value}/{pattern.value}/{mode.value}: 跳数开销 {mesh.hop_overhead():.2f}×"
+    
+    # 转置流量下维序路由集中在少数通道上，自适应路由应获得更高的吞吐量
+    for topo_type, adaptive in ((TopologyType.MESH, RoutingMode.WEST_FIRST), (TopologyType.MESH, RoutingMode.ODD_EVEN),
+                                (TopologyType.TORUS, RoutingMode.MIN_ADAPTIVE)):
+        dor = results[(topo_type.value, TrafficPattern.TRANSPOSE.value, RoutingMode.DOR.value)][0]
+        adaptive_throughput = results[(topo_type.value, TrafficPattern.TRANSPOSE.value, adaptive.value)][0]
+        assert adaptive_throughput > dor, \
+            f"{topo_type.value} transpose: {adaptive.value} 吞吐量 {adaptive_throughput:.3f} 不高于维序路由 {dor:.3f}"
+    
+    return results
+
+
+
+def test_torus_tie_breaking():
+    """
+    Torus平局方向选择与O1TURN测试
+    
+    偶数规模Torus上每个节点向半环距离的节点发送数据包，比较各策略下
+    通道负载的均衡程度 (最大/平均) 和跳数开销 (应保持1.0，即不增加跳数)
+    
+    Returns:
+        Dict: 策略名称 -> (最大/平均通道负载比, 跳数开销)
+    """
+    print("\n\n=== Torus平局方向选择测试 ===")
+    
+    size = 8
+    cases = [
+        ("dor/direct", RoutingMode.DOR, TieBreak.DIRECT),
+        ("dor/random", RoutingMode.DOR, TieBreak.RANDOM),
+        ("dor/alternate", RoutingMode.DOR, TieBreak.ALTERNATE),
+        ("o1turn/direct", RoutingMode.O1TURN, TieBreak.DIRECT),
+        ("o1turn/alternate", RoutingMode.O1TURN, TieBreak.ALTERNATE),
+    ]
+    
+    results = {}
+    for name, mode, tie_break in cases:
+        config = TopoConfig(TopologyType.TORUS, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                            routing_mode=mode, tie_break=tie_break)
+        mesh = HybridMirandaMesh(topology_type=TopologyType.TORUS, topology_config=config,
+                                 enable_sst_stats=False, seed=1, verbose=False)
+        for _ in range(8):
+            for node_id, node in mesh.nodes.items():
+                dst = mesh.get_node_by_position((node.x + size // 2) % size, (node.y + size // 2) % size)
+                mesh.send_message(node_id, dst.node_id, "half-ring")
+            for _ in range(4):
+                mesh.simulate_step()
+        while mesh.packets_in_flight() > 0:
+            mesh.simulate_step()
+        
+        loads = [node.traffic_by_direction[direction]["packets"]
+                 for node in mesh.nodes.values()
+                 for direction in (Direction.NORTH, Direction.SOUTH, Direction.EAST, Direction.WEST)]
+        imbalance = max(loads) / (sum(loads) / len(loads))
+        results[name] = (imbalance, mesh.hop_overhead())
+        print(f"  {name:>16}: 最大/平均通道负载 {imbalance:.2f}, "
+              f"空闲通道 {loads.count(0)}/{len(loads)}, 跳数开销 {mesh.hop_overhead():.2f}×")
+        assert abs(mesh.hop_overhead() - 1.0) < 1e-9, f"{name}: 平局方向选择增加了跳数"
+    
+    # 交替策略应比总选正方向更均衡
+    for mode in ("dor", "o1turn"):
+        direct, alternate = results[f"{mode}/direct"][0], results[f"{mode}/alternate"][0]
+        assert alternate < direct, f"{mode}: alternate 负载比 {alternate:.2f} 不低于 direct {direct:.2f}"
+    
+    return results
+
+
+
+def test_virtual_channel_deadlock():
+    """
+    虚拟通道与日期线死锁避免测试
+    
+    在相同的每端口缓冲预算下，以高负载均匀流量运行有界缓冲的Mesh和Torus:
+    单虚拟通道Torus的环上存在循环依赖可能死锁，双虚拟通道 + 日期线应能排空
+    
+    Returns:
+        Dict: 配置名称 -> (是否排空, 已接收吞吐量, 平均延迟周期)
+    """
+    print("\n\n=== 虚拟通道死锁避免测试 ===")
+    
+    size = 8
+    port_budget = 4
+    cases = [
+        ("mesh 1VC", TopologyType.MESH, 1),
+        ("mesh 2VC", TopologyType.MESH, 2),
+        ("torus 1VC", TopologyType.TORUS, 1),
+        ("torus 2VC dateline", TopologyType.TORUS, 2),
+    ]
+    
+    results = {}
+    for name, topo_type, num_vcs in cases:
+        config = TopoConfig(topo_type, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                            virtual_channels=num_vcs, buffer_depth=port_budget // num_vcs)
+        traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.8, packets_per_node=100)
+        mesh = HybridMirandaMesh(topology_type=topo_type, topology_config=config,
+                                 enable_sst_stats=False, traffic_config=traffic,
+                                 stall_limit=200, seed=2, verbose=False)
+        
+        # 运行至全部数据包送达，看门狗连续stall_limit个周期无进展视为死锁
+        while mesh.current_cycle < 5000:
+            mesh.simulate_step()
+            received = sum(node.packets_received for node in mesh.nodes.values())
+            if mesh.packets_in_flight() == 0 and received >= size * size * traffic.packets_per_node:
+                break
+            if mesh.stalled_cycles() >= mesh.stall_limit:
+                break
+        
+        drained = mesh.packets_in_flight() == 0
+        latencies = [lat for node in mesh.nodes.values() for lat in node.packet_latency_cycles]
+        avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
+        results[name] = (drained, mesh.accepted_throughput(), avg_latency)
+        status = "✅ 排空" if drained else f"❌ 死锁 (在途 {mesh.packets_in_flight()} 包)"
+        print(f"  {name:>18}: {status}, 周期 {mesh.current_cycle}, "
+              f"吞吐量 {mesh.accepted_throughput():.3f}, 平均延迟 {avg_latency:.1f} 周期")
+        if not drained:
+            diagnostics = mesh.diagnose_stall()
+            kind = "循环等待" if diagnostics.is_cycle else "等待链"
+            print(f"  {'':>18}  {kind}经过节点: {diagnostics.chain_nodes()}")
+        # 只有单虚拟通道Torus的环上存在循环依赖，其余配置必须排空
+        assert drained or (topo_type == TopologyType.TORUS and num_vcs == 1), f"{name}: 未排空"
+    
+    return results
+
+
+
+def test_switch_allocator_latency():
+    """
+    交换分配器延迟测试
+    
+    在不同负载下比较理想模型与轮询/iSLIP分配器的平均延迟、吞吐量和
+    输入端口等待周期，显示分配器在高负载下对延迟的贡献
+    
+    Returns:
+        Dict: (分配器, 注入率) -> (吞吐量, 平均延迟周期, 平均输入端口等待周期)
+    """
+    print("\n\n=== 交换分配器延迟测试 ===")
+    
+    size = 8
+    cycles = 400
+    allocators = [AllocatorType.IDEAL, AllocatorType.ROUND_ROBIN, AllocatorType.ISLIP]
+    
+    results = {}
+    for injection_rate in (0.1, 0.3, 0.5):
+        print(f"\n  Mesh {size}×{size}, 均匀流量, 注入率 {injection_rate}:")
+        for allocator in allocators:
+            config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                                virtual_channels=2, buffer_depth=4, switch_allocator=allocator,
+                                islip_iterations=2)
+            traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=injection_rate,
+                                    packets_per_node=cycles)
+            mesh = HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config,
+                                     enable_sst_stats=False, traffic_config=traffic, seed=4, verbose=False)
+            for _ in range(cycles):
+                mesh.simulate_step()
+            
+            received = sum(node.packets_received for node in mesh.nodes.values())
+            latencies = [lat for node in mesh.nodes.values() for lat in node.packet_latency_cycles]
+            avg_latency = sum(latencies) / len(latencies) if latencies else 0.0
+            avg_wait = (sum(node.total_switch_wait_cycles for node in mesh.nodes.values()) / received
+                        if received else 0.0)
+            results[(allocator.value, injection_rate)] = (mesh.accepted_throughput(), avg_latency, avg_wait)
+            print(f"    {allocator.value:>12}: 吞吐量 {mesh.accepted_throughput():.3f}, "
+                  f"平均延迟 {avg_latency:.1f} 周期, 输入端口等待 {avg_wait:.2f} 周期/包")
+    
+    for injection_rate in (0.1, 0.3, 0.5):
+        ideal_latency = results[(AllocatorType.IDEAL.value, injection_rate)][1]
+        for allocator in allocators:
+            throughput, avg_latency, _ = results[(allocator.value, injection_rate)]
+            # 理想模型没有交换冲突，延迟是各分配器的下限
+            assert avg_latency >= ideal_latency, \
+                f"{allocator.value} @ {injection_rate}: 平均延迟 {avg_latency:.2f} 低于理想模型 {ideal_latency:.2f}"
+            # 低负载下所有分配器都能接收全部提供负载
+            if injection_rate <= 0.1:
+                assert abs(throughput - injection_rate) < 0.1 * injection_rate, \
+                    f"{allocator.value} @ {injection_rate}: 吞吐量 {throughput:.3f} 与提供负载不符"
+    
+    return results
+
+
+
+def test_mirror_flow_latency():
+    """
+    镜像流延迟对称性回归测试
+    
+    在空载8×8 Mesh上分别发送方向相反的单个数据包 (行、列和对角)，延迟只应取决于
+    跳数而与节点处理顺序无关: 每个数据包每周期至多前进一跳，延迟 = 跳数 + 1 周期
+    
+    Returns:
+        Dict: (配置名称, 源, 目标) -> 延迟周期
+    """
+    print("\n\n=== 镜像流延迟对称性测试 ===")
+    
+    size = 8
+    cases = [
+        ("ideal 无界缓冲", AllocatorType.IDEAL, 0),
+        ("ideal 有界缓冲", AllocatorType.IDEAL, 2),
+        ("islip", AllocatorType.ISLIP, 4),
+    ]
+    flows = [((0, 0), (size - 1, 0)), ((0, 0), (0, size - 1)), ((0, 0), (size - 1, size - 1))]
+    
+    results = {}
+    for name, allocator, depth in cases:
+        for source, destination in flows:
+            latencies = []
+            for src, dst in ((source, destination), (destination, source)):
+                config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size,
+                                    total_nodes=size * size, virtual_channels=2, buffer_depth=depth,
+                                    switch_allocator=allocator)
+                mesh = HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config,
+                                         enable_sst_stats=False, verbose=False)
+                mesh.send_message_by_position(*src, *dst, "mirror")
+                for _ in range(4 * size):
+                    mesh.simulate_step()
+                latency = mesh.nodes[dst[1] * size + dst[0]].packet_latency_cycles[0]
+                results[(name, src, dst)] = latency
+                latencies.append(latency)
+            hops = abs(destination[0] - source[0]) + abs(destination[1] - source[1])
+            ok = latencies[0] == latencies[1] == hops + 1
+            status = "✅" if ok else "❌"
+            print(f"  {status} {name:>14}: {source}->{destination} {latencies[0]} 周期, "
+                  f"{destination}->{source} {latencies[1]} 周期 ({hops} 跳)")
+            assert ok, f"{name}: {source}<->{destination} 镜像延迟 {latencies} 不等于 {hops} 跳 + 1 周期"
+
+    
+    return results
+
+
+def test_measurement_phases():
+    """
+    预热/测量/排空测量方法学测试
+    
+    在不同负载下比较全部数据包的平均延迟与只统计测量包的平均延迟，
+    并显示稳态检测实际使用的预热周期数
+    
+    Returns:
+        Dict: 注入率 -> MeasurementResult
+    """
+    print("\n\n=== 预热/测量/排空测试 ===")
+    
+    size = 8
+    results = {}
+    for injection_rate in (0.1, 0.3, 0.4):
+        config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                            virtual_channels=2, buffer_depth=4)
+        traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=injection_rate, packets_per_node=0)
+        mesh = HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config,
+                                 enable_sst_stats=False, traffic_config=traffic, seed=6, verbose=False)
+        result = mesh.run_measurement(MeasurementConfig(warmup_cycles=2000, measurement_cycles=1000))
+        
+        all_latencies = [lat for node in mesh.nodes.values() for lat in node.packet_latency_cycles]
+        all_avg = sum(all_latencies) / len(all_latencies) if all_latencies else 0.0
+        results[injection_rate] = result
+        print(f"\n  注入率 {injection_rate}: 全部数据包平均延迟 {all_avg:.2f} 周期")
+        result.print_report()
+        # 均低于饱和负载: 测量包应全部排空，接收吞吐量等于提供负载
+        assert result.drained and result.measured_received == result.measured_packets, \
+            f"注入率 {injection_rate}: 测量包未全部接收 ({result.measured_received}/{result.measured_packets})"
+        assert abs(result.accepted_throughput - result.offered_load) < 0.05 * result.offered_load, (
+            f"注入率 {injection_rate}: 接收吞吐量 {result.accepted_throughput:.4f} "
+            f"与提供负载 {result.offered_load:.4f} 不符")
+
+    
+    return results
+
+
+
+def test_sampled_simulation():
+    """
+    采样模拟测试
+    
+    对同一负载分别做完整详细测量和SMARTS式采样模拟，比较平均延迟/吞吐量估计、
+    置信区间是否覆盖详细结果以及所用的墙钟时间
+    
+    Returns:
+        Tuple: (详细测量结果, 采样结果)
+    """
+    print("\n\n=== 采样模拟测试 ===")
+    
+    size = 8
+    
+    def build_mesh():
+        config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                            virtual_channels=2, buffer_depth=4)
+        traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.3, packets_per_node=0)
+        return HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config,
+                                 enable_sst_stats=False, traffic_config=traffic, seed=8, verbose=False)
+    
+    start = time.time()
+    detailed = build_mesh().run_measurement(MeasurementConfig(warmup_cycles=500, measurement_cycles=3000))
+    detailed_time = time.time() - start
+    print(f"\n  详细测量 ({detailed_time:.2f}s): 平均延迟 {detailed.avg_latency_cycles:.2f} 周期, "
+          f"吞吐量 {detailed.accepted_throughput:.4f}")
+    
+    start = time.time()
+    mesh = build_mesh()
+    result = mesh.simulate(30000, sampling=SamplingConfig(sample_period=3000, warmup_cycles=100,
+                                                                  sample_cycles=200))
+    sampled_time = time.time() - start
+    sampled = result.sampling
+    sampled.print_report()
+    breakdown_packets = sum(mesh.latency_breakdown.packets)
+    unit_packets = sum(sample.measured_received for sample in sampled.samples)
+    print(f"  {'✅' if breakdown_packets == unit_packets else '❌'} 延迟分解累计 {breakdown_packets:,} 个测量包, "
+          f"各采样单元共接收 {unit_packets:,} 个")
+    assert breakdown_packets == unit_packets, "延迟分解未累计全部采样单元的测量包"
+    covered = abs(sampled.mean_latency_cycles - detailed.avg_latency_cycles) <= sampled.latency_ci
+    print(f"  采样模拟 ({sampled_time:.2f}s, 覆盖 {result.cycles:,} 周期): "
+          f"置信区间{'覆盖' if covered else '未覆盖'}详细测量的平均延迟")
+    assert covered, (f"采样估计 {sampled.mean_latency_cycles:.2f} ± {sampled.latency_ci:.2f} 周期"
+                     f"未覆盖详细测量的平均延迟 {detailed.avg_latency_cycles:.2f} 周期")
+    
+    return detailed, sampled
+
+
+
+def _seeded_run_digest(args: Tuple[TopoConfig, TrafficConfig, int, int]) -> str:
+    """按种子运行给定周期数，返回逐节点周期级结果的摘要 (可在子进程中执行)"""
+    config, traffic, seed, cycles = args
+    mesh = HybridMirandaMesh(topology_type=config.topology_type, topology_config=config,
+                             enable_sst_stats=False, traffic_config=traffic, seed=seed, verbose=False)
+    for _ in range(cycles):
+        mesh.simulate_step()
+    summary = [(node.packets_sent, node.packets_received, node.total_hop_count, node.packet_latency_cycles)
+               for node in mesh.nodes.values()]
+    return hashlib.sha256(repr(summary).encode()).hexdigest()[:16]
+
+
+def test_deterministic_seeds():
+    """
+    确定性种子测试
+    
+    同一种子在当前进程中重复运行、以及在进程池中并行运行的结果必须一致，
+    不同种子的结果应不同 (使用随机路由和随机平局策略覆盖路由随机数流)
+    
+    Returns:
+        Dict: 运行方式 -> 结果摘要
+    """
+    print("\n\n=== 确定性种子测试 ===")
+    
+    from concurrent.futures import ProcessPoolExecutor
+    
+    size = 8
+    config = TopoConfig(TopologyType.TORUS, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                        routing_mode=RoutingMode.VALIANT, tie_break=TieBreak.RANDOM,
+                        virtual_channels=2, buffer_depth=4)
+    traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.2, message_size_min=32,
+                            message_size_max=128, packets_per_node=0)
+    cycles = 200
+    
+    digests = {
+        "单进程 seed=7": _seeded_run_digest((config, traffic, 7, cycles)),
+        "单进程 seed=7 (重复)": _seeded_run_digest((config, traffic, 7, cycles)),
+        "单进程 seed=8": _seeded_run_digest((config, traffic, 8, cycles)),
+    }
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        for index, digest in enumerate(pool.map(_seeded_run_digest, [(config, traffic, 7, cycles)] * 2)):
+            digests[f"进程池 seed=7 #{index}"] = digest
+    
+    for name, digest in digests.items():
+        print(f"  {name:>20}: {digest}")
+    reference = digests["单进程 seed=7"]
+    reproducible = all(digest == reference for name, digest in digests.items() if "seed=7" in name)
+    print(f"  {'✅' if reproducible else '❌'} 相同种子结果一致, "
+          f"{'✅' if digests['单进程 seed=8'] != reference else '❌'} 不同种子结果不同")
+    assert reproducible, "相同种子在单进程/进程池中的结果不一致"
+    assert digests["单进程 seed=8"] != reference, "不同种子得到了相同的结果"
+    
+    return digests
+
+
+
+def test_event_log_sinks():
+    """
+    结构化事件日志测试
+    
+    同一种子分别以JSONL文件、控制台文本和按类别采样三种方式记录事件:
+    JSONL行数应等于emit次数，注入/弹出事件数等于发送/接收包数；文本输出的发送行
+    应与按模板格式化JSONL记录的结果逐行相同；采样类别的记录比例应接近采样率，
+    未采样类别不受影响
+    
+    Returns:
+        Dict: 检查项 -> 是否通过
+    """
+    print("\n\n=== 结构化事件日志测试 ===")
+    
+    import contextlib
+    import io
+    import tempfile
+    
+    size = 4
+    config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                        virtual_channels=2, buffer_depth=4)
+    traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.3, packets_per_node=40)
+    cycles = 300
+    
+    def run(events: EventLog) -> HybridMirandaMesh:
+        mesh = HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config, enable_sst_stats=False,
+                                 traffic_config=traffic, seed=11, events=events, verbose=False)
+        for _ in range(cycles):
+            mesh.simulate_step()
+        events.close()
+        return mesh
+    
+    def read_jsonl(path: str) -> List[Dict[str, Any]]:
+        with open(path, encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle]
+    
+    checks = {}
+    with tempfile.TemporaryDirectory() as directory:
+        full_path = os.path.join(directory, "events.jsonl")
+        full_log = EventLog(path=full_path, batch_size=64)
+        mesh = run(full_log)
+        records = read_jsonl(full_path)
+        counts: Dict[str, int] = {}
+        for record in records:
+            counts[record["event"]] = counts.get(record["event"], 0) + 1
+        sent = sum(node.packets_sent for node in mesh.nodes.values())
+        received = sum(node.packets_received for node in mesh.nodes.values())
+        checks["JSONL行数 = emit次数"] = len(records) == full_log.emitted
+        checks["send事件 = 发送包数"] = counts.get("send", 0) == sent
+        checks["receive事件 = 接收包数"] = counts.get("receive", 0) == received
+        print(f"  JSONL: {len(records):,} 行, send {counts.get('send', 0)}/{sent}, "
+              f"receive {counts.get('receive', 0)}/{received}, forward {counts.get('forward', 0)}")
+        
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            run(EventLog(console=True, categories=[EventCategory.INJECTION]))
+        text_lines = [line for line in output.getvalue().splitlines() if line]
+        expected = [EVENT_TEXT["send"].format(**record) for record in records if record["event"] == "send"]
+        checks["文本发送行与JSONL一致"] = text_lines == expected
+        print(f"  文本: {len(text_lines):,} 行发送事件, 与JSONL格式化结果{'一致' if text_lines == expected else '不一致'}")
+        
+        rate = 0.25
+        sampled_path = os.path.join(directory, "sampled.jsonl")
+        sampled_log = EventLog(path=sampled_path, sample_rates={EventCategory.ROUTING: rate}, seed=3)
+        run(sampled_log)
+        sampled_counts: Dict[str, int] = {}
+        for record in read_jsonl(sampled_path):
+            sampled_counts[record["event"]] = sampled_counts.get(record["event"], 0) + 1
+        forwards = counts.get("forward", 0)
+        kept = sampled_counts.get("forward", 0)
+        fraction = kept / forwards if forwards else 0.0
+        # 二项分布: 记录比例与采样率之差不超过4个标准差
+        tolerance = 4 * math.sqrt(rate * (1 - rate) / max(forwards, 1))
+        checks["采样前事件总数不变"] = kept + sampled_log.sampled_out == forwards
+        checks["采样比例接近采样率"] = abs(fraction - rate) <= tolerance
+        checks["未采样类别完整"] = sampled_counts.get("send", 0) == counts.get("send", 0)
+        print(f"  采样: forward 记录 {kept}/{forwards} ({fraction:.3f}, 采样率 {rate}), "
+              f"丢弃 {sampled_log.sampled_out}, send {sampled_counts.get('send', 0)}")
+    
+    for name, ok in checks.items():
+        print(f"  {'✅' if ok else '❌'} {name}")
+    failed = [name for name, ok in checks.items() if not ok]
+    assert not failed, f"事件日志检查失败: {', '.join(failed)}"
+    return checks
+
+
+def test_flow_sketch_quantiles():
+    """
+    逐流延迟草图测试
+    
+    置换流量 (bit_complement) 下每个目标节点只接收一条流，因此节点的延迟样本就是
+    该流的精确样本: 草图p99与精确最近秩p99的相对误差不应超过SKETCH_RELATIVE_ACCURACY；
+    worst_flows按p99返回的流应与按草图分位数全量排序的结果一致
+    
+    Returns:
+        Dict: 流 (源, 目标) -> (草图p99, 精确p99)
+    """
+    print("\n\n=== 逐流延迟草图测试 ===")
+    
+    size = 8
+    config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                        virtual_channels=2, buffer_depth=2)
+    # 接近饱和的负载使尾部延迟超过草图的精确计数范围，覆盖对数分桶
+    traffic = TrafficConfig(pattern=TrafficPattern.BIT_COMPLEMENT, injection_rate=0.25, packets_per_node=0)
+    mesh = HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config, enable_sst_stats=False,
+                             traffic_config=traffic, seed=9, verbose=False)
+    for _ in range(700):
+        mesh.simulate_step()
+    
+    results = {}
+    worst_error = 0.0
+    logarithmic = 0
+    for node in mesh.nodes.values():
+        for source, flow in node.flow_stats.items():
+            samples = sorted(node.packet_latency_cycles)
+            exact = float(samples[max(0, math.ceil(0.99 * len(samples)) - 1)])
+            estimate = flow.quantile(0.99)
+            results[(source, node.node_id)] = (estimate, exact)
+            worst_error = max(worst_error, abs(estimate - exact) / exact if exact else 0.0)
+            logarithmic += exact > SKETCH_EXACT_LIMIT
+    ok = worst_error <= SKETCH_RELATIVE_ACCURACY + 1e-9
+    print(f"  {'✅' if ok else '❌'} {len(results)} 条流, 其中 {logarithmic} 条p99超过精确计数范围, "
+          f"草图p99最大相对误差 {worst_error:.4f} (上限 {SKETCH_RELATIVE_ACCURACY})")
+    assert ok, f"草图p99相对误差 {worst_error:.4f} 超过 {SKETCH_RELATIVE_ACCURACY}"
+    
+    top = 5
+    worst = mesh.worst_flows("p99_latency_cycles", top=top)
+    ranked = sorted(results.values(), key=lambda pair: pair[0], reverse=True)[:top]
+    ok = [flow.p99_latency_cycles for flow in worst] == [estimate for estimate, _ in ranked]
+    print(f"  {'✅' if ok else '❌'} worst_flows p99 前{top}: "
+          f"{', '.join(f'{flow.source}->{flow.destination} {flow.p99_latency_cycles:.0f}' for flow in worst)}")
+    assert ok, "worst_flows按p99返回的流与全量排序结果不一致"
+    
+    slowest = mesh.worst_flows("throughput", top=top)
+    ok = all(a.throughput <= b.throughput for a, b in zip(slowest, slowest[1:]))
+    print(f"  {'✅' if ok else '❌'} worst_flows 吞吐量按从小到大排序: "
+          f"{', '.join(f'{flow.throughput:.4f}' for flow in slowest)}")
+    assert ok, "worst_flows按吞吐量返回的流未按从小到大排序"
+    
+    return results
+
+
+def test_latency_breakdown_components():
+    """
+    延迟分解一致性测试
+    
+    不同分配器、缓冲深度和拓扑下，全部已接收数据包的各延迟分量之和应等于端到端
+    延迟周期数之和，链路传输分量应等于总跳数 (每跳恰好一个链路周期)
+    
+    Returns:
+        Dict: 配置名称 -> 各分量平均周期数
+    """
+    print("\n\n=== 延迟分解一致性测试 ===")
+    
+    size = 8
+    cases = [
+        ("mesh ideal 无界缓冲", TopologyType.MESH, RoutingMode.DOR, AllocatorType.IDEAL, 0),
+        ("mesh ideal 有界缓冲", TopologyType.MESH, RoutingMode.DOR, AllocatorType.IDEAL, 2),
+        ("mesh islip", TopologyType.MESH, RoutingMode.DOR, AllocatorType.ISLIP, 4),
+        ("torus valiant 轮询", TopologyType.TORUS, RoutingMode.VALIANT, AllocatorType.ROUND_ROBIN, 4),
+    ]
+    
+    results = {}
+    for name, topo_type, mode, allocator, depth in cases:
+        config = TopoConfig(topo_type, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                            routing_mode=mode, virtual_channels=4, buffer_depth=depth,
+                            switch_allocator=allocator)
+        traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.3, packets_per_node=0)
+        mesh = HybridMirandaMesh(topology_type=topo_type, topology_config=config, enable_sst_stats=False,
+                                 traffic_config=traffic, seed=5, verbose=False)
+        for _ in range(300):
+            mesh.simulate_step()
+        
+        breakdown = mesh.latency_breakdown
+        component_totals = [sum(totals[index] for totals in breakdown.total_cycles)
+                            for index in range(len(LATENCY_COMPONENTS))]
+        link_total = component_totals[list(LATENCY_COMPONENTS).index("link_traversal")]
+        latency_total = sum(sum(node.packet_latency_cycles) for node in mesh.nodes.values())
+        hop_total = sum(node.total_hop_count for node in mesh.nodes.values())
+        packets = sum(node.packets_received for node in mesh.nodes.values())
+        ok = (sum(breakdown.packets) == packets and sum(component_totals) == latency_total
+              and link_total == hop_total)
+        results[name] = breakdown.component_means()
+        print(f"  {'✅' if ok else '❌'} {name:>18}: {packets:,} 包, 分量合计 {sum(component_totals):,} / "
+              f"延迟合计 {latency_total:,} 周期, 链路 {link_total:,} / 跳数 {hop_total:,}")
+        assert ok, f"{name}: 延迟分量之和或链路周期与端到端延迟/跳数不一致"
+    
+    return results
+
+
+def test_occupancy_monitor_alerts():
+    """
+    端口占用告警测试
+    
+    逐周期按各节点输出虚拟通道的周期末长度暴力计算端口占用和超阈值区间，
+    与OccupancyMonitor增量维护得到的告警 (阈值、端口、区间起点、告警周期) 逐一比较
+    
+    Returns:
+        List[CongestionAlert]: 监测器产生的告警
+    """
+    print("\n\n=== 端口占用告警测试 ===")
+    
+    size = 4
+    config = TopoConfig(TopologyType.MESH, mesh_size_x=size, mesh_size_y=size, total_nodes=size * size,
+                        virtual_channels=2, buffer_depth=2)
+    traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.9, packets_per_node=0)
+    mesh = HybridMirandaMesh(topology_type=TopologyType.MESH, topology_config=config, enable_sst_stats=False,
+                             traffic_config=traffic, seed=4, verbose=False)
+    thresholds = [CongestionThreshold(0.5, 3, "半满"), CongestionThreshold(1.0, 0, "全满"),
+                  CongestionThreshold(0.75, 10, "持续")]
+    monitor = mesh.enable_occupancy_monitor(thresholds)
+    limits = [max(1, math.ceil(threshold.occupancy * monitor.capacity - 1e-9)) for threshold in thresholds]
+    
+    expected = []
+    above_since: Dict[Tuple[int, int, Direction], int] = {}
+    for _ in range(400):
+        mesh.simulate_step()
+        cycle = mesh.current_cycle
+        for node in mesh.nodes.values():
+            for direction in MONITORED_DIRECTIONS:
+                occupancy = sum(len(queue) for queue in node.output_queues[direction])
+                for index, limit in enumerate(limits):
+                    key = (index, node.node_id, direction)
+                    if occupancy < limit:
+                        above_since.pop(key, None)
+                        continue
+                    since = above_since.setdefault(key, cycle)
+                    if cycle - since == thresholds[index].cycles:
+                        expected.append((thresholds[index].name, node.node_id, direction, since, cycle))
+    
+    actual = [(alert.threshold.name, alert.node_id, alert.direction, alert.since_cycle, alert.cycle)
+              for alert in monitor.alerts]
+    ok = sorted(actual, key=repr) == sorted(expected, key=repr)
+    per_threshold = {threshold.name: sum(1 for alert in actual if alert[0] == threshold.name)
+                     for threshold in thresholds}
+    print(f"  {'✅' if ok else '❌'} 监测器告警 {len(actual)} 次, 逐周期暴力计算 {len(expected)} 次 "
+          f"({', '.join(f'{name} {count}' for name, count in per_threshold.items())})")
+    assert ok, f"监测器告警与逐周期暴力计算不一致: {len(actual)} / {len(expected)}"
+    
+    return monitor.alerts
+
+
 def test_comprehensive_traffic_analysis():
     """综合流量分析测试 - 展示完整的网络监控能力"""
     print("\n\n=== 综合流量分析测试 ===")
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Simulation Profiling
+
+逻辑引擎模拟循环的性能剖析工具
+- --phases: 启用内置阶段剖析 (HybridMirandaMesh.enable_profiling)，按阶段报告
+  墙钟时间和调用次数 (路由决策、队列操作、统计、日志输出等)
+- --cprofile PATH: 用cProfile包装模拟过程，写出火焰图工具 (flamegraph.pl、speedscope)
+  可直接读取的折叠调用栈文件，每行 "调用者;...;被调用者 微秒数"
+
+cProfile只记录调用边而不记录完整调用栈，折叠栈由调用图按每条调用边占被调用函数
+总时间的比例向下展开得到 (与flameprof等工具相同的近似)
+
+使用方法:
+    python profiling.py --topology torus --shape 16x16 --load 0.2 --cycles 200 --phases --json phases.json
+    python profiling.py --shape 8x8 --load 0.3 --cycles 500 --cprofile mesh.folded
+    flamegraph.pl mesh.folded > mesh.svg
+"""
+
+# 标准库导入
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import time
+from typing import Dict, List, Optional, Tuple
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import HybridMirandaMesh
+from result_cache import add_run_arguments, spec_from_args
+
+# 折叠调用栈的最大展开深度和最小输出时间 (微秒)
+MAX_STACK_DEPTH = 64
+MIN_STACK_MICROSECONDS = 1
+
+
+# =============================================================================
+# cProfile折叠调用栈
+# =============================================================================
+
+def _frame_name(function: Tuple[str, int, str]) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name.strip("<>").replace(" ", "_")
+    return f"{os.path.basename(filename)}:{name}:{line}"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> Dict[str, float]:
+    """
+    由cProfile统计生成折叠调用栈
+
+    从没有调用者的根函数出发沿调用边展开，每个函数在当前路径上的时间份额
+    按 "该调用边的累计时间 / 函数总累计时间" 分配给其自身时间和各被调用函数
+
+    Returns:
+        Dict[str, float]: "f1;f2;...;fn" -> 自身时间 (秒)
+    """
+    entries = stats.stats
+    callees: Dict[tuple, List[Tuple[tuple, float]]] = {}
+    for function, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            callees.setdefault(caller, []).append((function, edge_cumulative))
+
+    stacks: Dict[str, float] = {}
+
+    def expand(function: tuple, share: float, path: List[str], on_path: set):
+        _, _, self_time, cumulative, _ = entries[function]
+        if cumulative <= 0 or share <= 0:
+            return
+        fraction = min(share / cumulative, 1.0)
+        path.append(_frame_name(function))
+        key = ";".join(path)
+        stacks[key] = stacks.get(key, 0.0) + self_time * fraction
+        if len(path) < MAX_STACK_DEPTH:
+            on_path.add(function)
+            for callee, edge_cumulative in callees.get(function, []):
+                if callee in on_path:
+                    continue
+                expand(callee, edge_cumulative * fraction, path, on_path)
+            on_path.discard(function)
+        path.pop()
+
+    for function, (_, _, _, cumulative, callers) in entries.items():
+        if not callers:
+            expand(function, cumulative, [], set())
+    return stacks
+
+
+def write_collapsed(stats: pstats.Stats, path: str) -> int:
+    """写出折叠调用栈文件 (时间单位为微秒)，返回写出的栈数"""
+    stacks = collapsed_stacks(stats)
+    count = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        for stack, seconds in sorted(stacks.items()):
+            microseconds = int(round(seconds * 1e6))
+            if microseconds >= MIN_STACK_MICROSECONDS:
+                handle.write(f"{stack} {microseconds}\n")
+                count += 1
+    return count
+
+
+# =============================================================================
+# 命令行接口
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="逻辑引擎模拟循环性能剖析")
+    add_run_arguments(parser)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--phases", action="store_true", help="启用内置阶段剖析并打印报告")
+    mode.add_argument("--cprofile", metavar="PATH",
+                      help="用cProfile包装模拟并写出折叠调用栈 (不与--phases同时使用，避免计时包装出现在栈中)")
+    parser.add_argument("--json", metavar="PATH", help="把阶段剖析结果写入JSON文件")
+    parser.add_argument("--show-output", action="store_true", help="不丢弃模拟过程中的标准输出")
+    args = parser.parse_args(argv)
+
+    spec = spec_from_args(args)
+    mesh = HybridMirandaMesh(topology_type=spec.topology_config.topology_type,
+                             topology_config=spec.topology_config, enable_sst_stats=False,
+                             traffic_config=spec.traffic_config, seed=spec.seed, verbose=False)
+    with contextlib.ExitStack() as stack:
+        if not args.show_output:
+            devnull = stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        # 预热周期不计入剖析
+        for _ in range(args.warmup):
+            mesh.simulate_step()
+        profiler = mesh.enable_profiling() if args.phases else None
+        profile = cProfile.Profile() if args.cprofile else None
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        mesh.simulate(args.cycles)
+        if profile is not None:
+            profile.disable()
+        elapsed = time.perf_counter() - start
+        mesh.disable_profiling()
+
+    print(f"\n=== {args.topology.upper()} {args.shape}, {args.routing}, 负载 {args.load}: "
+          f"{args.cycles} 周期用时 {elapsed:.2f}s ===")
+    if profiler is not None:
+        profiler.print_report()
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as handle:
+                json.dump({"elapsed_seconds": elapsed, "cycles": args.cycles, "phases": profiler.to_dict()},
+                          handle, indent=2, ensure_ascii=False)
+            print(f"阶段剖析结果已写入: {args.json}")
+    if profile is not None:
+        count = write_collapsed(pstats.Stats(profile), args.cprofile)
+        print(f"折叠调用栈已写入: {args.cprofile} ({count} 个栈)")
+
+
+if __name__ == "__main__":
+    main()
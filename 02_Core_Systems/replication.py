@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Run-Until-Confidence Replication
+
+按置信区间自动决定重复次数的独立种子复制运行
+在进程池中以独立种子 (seed, seed+1, ...) 并行重复运行同一配置，
+每批完成后按种子顺序检查所选指标 (平均延迟、p99延迟、接收吞吐量) 的置信区间，
+区间半宽达到目标精度即停止，只在方差需要的地方花费计算量
+
+停止判定按种子顺序对已完成的复制取最短满足条件的前缀，因此结果与进程数无关；
+每次复制经结果缓存执行，重复研究时已完成的种子直接命中缓存
+
+使用方法:
+    python replication.py --topology torus --shape 8x8 --load 0.4 --metric p99_latency_cycles --rel-precision 0.05
+    python replication.py --topology mesh --shape 8x8 --load 0.3 --workers 8 --no-cache
+"""
+
+# 标准库导入
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import mean_confidence_interval
+from result_cache import (RunSpec, ResultCache, run_cached, add_run_arguments, spec_from_args,
+                          DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES)
+
+# 可用于停止判定的指标 (collect_statistics()["summary"] 中的字段)
+REPLICATION_METRICS: Dict[str, str] = {
+    "avg_latency_cycles": "平均延迟 (周期)",
+    "p99_latency_cycles": "p99延迟 (周期)",
+    "accepted_throughput": "接收吞吐量 (包/节点/周期)",
+}
+
+
+# =============================================================================
+# 结果数据结构
+# =============================================================================
+
+@dataclass
+class ReplicationResult:
+    """复制运行结果"""
+    metric: str
+    confidence: float
+    estimate: float                      # 指标均值
+    half_width: float                    # 置信区间半宽
+    replications: int                    # 用于估计的复制次数
+    converged: bool                      # 是否在max_replications内达到目标精度
+    seeds: List[int] = field(default_factory=list)
+    values: List[float] = field(default_factory=list)      # 各复制的指标值 (按种子顺序)
+    summaries: List[Dict[str, float]] = field(default_factory=list)  # 各复制的汇总指标
+    cache_hits: int = 0
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        return self.estimate - self.half_width, self.estimate + self.half_width
+
+    def mean_of(self, metric: str) -> Tuple[float, float]:
+        """同一组复制上其他指标的均值和置信区间半宽"""
+        return mean_confidence_interval([summary[metric] for summary in self.summaries], self.confidence)
+
+
+# =============================================================================
+# 复制驱动
+# =============================================================================
+
+def _run_replication(args: Tuple[RunSpec, Optional[str], int]) -> Tuple[Dict[str, float], bool]:
+    """进程池工作函数: 执行一次 (可能命中缓存的) 运行，返回汇总指标"""
+    spec, cache_dir, max_bytes = args
+    cache = ResultCache(cache_dir, max_bytes) if cache_dir is not None else None
+    statistics, hit = run_cached(spec, cache)
+    return statistics["summary"], hit
+
+
+def _precision_reached(values: List[float], confidence: float, rel_precision: float,
+                       abs_precision: Optional[float]) -> bool:
+    mean, half_width = mean_confidence_interval(values, confidence)
+    if abs_precision is not None:
+        return half_width <= abs_precision
+    return half_width <= rel_precision * abs(mean)
+
+
+def replicate(spec: RunSpec, metric: str = "avg_latency_cycles", confidence: float = 0.95,
+              rel_precision: float = 0.05, abs_precision: Optional[float] = None,
+              min_replications: int = 3, max_replications: int = 50, workers: Optional[int] = None,
+              cache: Optional[ResultCache] = None, verbose: bool = True) -> ReplicationResult:
+    """
+    以独立种子重复运行直到指标的置信区间足够窄
+
+    Args:
+        spec: 运行描述，第i次复制使用种子 spec.seed + i
+        metric: 停止判定指标 (见REPLICATION_METRICS)
+        confidence: 置信水平
+        rel_precision: 目标相对精度 (区间半宽 / 均值)
+        abs_precision: 目标绝对精度 (区间半宽)，设置后代替相对精度
+        min_replications: 最少复制次数 (≥2)
+        max_replications: 最多复制次数
+        workers: 进程数，None时使用CPU核数
+        cache: 结果缓存，None时不使用缓存
+        verbose: 是否打印每批进度
+
+    Returns:
+        ReplicationResult: 估计值、置信区间和实际使用的复制次数
+    """
+    if metric not in REPLICATION_METRICS:
+        raise ValueError(f"未知的指标: {metric} (可选: {', '.join(REPLICATION_METRICS)})")
+    if not 2 <= min_replications <= max_replications:
+        raise ValueError("需要 2 ≤ min_replications ≤ max_replications")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence必须在0和1之间: {confidence}")
+
+    workers = workers or os.cpu_count() or 1
+    cache_args = (cache.directory, cache.max_bytes) if cache is not None else (None, DEFAULT_MAX_BYTES)
+    summaries: List[Dict[str, float]] = []
+    cache_hits = 0
+    used = None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while len(summaries) < max_replications:
+            batch = min(max(workers, min_replications - len(summaries)), max_replications - len(summaries))
+            jobs = [(replace(spec, seed=spec.seed + len(summaries) + index), *cache_args) for index in range(batch)]
+            for summary, hit in pool.map(_run_replication, jobs):
+                summaries.append(summary)
+                cache_hits += hit
+
+            # 按种子顺序找最短的满足精度的前缀 (结果与批大小/进程数无关)
+            values = [summary[metric] for summary in summaries]
+            for count in range(min_replications, len(values) + 1):
+                if _precision_reached(values[:count], confidence, rel_precision, abs_precision):
+                    used = count
+                    break
+            if verbose:
+                mean, half_width = mean_confidence_interval(values, confidence)
+                print(f"  已完成 {len(values)} 次复制: {metric} = {mean:.4f} ± {half_width:.4f}")
+            if used is not None:
+                break
+
+    count = used if used is not None else len(summaries)
+    values = [summary[metric] for summary in summaries[:count]]
+    estimate, half_width = mean_confidence_interval(values, confidence)
+    return ReplicationResult(metric=metric, confidence=confidence, estimate=estimate, half_width=half_width,
+                             replications=count, converged=used is not None,
+                             seeds=[spec.seed + index for index in range(count)], values=values,
+                             summaries=summaries[:count], cache_hits=cache_hits)
+
+
+def print_report(result: ReplicationResult):
+    """打印复制运行报告"""
+    low, high = result.interval
+    status = "✅ 达到目标精度" if result.converged else "⚠️ 达到最大复制次数仍未达到目标精度"
+    print(f"\n📊 {REPLICATION_METRICS[result.metric]}: {result.estimate:.4f} "
+          f"[{low:.4f}, {high:.4f}] ({result.confidence * 100:.0f}%置信区间)")
+    print(f"   复制次数: {result.replications} (种子 {result.seeds[0]}-{result.seeds[-1]}, "
+          f"缓存命中 {result.cache_hits}) {status}")
+    for metric, label in REPLICATION_METRICS.items():
+        if metric != result.metric:
+            mean, half_width = result.mean_of(metric)
+            print(f"   {label}: {mean:.4f} ± {half_width:.4f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="按置信区间自动决定次数的独立种子复制运行")
+    add_run_arguments(parser)
+    parser.add_argument("--metric", choices=list(REPLICATION_METRICS), default="avg_latency_cycles",
+                        help="停止判定指标")
+    parser.add_argument("--confidence", type=float, default=0.95, help="置信水平")
+    parser.add_argument("--rel-precision", type=float, default=0.05, help="目标相对精度 (区间半宽/均值)")
+    parser.add_argument("--abs-precision", type=float, help="目标绝对精度 (区间半宽)，设置后代替相对精度")
+    parser.add_argument("--min-reps", type=int, default=3, help="最少复制次数")
+    parser.add_argument("--max-reps", type=int, default=50, help="最多复制次数")
+    parser.add_argument("--workers", type=int, help="进程数 (默认CPU核数)")
+    parser.add_argument("--no-cache", action="store_true", help="不读写结果缓存")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="缓存目录")
+    args = parser.parse_args(argv)
+
+    spec = spec_from_args(args)
+    cache = None if args.no_cache else ResultCache(args.cache_dir)
+    print(f"\n=== 复制运行: {args.topology.upper()} {args.shape}, {args.routing}, {args.pattern} "
+          f"负载 {args.load}, 指标 {args.metric} ===")
+    start = time.time()
+    result = replicate(spec, metric=args.metric, confidence=args.confidence, rel_precision=args.rel_precision,
+                       abs_precision=args.abs_precision, min_replications=args.min_reps,
+                       max_replications=args.max_reps, workers=args.workers, cache=cache)
+    print_report(result)
+    print(f"   用时 {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Simulation Result Cache
+
+按配置内容寻址的逻辑仿真结果缓存
+对完整TopoConfig (含路由模式)、硬件参数、流量配置、测量配置、运行种子和
+逻辑引擎版本做规范化JSON哈希，以哈希为键在磁盘上保存 collect_statistics() 的结果。
+命中时完全跳过仿真；缓存总大小超过上限时按最近使用时间 (文件mtime) 淘汰
+
+缓存目录默认为 ~/.cache/hybrid_miranda_mesh/results
+(可用环境变量 HYBRID_MESH_CACHE_DIR 覆盖)，不放在 statistics_output 下，
+因为 run_simulation.sh 每次运行都会清空该目录
+
+使用方法:
+    python result_cache.py --topology torus --shape 8x8 --routing dor --load 0.3 --seed 1
+    python result_cache.py --topology torus --shape 8x8 --load 0.3 --no-cache
+    python result_cache.py --list
+"""
+
+# 标准库导入
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import (TopologyType, RoutingMode, AllocatorType, TopoConfig, TrafficPattern,
+                                 TrafficConfig, MeasurementConfig, HybridMirandaMesh, ENGINE_VERSION,
+                                 config_to_dict)
+
+# 默认缓存目录和大小上限
+DEFAULT_CACHE_DIR = os.environ.get("HYBRID_MESH_CACHE_DIR",
+                                   os.path.join(os.path.expanduser("~"), ".cache", "hybrid_miranda_mesh", "results"))
+DEFAULT_MAX_BYTES = 256 * 1024**2
+
+# 默认硬件参数 (与HybridMirandaMesh构造参数一致)
+DEFAULT_HARDWARE: Dict[str, str] = {
+    "cpu_clock": "2.4GHz",
+    "cache_size": "32KiB",
+    "memory_size": "128MiB",
+    "link_bandwidth": "40GiB/s",
+    "link_latency": "50ps",
+}
+
+
+# =============================================================================
+# 运行描述
+# =============================================================================
+
+@dataclass
+class RunSpec:
+    """一次逻辑仿真运行的完整描述 (决定结果的全部输入)"""
+    topology_config: TopoConfig
+    traffic_config: TrafficConfig
+    seed: int = 1
+    measurement: MeasurementConfig = field(default_factory=MeasurementConfig)
+    hardware: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_HARDWARE))
+
+    def canonical(self) -> Dict[str, Any]:
+        """规范化的可JSON序列化描述 (哈希输入)"""
+        return {
+            "engine_version": ENGINE_VERSION,
+            "topology_config": config_to_dict(self.topology_config),
+            "traffic_config": config_to_dict(self.traffic_config),
+            "seed": self.seed,
+            "measurement": config_to_dict(self.measurement),
+            "hardware": dict(sorted(self.hardware.items())),
+        }
+
+    def key(self) -> str:
+        """内容寻址键 (规范化JSON的SHA-256)"""
+        text = json.dumps(self.canonical(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def run_spec(spec: RunSpec) -> Dict[str, Any]:
+    """执行一次运行 (预热/测量/排空) 并返回 collect_statistics() 的结果"""
+    mesh = HybridMirandaMesh(topology_type=spec.topology_config.topology_type,
+                             topology_config=spec.topology_config, **spec.hardware,
+                             enable_sst_stats=False, traffic_config=spec.traffic_config,
+                             seed=spec.seed, verbose=False)
+    mesh.run_measurement(spec.measurement)
+    return mesh.collect_statistics()
+
+
+# =============================================================================
+# 磁盘缓存
+# =============================================================================
+
+class ResultCache:
+    """
+    磁盘结果缓存
+
+    每个条目一个gzip压缩的JSON文件 (<键>.json.gz)，写入时先写临时文件再原子替换，
+    命中时更新文件mtime作为最近使用时间，多个进程可以共享同一缓存目录
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: 缓存目录
+            max_bytes: 缓存总大小上限 (字节)，超出时淘汰最久未使用的条目
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"缓存大小上限必须为正数: {max_bytes}")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，未命中或条目损坏时返回None"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                entry = json.load(handle)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry.get("statistics")
+
+    def put(self, key: str, spec: RunSpec, statistics: Dict[str, Any]):
+        """写入缓存条目 (同时保存规范化的运行描述)，然后按大小上限淘汰"""
+        entry = {"key": key, "spec": spec.canonical(), "created": time.time(), "statistics": statistics}
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with gzip.open(os.fdopen(handle, "wb"), "wt", encoding="utf-8") as output:
+                json.dump(entry, output, separators=(",", ":"))
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.evict()
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """缓存条目 (键, 字节数, 最近使用时间)，按最近使用时间从旧到新排序"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json.gz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((name[:-len(".json.gz")], stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self) -> int:
+        """淘汰最久未使用的条目直到总大小不超过上限，返回淘汰的条目数"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def clear(self) -> int:
+        """删除全部条目，返回删除的条目数"""
+        entries = self.entries()
+        for key, _, _ in entries:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        return len(entries)
+
+
+def run_cached(spec: RunSpec, cache: Optional[ResultCache] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    带缓存的运行
+
+    Args:
+        spec: 运行描述
+        cache: 结果缓存，None时总是重新仿真且不写缓存 (对应 --no-cache)
+
+    Returns:
+        Tuple[Dict, bool]: (统计结果, 是否命中缓存)
+    """
+    if cache is None:
+        return run_spec(spec), False
+    key = spec.key()
+    statistics = cache.get(key)
+    if statistics is not None:
+        return statistics, True
+    statistics = run_spec(spec)
+    cache.put(key, spec, statistics)
+    return statistics, False
+
+
+# =============================================================================
+# 测试函数
+# =============================================================================
+
+def test_result_cache():
+    """
+    结果缓存测试
+
+    在临时目录中检查: 命中时直接返回缓存条目而不仿真、超出很小的大小上限时
+    先淘汰最久未使用的条目 (命中会刷新mtime)、cache=None时既不读也不写缓存
+    """
+    print("\n\n=== 结果缓存测试 ===")
+
+    config = TopoConfig(TopologyType.MESH, mesh_size_x=4, mesh_size_y=4, total_nodes=16)
+    traffic = TrafficConfig(pattern=TrafficPattern.UNIFORM, injection_rate=0.1, packets_per_node=0)
+    measurement = MeasurementConfig(warmup_cycles=50, measurement_cycles=100)
+    specs = [RunSpec(config, traffic, seed=seed, measurement=measurement) for seed in (1, 2, 3, 4)]
+    keys = [spec.key() for spec in specs]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(os.path.join(directory, "results"))
+
+        # 命中: 条目内容被替换为标记后，run_cached返回标记而不是重新仿真的结果
+        statistics, hit = run_cached(specs[0], cache)
+        cache.put(keys[0], specs[0], {"marker": 1})
+        cached, cached_hit = run_cached(specs[0], cache)
+        ok = not hit and "summary" in statistics and cached_hit and cached == {"marker": 1}
+        print(f"  {'✅' if ok else '❌'} 首次运行写入缓存，再次运行命中缓存且跳过仿真")
+        assert ok, "缓存命中时应直接返回缓存条目而不重新仿真"
+
+        # cache=None: 不读取已有条目，也不写入新条目
+        before = sorted(os.listdir(cache.directory))
+        uncached, uncached_hit = run_cached(specs[0], None)
+        run_cached(specs[3], None)
+        ok = not uncached_hit and "summary" in uncached and sorted(os.listdir(cache.directory)) == before
+        print(f"  {'✅' if ok else '❌'} cache=None 时不读不写缓存目录")
+        assert ok, "cache=None 时不应读取或写入缓存"
+
+        # LRU淘汰: A早于B写入，命中A刷新其mtime后写入C超出上限，应淘汰B而保留A
+        for key, spec in zip(keys[:3], specs[:3]):
+            cache.put(key, spec, statistics)
+        sizes = {key: size for key, size, _ in cache.entries()}
+        os.utime(cache._path(keys[0]), (1000, 1000))
+        os.utime(cache._path(keys[1]), (2000, 2000))
+        os.remove(cache._path(keys[2]))
+        cache.max_bytes = sum(sizes.values()) - min(sizes.values()) // 2
+        assert cache.get(keys[0]) is not None, "缓存条目应能读取"
+        cache.put(keys[2], specs[2], statistics)
+        remaining = {key for key, _, _ in cache.entries()}
+        ok = remaining == {keys[0], keys[2]}
+        print(f"  {'✅' if ok else '❌'} 上限 {cache.max_bytes:,} 字节: 淘汰最久未使用的条目, "
+              f"保留最近命中的条目 (剩余 {len(remaining)} 个)")
+        assert ok, "超出大小上限时应先淘汰最久未使用的条目 (命中应刷新mtime)"
+
+
+# =============================================================================
+# 命令行接口
+# =============================================================================
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    """添加描述一次运行的命令行参数"""
+    parser.add_argument("--shape", default="8x8", help="网格大小，如 8x8")
+    parser.add_argument("--topology", choices=["mesh", "torus"], default="mesh", help="拓扑类型")
+    parser.add_argument("--routing", choices=[m.value for m in RoutingMode], default="dor", help="路由模式")
+    parser.add_argument("--vcs", type=int, default=2, help="每端口虚拟通道数")
+    parser.add_argument("--buffer-depth", type=int, default=4, help="每虚拟通道缓冲深度")
+    parser.add_argument("--allocator", choices=[a.value for a in AllocatorType], default="ideal",
+                        help="交换分配器模型")
+    parser.add_argument("--pattern", choices=[p.value for p in TrafficPattern], default="uniform",
+                        help="合成流量模式")
+    parser.add_argument("--load", type=float, default=0.1, help="提供负载 (包/节点/周期)")
+    parser.add_argument("--seed", type=int, default=1, help="运行种子")
+    parser.add_argument("--warmup", type=int, default=500, help="预热周期上限")
+    parser.add_argument("--cycles", type=int, default=1000, help="测量窗口周期数")
+
+
+def spec_from_args(args: argparse.Namespace) -> RunSpec:
+    """由命令行参数构造运行描述"""
+    size_x, size_y = (int(v) for v in args.shape.lower().split("x"))
+    config = TopoConfig(TopologyType(args.topology), mesh_size_x=size_x, mesh_size_y=size_y,
+                        total_nodes=size_x * size_y, routing_mode=RoutingMode(args.routing),
+                        virtual_channels=args.vcs, buffer_depth=args.buffer_depth,
+                        switch_allocator=AllocatorType(args.allocator))
+    traffic = TrafficConfig(pattern=TrafficPattern(args.pattern), injection_rate=args.load, packets_per_node=0)
+    measurement = MeasurementConfig(warmup_cycles=args.warmup, measurement_cycles=args.cycles)
+    return RunSpec(config, traffic, seed=args.seed, measurement=measurement)
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="按配置哈希缓存的逻辑仿真运行")
+    add_run_arguments(parser)
+    parser.add_argument("--no-cache", action="store_true", help="不读写结果缓存，总是重新仿真")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="缓存目录")
+    parser.add_argument("--max-size-mb", type=float, default=DEFAULT_MAX_BYTES / 1024**2, help="缓存大小上限 (MiB)")
+    parser.add_argument("--list", action="store_true", help="列出缓存条目")
+    parser.add_argument("--clear", action="store_true", help="清空缓存")
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else ResultCache(args.cache_dir, int(args.max_size_mb * 1024**2))
+    if args.list or args.clear:
+        if cache is None:
+            parser.error("--list/--clear 不能与 --no-cache 同时使用")
+        if args.clear:
+            print(f"已删除 {cache.clear()} 个缓存条目")
+            return
+        entries = cache.entries()
+        print(f"\n=== 结果缓存 {cache.directory}: {len(entries)} 个条目, "
+              f"{sum(size for _, size, _ in entries) / 1024:.1f} KiB ===")
+        for key, size, used in reversed(entries):
+            print(f"  {key[:16]}  {size / 1024:8.1f} KiB  最近使用 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(used))}")
+        return
+
+    spec = spec_from_args(args)
+    start = time.time()
+    statistics, hit = run_cached(spec, cache)
+    summary = statistics["summary"]
+    source = "缓存命中" if hit else ("未使用缓存" if cache is None else "已仿真并写入缓存")
+    print(f"\n=== {args.topology.upper()} {args.shape}, {args.routing}, {args.pattern} 负载 {args.load}, "
+          f"seed {args.seed} ({source}, {time.time() - start:.2f}s) ===")
+    print(f"  键: {spec.key()[:16]}")
+    print(f"  接收吞吐量 {summary['accepted_throughput']:.4f} 包/节点/周期, "
+          f"平均延迟 {summary['avg_latency_cycles']:.2f} 周期, p99 {summary['p99_latency_cycles']:.0f} 周期, "
+          f"平均跳数 {summary['avg_hop_count']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
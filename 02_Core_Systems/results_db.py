@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Simulation Results Database
+
+基于SQLite的本地运行结果库
+每次运行一行: 配置列 (拓扑、规模、路由、虚拟通道、分配器、流量、种子、测量窗口)、
+汇总指标列 (吞吐量、平均/p99延迟、跳数) 和指向逐节点/逐链路列式数据 (.npz) 的路径。
+常用扫描维度建有索引，查询不再需要遍历和解析JSON导出文件
+
+数据库默认位于 ~/.local/share/hybrid_miranda_mesh/results.db
+(可用环境变量 HYBRID_MESH_RESULTS_DB 覆盖)，不放在 statistics_output 下，
+因为 run_simulation.sh 每次运行都会清空该目录
+
+使用方法:
+    python results_db.py run --topology torus --shape 8x8 --load 0.3 --seed 1
+    python results_db.py import-cache
+    python results_db.py curve --topology torus --shape 8x8 --metric p99_latency_cycles
+    python results_db.py list --topology torus --routing valiant
+"""
+
+# 标准库导入
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 第三方库
+import numpy as np
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+from hybrid_miranda_mesh import AllocatorType
+from result_cache import (RunSpec, ResultCache, run_cached, add_run_arguments, spec_from_args,
+                          DEFAULT_CACHE_DIR)
+
+# 默认数据库路径
+DEFAULT_DB_PATH = os.environ.get("HYBRID_MESH_RESULTS_DB",
+                                 os.path.join(os.path.expanduser("~"), ".local", "share",
+                                              "hybrid_miranda_mesh", "results.db"))
+
+# 数据库结构版本
+SCHEMA_VERSION = 1
+
+# 配置列: 列名 -> (SQL类型, 从规范化运行描述取值的路径)
+CONFIG_COLUMNS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "engine_version": ("INTEGER", ("engine_version",)),
+    "topology": ("TEXT", ("topology_config", "topology_type")),
+    "size_x": ("INTEGER", ("topology_config", "mesh_size_x")),
+    "size_y": ("INTEGER", ("topology_config", "mesh_size_y")),
+    "routing_mode": ("TEXT", ("topology_config", "routing_mode")),
+    "tie_break": ("TEXT", ("topology_config", "tie_break")),
+    "virtual_channels": ("INTEGER", ("topology_config", "virtual_channels")),
+    "buffer_depth": ("INTEGER", ("topology_config", "buffer_depth")),
+    "switch_allocator": ("TEXT", ("topology_config", "switch_allocator")),
+    "pattern": ("TEXT", ("traffic_config", "pattern")),
+    "injection_rate": ("REAL", ("traffic_config", "injection_rate")),
+    "message_size_min": ("INTEGER", ("traffic_config", "message_size_min")),
+    "message_size_max": ("INTEGER", ("traffic_config", "message_size_max")),
+    "seed": ("INTEGER", ("seed",)),
+    "warmup_cycles": ("INTEGER", ("measurement", "warmup_cycles")),
+    "measurement_cycles": ("INTEGER", ("measurement", "measurement_cycles")),
+    "link_bandwidth": ("TEXT", ("hardware", "link_bandwidth")),
+}
+
+# 汇总指标列 (collect_statistics()["summary"] 中的字段)
+METRIC_COLUMNS: Dict[str, str] = {
+    "accepted_throughput": "REAL",
+    "avg_latency_cycles": "REAL",
+    "p99_latency_cycles": "REAL",
+    "avg_hop_count": "REAL",
+    "hop_overhead": "REAL",
+    "packets_sent": "INTEGER",
+    "packets_received": "INTEGER",
+    "packets_in_flight": "INTEGER",
+}
+
+# 常用扫描维度索引
+INDEXES: Dict[str, Tuple[str, ...]] = {
+    "idx_runs_shape": ("topology", "size_x", "size_y", "routing_mode"),
+    "idx_runs_traffic": ("pattern", "injection_rate"),
+    "idx_runs_router": ("virtual_channels", "buffer_depth", "switch_allocator"),
+    "idx_runs_seed": ("seed",),
+    "idx_runs_created": ("created",),
+}
+
+QUERYABLE_COLUMNS = ("id", "run_key", "created", "label", "cycles", "data_path",
+                     *CONFIG_COLUMNS, *METRIC_COLUMNS)
+
+
+def _check_columns(columns: Sequence[str]):
+    for column in columns:
+        if column not in QUERYABLE_COLUMNS:
+            raise ValueError(f"未知的列: {column}")
+
+
+# =============================================================================
+# 结果库
+# =============================================================================
+
+class ResultsDB:
+    """SQLite运行结果库"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        """
+        Args:
+            path: 数据库文件路径，列式数据保存在同目录的 data/ 子目录
+        """
+        self.path = path
+        self.data_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "data")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ",\n    ".join(
+            [f"{name} {sql_type}" for name, (sql_type, _) in CONFIG_COLUMNS.items()]
+            + [f"{name} {sql_type}" for name, sql_type in METRIC_COLUMNS.items()])
+        with self.connection:
+            self.connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    run_key TEXT NOT NULL UNIQUE,
+                    created REAL NOT NULL,
+                    label TEXT,
+                    cycles INTEGER,
+                    data_path TEXT,
+                    {columns}
+                )""")
+            for name, index_columns in INDEXES.items():
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON runs ({', '.join(index_columns)})")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # 写入
+    # -------------------------------------------------------------------------
+
+    def record(self, run_key: str, canonical_spec: Dict[str, Any], statistics: Dict[str, Any],
+               label: Optional[str] = None) -> int:
+        """
+        记录一次运行 (同一run_key只记录一次)
+
+        Args:
+            run_key: 运行内容寻址键 (RunSpec.key())
+            canonical_spec: 规范化运行描述 (RunSpec.canonical())
+            statistics: HybridMirandaMesh.collect_statistics() 的结果
+            label: 可选的研究标签
+
+        Returns:
+            int: 运行ID
+        """
+        existing = self.connection.execute("SELECT id FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+        if existing is not None:
+            return existing["id"]
+
+        data_path = os.path.join("data", f"{run_key}.npz")
+        arrays = {f"node_{name}": np.asarray(values) for name, values in statistics["nodes"].items()}
+        arrays.update({f"link_{name}": np.asarray(values) for name, values in statistics["links"].items()})
+        arrays.update({f"flow_{name}": np.asarray(values) for name, values in statistics.get("flows", {}).items()})
+        with open(os.path.join(os.path.dirname(self.data_dir), data_path), "wb") as handle:
+            np.savez_compressed(handle, **arrays)
+
+        values: Dict[str, Any] = {"run_key": run_key, "created": time.time(), "label": label,
+                                  "cycles": statistics.get("cycles"), "data_path": data_path}
+        for name, (_, path) in CONFIG_COLUMNS.items():
+            value: Any = canonical_spec
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            values[name] = value
+        for name in METRIC_COLUMNS:
+            values[name] = statistics["summary"].get(name)
+
+        placeholders = ", ".join("?" for _ in values)
+        with self.connection:
+            cursor = self.connection.execute(
+                f"INSERT INTO runs ({', '.join(values)}) VALUES ({placeholders})", list(values.values()))
+        return cursor.lastrowid
+
+    def record_run(self, spec: RunSpec, statistics: Dict[str, Any], label: Optional[str] = None) -> int:
+        """记录一次RunSpec运行"""
+        return self.record(spec.key(), spec.canonical(), statistics, label)
+
+    def import_cache(self, cache: ResultCache, label: Optional[str] = None) -> int:
+        """导入结果缓存中的全部条目，返回新记录的运行数"""
+        before = self.count()
+        for key, _, _ in cache.entries():
+            try:
+                with gzip.open(os.path.join(cache.directory, f"{key}.json.gz"), "rt", encoding="utf-8") as handle:
+                    entry = json.load(handle)
+            except (OSError, ValueError):
+                continue
+            self.record(key, entry["spec"], entry["statistics"], label)
+        return self.count() - before
+
+    # -------------------------------------------------------------------------
+    # 查询
+    # -------------------------------------------------------------------------
+
+    def count(self, **filters) -> int:
+        where, params = self._where(filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """相等过滤条件 (值为列表/元组时表示IN)"""
+        _check_columns(list(filters))
+        clauses, params = [], []
+        for column, value in filters.items():
+            if isinstance(value, (list, tuple)):
+                clauses.append(f"{column} IN ({', '.join('?' for _ in value)})")
+                params.extend(value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, columns: Optional[Sequence[str]] = None, order_by: Sequence[str] = ("id",),
+              limit: Optional[int] = None, **filters) -> List[Dict[str, Any]]:
+        """
+        按配置列相等条件查询运行
+
+        Example:
+            db.query(topology="torus", size_x=8, size_y=8, routing_mode=["dor", "valiant"])
+        """
+        columns = list(columns) if columns else list(QUERYABLE_COLUMNS)
+        _check_columns(columns + list(order_by))
+        where, params = self._where(filters)
+        sql = f"SELECT {', '.join(columns)} FROM runs{where} ORDER BY {', '.join(order_by)}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def curve(self, metric: str, x: str = "injection_rate", group_by: Sequence[str] = ("routing_mode",),
+              **filters) -> Dict[Tuple[Tuple[str, Any], ...], List[Tuple[float, float, int]]]:
+        """
+        指标随某一配置维度变化的曲线 (只有种子不同的运行取平均)
+
+        除种子和x外的全部配置列都参与分组: 未被过滤且在结果中取值不唯一的配置列
+        自动加入分组键，不同配置的运行不会被平均在一起
+
+        Example:
+            db.curve("p99_latency_cycles", topology="torus", size_x=8, size_y=8)
+
+        Returns:
+            Dict: 分组 ((列, 值), ...) -> [(x, 指标均值, 运行数), ...] (按x排序)
+        """
+        group_by = list(group_by)
+        _check_columns([metric, x] + group_by)
+        where, params = self._where(filters)
+        config = group_by + [column for column in CONFIG_COLUMNS
+                             if column not in group_by and column not in (x, "seed")]
+        keys = config + [x]
+        sql = (f"SELECT {', '.join(keys)}, AVG({metric}) AS value, COUNT(*) AS runs FROM runs{where} "
+               f"GROUP BY {', '.join(keys)} ORDER BY {', '.join(keys)}")
+        rows = self.connection.execute(sql, params).fetchall()
+        varying = [column for column in config[len(group_by):]
+                   if len({row[column] for row in rows}) > 1]
+        curves: Dict[Tuple[Tuple[str, Any], ...], List[Tuple[float, float, int]]] = {}
+        for row in rows:
+            group = tuple((column, row[column]) for column in group_by + varying)
+            curves.setdefault(group, []).append((row[x], row["value"], row["runs"]))
+        return curves
+
+    def load_columns(self, run: Dict[str, Any]) -> Dict[str, np.ndarray]:
+        """读取一次运行的逐节点/逐链路/逐流列式数据 (node_* / link_<方向> / flow_*)"""
+        path = os.path.join(os.path.dirname(self.data_dir), run["data_path"])
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+
+
+# =============================================================================
+# 命令行接口
+# =============================================================================
+
+def _filters_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    filters: Dict[str, Any] = {}
+    if args.topology:
+        filters["topology"] = args.topology
+    if args.shape:
+        filters["size_x"], filters["size_y"] = (int(v) for v in args.shape.lower().split("x"))
+    if args.routing:
+        filters["routing_mode"] = args.routing
+    if args.pattern:
+        filters["pattern"] = args.pattern
+    if args.vcs is not None:
+        filters["virtual_channels"] = args.vcs
+    if args.buffer_depth is not None:
+        filters["buffer_depth"] = args.buffer_depth
+    if args.allocator:
+        filters["switch_allocator"] = args.allocator
+    if args.label:
+        filters["label"] = args.label
+    return filters
+
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="SQLite运行结果库")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="数据库路径")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="运行 (经结果缓存) 并记录")
+    add_run_arguments(run_parser)
+    run_parser.add_argument("--label", help="研究标签")
+    run_parser.add_argument("--no-cache", action="store_true", help="不读写结果缓存")
+
+    import_parser = subparsers.add_parser("import-cache", help="导入结果缓存中的全部运行")
+    import_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="缓存目录")
+    import_parser.add_argument("--label", help="研究标签")
+
+    for name, help_text in (("list", "列出运行"), ("curve", "指标随负载 (或其他维度) 的曲线")):
+        query_parser = subparsers.add_parser(name, help=help_text)
+        query_parser.add_argument("--topology", choices=["mesh", "torus"], help="拓扑类型")
+        query_parser.add_argument("--shape", help="网格大小，如 8x8")
+        query_parser.add_argument("--routing", help="路由模式")
+        query_parser.add_argument("--pattern", help="流量模式")
+        query_parser.add_argument("--vcs", type=int, help="每端口虚拟通道数")
+        query_parser.add_argument("--buffer-depth", type=int, help="每虚拟通道缓冲深度")
+        query_parser.add_argument("--allocator", choices=[a.value for a in AllocatorType],
+                                  help="交换分配器模型")
+        query_parser.add_argument("--label", help="研究标签")
+        if name == "list":
+            query_parser.add_argument("--limit", type=int, default=50, help="最多显示的运行数")
+        else:
+            query_parser.add_argument("--metric", choices=list(METRIC_COLUMNS), default="p99_latency_cycles",
+                                      help="指标")
+            query_parser.add_argument("--x", default="injection_rate", help="横轴配置列")
+            query_parser.add_argument("--group-by", default="routing_mode", help="分组列 (逗号分隔)")
+    args = parser.parse_args(argv)
+
+    with ResultsDB(args.db) as db:
+        if args.command == "run":
+            spec = spec_from_args(args)
+            cache = None if args.no_cache else ResultCache()
+            statistics, hit = run_cached(spec, cache)
+            run_id = db.record_run(spec, statistics, args.label)
+            summary = statistics["summary"]
+            print(f"运行 #{run_id} ({'缓存命中' if hit else '已仿真'}): 吞吐量 {summary['accepted_throughput']:.4f}, "
+                  f"平均延迟 {summary['avg_latency_cycles']:.2f}, p99 {summary['p99_latency_cycles']:.0f} 周期")
+        elif args.command == "import-cache":
+            print(f"已导入 {db.import_cache(ResultCache(args.cache_dir), args.label)} 次运行, 共 {db.count()} 次")
+        elif args.command == "list":
+            rows = db.query(columns=["id", "topology", "size_x", "size_y", "routing_mode", "pattern",
+                                     "injection_rate", "seed", "accepted_throughput", "avg_latency_cycles",
+                                     "p99_latency_cycles"],
+                            limit=args.limit, **_filters_from_args(args))
+            print(f"\n{'ID':>5} {'拓扑':>10} {'路由':>13} {'流量':>15} {'负载':>6} {'种子':>5} "
+                  f"{'吞吐量':>8} {'平均延迟':>8} {'p99':>6}")
+            for row in rows:
+                shape = f"{row['topology']} {row['size_x']}x{row['size_y']}"
+                print(f"{row['id']:>5} {shape:>12} {row['routing_mode']:>13} {row['pattern']:>15} "
+                      f"{row['injection_rate']:>6.3f} {row['seed']:>5} {row['accepted_throughput']:>10.4f} "
+                      f"{row['avg_latency_cycles']:>10.2f} {row['p99_latency_cycles']:>6.0f}")
+        else:
+            group_by = [column for column in args.group_by.split(",") if column]
+            curves = db.curve(args.metric, x=args.x, group_by=group_by, **_filters_from_args(args))
+            print(f"\n=== {args.metric} vs {args.x} ===")
+            for group, points in curves.items():
+                print(f"  {', '.join(f'{column}={value}' for column, value in group) or '全部'}:")
+                for x_value, value, runs in points:
+                    print(f"    {args.x}={x_value}: {value:.4f} ({runs} 次运行)")
+
+
+if __name__ == "__main__":
+    main()
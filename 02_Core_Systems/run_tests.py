@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Regression Test Runner
+
+依次运行各模块内的回归测试 (test_* 函数，失败时抛出AssertionError)，
+打印汇总并在有测试失败时以非零状态退出，可直接用于CI
+
+使用方法:
+    python run_tests.py
+    python run_tests.py --list
+    python run_tests.py deadlock sampled
+"""
+
+# 标准库导入
+import argparse
+import importlib
+import sys
+import time
+import traceback
+from typing import List, Tuple
+
+# SST接口: 在SST-Core之外运行时使用替身模块
+try:
+    import sst  # noqa: F401
+except ImportError:
+    import sst_standin
+    sst_standin.install()
+
+# 回归测试列表 (模块名, 测试函数名)，按运行顺序排列
+REGRESSION_TESTS: List[Tuple[str, str]] = [
+    ("hybrid_miranda_mesh", "test_sst_traffic_endpoints"),
+    ("hybrid_miranda_mesh", "test_adaptive_routing_throughput"),
+    ("hybrid_miranda_mesh", "test_torus_tie_breaking"),
+    ("hybrid_miranda_mesh", "test_virtual_channel_deadlock"),
+    ("hybrid_miranda_mesh", "test_switch_allocator_latency"),
+    ("hybrid_miranda_mesh", "test_mirror_flow_latency"),
+    ("hybrid_miranda_mesh", "test_measurement_phases"),
+    ("hybrid_miranda_mesh", "test_sampled_simulation"),
+    ("hybrid_miranda_mesh", "test_deterministic_seeds"),
+    ("hybrid_miranda_mesh", "test_event_log_sinks"),
+    ("hybrid_miranda_mesh", "test_latency_breakdown_components"),
+    ("hybrid_miranda_mesh", "test_flow_sketch_quantiles"),
+    ("hybrid_miranda_mesh", "test_occupancy_monitor_alerts"),
+    ("sst_stats_parser", "test_sst_stats_parser"),
+    ("result_cache", "test_result_cache"),
+]
+
+
+def run_tests(patterns: List[str]) -> int:
+    """
+    运行名称包含任一模式的回归测试 (未给出模式时运行全部)
+
+    Returns:
+        int: 失败的测试数量
+    """
+    selected = [(module, name) for module, name in REGRESSION_TESTS
+                if not patterns or any(pattern in name for pattern in patterns)]
+    failures = []
+    for module_name, test_name in selected:
+        print(f"\n{'=' * 60}\n▶ {module_name}.{test_name}\n{'=' * 60}")
+        start = time.perf_counter()
+        try:
+            getattr(importlib.import_module(module_name), test_name)()
+        except Exception:
+            traceback.print_exc()
+            failures.append(f"{module_name}.{test_name}")
+        print(f"  用时 {time.perf_counter() - start:.1f}s")
+
+    print(f"\n=== 回归测试: {len(selected) - len(failures)}/{len(selected)} 通过 ===")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    return len(failures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="运行模块内的回归测试")
+    parser.add_argument("patterns", nargs="*", help="只运行名称包含这些子串的测试")
+    parser.add_argument("--list", action="store_true", help="列出回归测试后退出")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for module_name, test_name in REGRESSION_TESTS:
+            print(f"{module_name}.{test_name}")
+        return
+    sys.exit(1 if run_tests(args.patterns) else 0)
+
+
+if __name__ == "__main__":
+    main()
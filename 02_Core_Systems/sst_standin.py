@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+SST Stand-in Module
+
+SST Python配置接口的离线替身模块
+在没有SST-Core的环境中记录组件、子组件、链路和统计配置，
+使逻辑引擎、配置生成和端点参数可以在普通Python中运行和验证
+
+使用方法:
+    import sst_standin
+    sst_standin.install()          # 注册为 sys.modules["sst"]
+    import hybrid_miranda_mesh     # 之后的 import sst 得到替身模块
+
+    sst_standin.components         # 已创建的组件 (名称 -> Component)
+    sst_standin.links              # 已创建的链路 (名称 -> Link)
+"""
+
+# 标准库导入
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# 全局注册表
+components: Dict[str, "Component"] = {}
+links: Dict[str, "Link"] = {}
+config_calls: List[Tuple[str, tuple]] = []
+
+
+class SSTConfigError(Exception):
+    """配置错误 (对应SST-Core在解析配置时报告的错误)"""
+
+
+# =============================================================================
+# 组件和链路
+# =============================================================================
+
+class _BaseComponent:
+    """组件和子组件的公共部分"""
+
+    def __init__(self, name: str, element_type: str):
+        self.name = name
+        self.type = element_type
+        self.params: Dict[str, Any] = {}
+        self.subcomponents: Dict[Tuple[str, int], "SubComponent"] = {}
+        self.statistics: List[Tuple[List[str], Dict[str, Any]]] = []
+        self.ports: Dict[str, "Link"] = {}
+
+    def addParam(self, key: str, value: Any):
+        self.params[key] = value
+
+    def addParams(self, params: Dict[str, Any]):
+        self.params.update(params)
+
+    def setSubComponent(self, slot_name: str, element_type: str, slot_num: int = 0) -> "SubComponent":
+        key = (slot_name, slot_num)
+        if key in self.subcomponents:
+            raise SSTConfigError(f"{self.name}: 子组件插槽 {slot_name}[{slot_num}] 已被占用")
+        sub = SubComponent(f"{self.name}:{slot_name}[{slot_num}]", element_type, self)
+        self.subcomponents[key] = sub
+        return sub
+
+    def enableStatistics(self, stat_names: List[str], stat_params: Optional[Dict[str, Any]] = None):
+        self.statistics.append((list(stat_names), dict(stat_params or {})))
+
+    def enableAllStatistics(self, stat_params: Optional[Dict[str, Any]] = None):
+        self.statistics.append((["*"], dict(stat_params or {})))
+
+    def setRank(self, rank: int, thread: int = 0):
+        self.params["__rank__"] = (rank, thread)
+
+    def setCoordinates(self, *coords):
+        self.params["__coordinates__"] = coords
+
+    def _attach(self, port: str, link: "Link"):
+        if port in self.ports:
+            raise SSTConfigError(f"{self.name}: 端口 {port} 已连接到链路 {self.ports[port].name}")
+        self.ports[port] = link
+
+
+class Component(_BaseComponent):
+    """sst.Component 替身"""
+
+    def __init__(self, name: str, element_type: str):
+        if name in components:
+            raise SSTConfigError(f"组件名称重复: {name}")
+        super().__init__(name, element_type)
+        components[name] = self
+
+
+class SubComponent(_BaseComponent):
+    """sst.SubComponent 替身"""
+
+    def __init__(self, name: str, element_type: str, parent: _BaseComponent):
+        super().__init__(name, element_type)
+        self.parent = parent
+
+
+class Link:
+    """sst.Link 替身"""
+
+    def __init__(self, name: str, latency: Optional[str] = None):
+        if name in links:
+            raise SSTConfigError(f"链路名称重复: {name}")
+        self.name = name
+        self.latency = latency
+        self.endpoints: List[Tuple[_BaseComponent, str, Optional[str]]] = []
+        self.no_cut = False
+        links[name] = self
+
+    def connect(self, end0: tuple, end1: tuple):
+        if self.endpoints:
+            raise SSTConfigError(f"链路 {self.name} 已连接")
+        for end in (end0, end1):
+            component, port = end[0], end[1]
+            latency = end[2] if len(end) > 2 else self.latency
+            if latency is None:
+                raise SSTConfigError(f"链路 {self.name}: 端口 {port} 未指定延迟")
+            component._attach(port, self)
+            self.endpoints.append((component, port, latency))
+
+    def setNoCut(self):
+        self.no_cut = True
+
+
+# =============================================================================
+# 全局配置函数
+# =============================================================================
+
+def _record(name: str):
+    def call(*args):
+        config_calls.append((name, args))
+    call.__name__ = name
+    return call
+
+
+setProgramOption = _record("setProgramOption")
+setProgramOptions = _record("setProgramOptions")
+setStatisticLoadLevel = _record("setStatisticLoadLevel")
+setStatisticOutput = _record("setStatisticOutput")
+setStatisticOutputOptions = _record("setStatisticOutputOptions")
+enableAllStatisticsForAllComponents = _record("enableAllStatisticsForAllComponents")
+enableAllStatisticsForComponentName = _record("enableAllStatisticsForComponentName")
+enableAllStatisticsForComponentType = _record("enableAllStatisticsForComponentType")
+enableStatisticForComponentName = _record("enableStatisticForComponentName")
+enableStatisticForComponentType = _record("enableStatisticForComponentType")
+
+
+def getMPIRankCount() -> int:
+    return 1
+
+
+def getThreadCount() -> int:
+    return 1
+
+
+# =============================================================================
+# 替身管理
+# =============================================================================
+
+def reset():
+    """清空已记录的组件、链路和全局配置"""
+    components.clear()
+    links.clear()
+    config_calls.clear()
+
+
+def install(force: bool = False):
+    """
+    将替身模块注册为 sys.modules["sst"]
+
+    Args:
+        force: 即使已存在sst模块 (例如在SST-Core内运行) 也强制替换
+    """
+    if force or "sst" not in sys.modules:
+        sys.modules["sst"] = sys.modules[__name__]
+
+
+def components_of_type(element_type: str) -> List[_BaseComponent]:
+    """按元素类型查找组件和子组件 (如 "merlin.hr_router", "merlin.linkcontrol")"""
+    found = []
+    stack: List[_BaseComponent] = list(components.values())
+    while stack:
+        component = stack.pop()
+        if component.type == element_type:
+            found.append(component)
+        stack.extend(component.subcomponents.values())
+    return sorted(found, key=lambda c: c.name)
+
+
+def unconnected_ports(component: _BaseComponent, expected_ports: List[str]) -> List[str]:
+    """返回组件上尚未连接的端口"""
+    return [port for port in expected_ports if port not in component.ports]
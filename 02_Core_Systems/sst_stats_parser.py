@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+SST Statistics Parser
+
+SST statOutputCSV统计结果流式解析器
+将多GB的SST统计CSV按块读取，映射回混合网格的节点坐标和端口方向，
+生成紧凑的每路由器/每端口NumPy数组，并缓存为二进制旁路文件 (.npz)
+
+功能特性:
+- 分块流式读取 (支持.csv和.csv.gz)
+- 组件名 -> 节点ID -> (x, y) 坐标映射
+- hr_router端口 -> 方向映射 (与HybridMirandaMesh的端口配置一致)
+- 二进制缓存，重复分析时无需重新解析CSV
+- 生成与逻辑引擎相同的链路利用率和热点报告
+
+使用方法:
+    python sst_stats_parser.py statistics_output/sst_mesh_minimal_stats.csv --shape 4x4
+"""
+
+# 标准库导入
+import argparse
+import csv
+import gzip
+import os
+import re
+import tempfile
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# 第三方库
+import numpy as np
+
+# =============================================================================
+# 常量定义
+# =============================================================================
+
+# hr_router端口方向 (与 MirandaCPUNode._connect_sst_routers 的端口配置一致:
+# port0-3: 东西南北, port4: 本地)
+PORT_DIRECTIONS: Tuple[str, ...] = ("east", "west", "south", "north", "local")
+LOCAL_PORT = len(PORT_DIRECTIONS) - 1
+
+# 累加器统计字段，数组最后一维按此顺序存放
+STAT_FIELDS: Tuple[str, ...] = ("sum", "sumsq", "count", "min", "max")
+
+_COUNT_FIELD = STAT_FIELDS.index("count")
+_MIN_FIELD = STAT_FIELDS.index("min")
+_MAX_FIELD = STAT_FIELDS.index("max")
+
+# 组件名格式: router_<id>_<后缀> / endpoint_<id>_<后缀>[:子组件]
+_COMPONENT_PATTERN = re.compile(r"^(router|endpoint)_(\d+)")
+_PORT_PATTERN = re.compile(r"port(\d+)")
+
+# 缓存文件版本，解析逻辑变化时递增
+CACHE_VERSION = 2
+
+
+# =============================================================================
+# 统计数据容器
+# =============================================================================
+
+class SSTStatistics:
+    """
+    解析后的SST统计数据
+
+    router[stat_name]: 形状 (节点数, 端口数, 5) 的数组，对应每路由器每端口的累加器字段
+    endpoint[stat_name]: 形状 (节点数, 5) 的数组，对应每个网络接口的累加器字段
+    """
+
+    def __init__(self, mesh_size_x: int, mesh_size_y: int,
+                 router: Dict[str, np.ndarray], endpoint: Dict[str, np.ndarray],
+                 last_sim_time: int = 0):
+        self.mesh_size_x = mesh_size_x
+        self.mesh_size_y = mesh_size_y
+        self.num_nodes = mesh_size_x * mesh_size_y
+        self.router = router
+        self.endpoint = endpoint
+        self.last_sim_time = last_sim_time
+
+    # =========================================================================
+    # 坐标映射
+    # =========================================================================
+
+    def node_position(self, node_id: int) -> Tuple[int, int]:
+        """节点ID -> (x, y)坐标 (与HybridMirandaMesh的编号方式一致)"""
+        return node_id % self.mesh_size_x, node_id // self.mesh_size_x
+
+    def neighbor_position(self, node_id: int, port: int, wrap: bool) -> Optional[Tuple[int, int]]:
+        """根据端口方向计算邻居坐标，Mesh边缘端口返回None"""
+        x, y = self.node_position(node_id)
+        dx, dy = {"east": (1, 0), "west": (-1, 0), "south": (0, 1), "north": (0, -1)}[PORT_DIRECTIONS[port]]
+        nx, ny = x + dx, y + dy
+        if wrap:
+            return nx % self.mesh_size_x, ny % self.mesh_size_y
+        if 0 <= nx < self.mesh_size_x and 0 <= ny < self.mesh_size_y:
+            return nx, ny
+        return None
+
+    # =========================================================================
+    # 数组访问
+    # =========================================================================
+
+    def port_values(self, stat_name: str, field: str = "sum") -> np.ndarray:
+        """获取路由器统计的 (节点数, 端口数) 数组，未记录的统计返回全零"""
+        if stat_name not in self.router:
+            return np.zeros((self.num_nodes, len(PORT_DIRECTIONS)))
+        return self.router[stat_name][:, :, STAT_FIELDS.index(field)]
+
+    def endpoint_values(self, stat_name: str, field: str = "sum") -> np.ndarray:
+        """获取网络接口统计的 (节点数,) 数组，未记录的统计返回全零"""
+        if stat_name not in self.endpoint:
+            return np.zeros(self.num_nodes)
+        return self.endpoint[stat_name][:, STAT_FIELDS.index(field)]
+
+    def port_packets(self) -> np.ndarray:
+        """每路由器每端口发送的包数"""
+        return self.port_values("send_packet_count")
+
+    def port_bytes(self) -> np.ndarray:
+        """每路由器每端口发送的字节数"""
+        return self.port_values("send_bit_count") / 8
+
+    def mean_packet_latency(self) -> np.ndarray:
+        """每个网络接口的平均包延迟 (SST时间单位)，无数据的节点为NaN"""
+        total = self.endpoint_values("packet_latency", "sum")
+        count = self.endpoint_values("packet_latency", "count")
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count > 0, total / count, np.nan)
+
+    # =========================================================================
+    # 报告数据
+    # =========================================================================
+
+    def link_utilization(self, wrap: bool = False) -> Dict[Tuple[Tuple[int, int], Tuple[int, int]], Dict[str, int]]:
+        """
+        生成链路流量字典，格式与 HybridMirandaMesh.get_traffic_matrix 的链路利用率一致
+
+        Args:
+            wrap: 是否为Torus拓扑 (包含环绕链路)
+
+        Returns:
+            Dict: {(端点A, 端点B): {"packets": 包数, "bytes": 字节数}}
+        """
+        packets = self.port_packets()
+        data_bytes = self.port_bytes()
+        link_utilization = {}
+
+        nodes, ports = np.nonzero(packets[:, :LOCAL_PORT])
+        for node_id, port in zip(nodes.tolist(), ports.tolist()):
+            neighbor_pos = self.neighbor_position(node_id, port, wrap)
+            if neighbor_pos is None:
+                continue
+            link_key = tuple(sorted([self.node_position(node_id), neighbor_pos]))
+            if link_key not in link_utilization:
+                link_utilization[link_key] = {"packets": 0, "bytes": 0}
+            link_utilization[link_key]["packets"] += int(packets[node_id, port])
+            link_utilization[link_key]["bytes"] += int(data_bytes[node_id, port])
+
+        return link_utilization
+
+    def node_traffic(self) -> List[Tuple[Tuple[int, int], int, int]]:
+        """
+        每节点总流量，格式与 HybridMirandaMesh.analyze_hotspots 的排序输入一致
+
+        Returns:
+            List: [((x, y), 总字节数, 转发包数)]，按总字节数降序
+        """
+        data_bytes = self.port_bytes()
+        forwarded = self.port_packets()[:, :LOCAL_PORT].sum(axis=1)
+        injected = self.endpoint_values("send_bit_count") / 8
+        total = data_bytes.sum(axis=1) + injected
+
+        order = np.argsort(-total, kind="stable")
+        return [(self.node_position(int(i)), int(total[i]), int(forwarded[i])) for i in order]
+
+    def apply_to_mesh(self, mesh):
+        """
+        将SST统计写入HybridMirandaMesh的节点计数器
+
+        写入后可直接调用 mesh.get_traffic_matrix() 和 mesh.analyze_hotspots()，
+        得到与逻辑引擎相同格式的链路利用率和热点报告
+
+        Args:
+            mesh: 与SST运行相同拓扑配置的HybridMirandaMesh实例
+        """
+        packets = self.port_packets()
+        data_bytes = self.port_bytes()
+        sent_bytes = self.endpoint_values("send_bit_count") / 8
+        recv_bytes = self.endpoint_values("recv_bit_count") / 8
+
+        for node_id, node in mesh.nodes.items():
+            directions = {direction.value: direction for direction in node.traffic_by_direction}
+            for port, direction_name in enumerate(PORT_DIRECTIONS):
+                node.traffic_by_direction[directions[direction_name]] = {
+                    "packets": int(packets[node_id, port]),
+                    "bytes": int(data_bytes[node_id, port]),
+                }
+            node.packets_forwarded = int(packets[node_id, :LOCAL_PORT].sum())
+            node.bytes_forwarded = int(data_bytes[node_id, :LOCAL_PORT].sum())
+            node.packets_received = int(packets[node_id, LOCAL_PORT])
+            node.bytes_received = int(recv_bytes[node_id] or data_bytes[node_id, LOCAL_PORT])
+            node.bytes_sent = int(sent_bytes[node_id])
+
+    def print_report(self, wrap: bool = False, link_bandwidth_gib: float = 40.0, top: int = 8):
+        """打印链路利用率和热点报告"""
+        print("\n=== SST统计: 链路利用率分析 ===")
+        link_utilization = self.link_utilization(wrap)
+        if link_utilization:
+            print(f"{'链路':^20} {'包数':^8} {'字节数':^10} {'利用率%':^8}")
+            print("-" * 50)
+            max_bytes = link_bandwidth_gib * 1024**3
+            for link, traffic in sorted(link_utilization.items()):
+                link_str = f"{link[0]} <-> {link[1]}"
+                utilization = (traffic["bytes"] / max_bytes) * 100
+                print(f"{link_str:^20} {traffic['packets']:^8} {traffic['bytes']:^10} {utilization:^8.4f}")
+        else:
+            print("   无链路流量数据")
+
+        print("\n=== SST统计: 网络热点分析 ===")
+        print(f"{'节点':^8} {'总流量(KB)':^12} {'转发包数':^10}")
+        print("-" * 35)
+        for i, ((x, y), traffic_bytes, forwarded_packets) in enumerate(self.node_traffic()[:top]):
+            print(f"({x},{y}):   {traffic_bytes/1024:^12.1f} {forwarded_packets:^10}")
+            if i == 0:
+                print("   ↑ 最繁忙节点")
+
+        latency = self.mean_packet_latency()
+        if np.any(~np.isnan(latency)):
+            print(f"\n平均包延迟: {np.nanmean(latency):.2f} (SST时间单位), 最大节点平均: {np.nanmax(latency):.2f}")
+
+    # =========================================================================
+    # 二进制缓存
+    # =========================================================================
+
+    def save(self, path: str, source_signature: Tuple[int, int, int] = (0, 0, 0)):
+        """保存为.npz旁路文件"""
+        arrays = {
+            "meta": np.array([CACHE_VERSION, self.mesh_size_x, self.mesh_size_y,
+                              self.last_sim_time, *source_signature], dtype=np.int64),
+        }
+        for name, values in self.router.items():
+            arrays[f"router/{name}"] = values
+        for name, values in self.endpoint.items():
+            arrays[f"endpoint/{name}"] = values
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str, source_signature: Optional[Tuple[int, int, int]] = None) -> Optional["SSTStatistics"]:
+        """
+        读取.npz旁路文件
+
+        Args:
+            path: 缓存文件路径
+            source_signature: 源CSV的(大小, 修改时间, 是否累计值)，不匹配时返回None
+
+        Returns:
+            SSTStatistics或None (缓存无效)
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = data["meta"].tolist()
+            if meta[0] != CACHE_VERSION:
+                return None
+            size_x, size_y, last_sim_time = meta[1:4]
+            if source_signature is not None and tuple(meta[4:]) != tuple(source_signature):
+                return None
+            router = {key.split("/", 1)[1]: data[key] for key in data.files if key.startswith("router/")}
+            endpoint = {key.split("/", 1)[1]: data[key] for key in data.files if key.startswith("endpoint/")}
+        return cls(size_x, size_y, router, endpoint, last_sim_time)
+
+
+# =============================================================================
+# 流式解析
+# =============================================================================
+
+def _open_text(path: str):
+    """打开CSV文件，自动识别gzip压缩"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def _iter_chunks(reader, chunk_rows: int) -> Iterator[List[List[str]]]:
+    """按块产生CSV行"""
+    while True:
+        chunk = list(islice(reader, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _source_signature(path: str, cumulative: bool) -> Tuple[int, int, int]:
+    """源文件签名 (大小, 纳秒修改时间, 是否累计值)，用于判断缓存是否过期"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, int(cumulative)
+
+
+def _last_occurrence(index: np.ndarray) -> np.ndarray:
+    """每个不同索引值最后一次出现的位置"""
+    _, reversed_first = np.unique(index[::-1], return_index=True)
+    return len(index) - 1 - reversed_first
+
+
+def _accumulate(target: np.ndarray, index: np.ndarray, samples: np.ndarray,
+                fields: List[int], cumulative: bool):
+    """
+    将一块样本按目标行写入累加器数组
+
+    Args:
+        target: 形状 (目标数, 5) 的累加器数组视图
+        index: 每个样本的目标行
+        samples: 形状 (样本数, len(fields)) 的字段值
+        fields: samples各列对应的统计字段
+        cumulative: True时取每个目标最后一次输出，False时对所有输出求和 (min/max取极值)
+    """
+    if cumulative:
+        last = _last_occurrence(index)
+        target[index[last][:, None], fields] = samples[last]
+        return
+
+    # 尚无样本的目标以该块内最小值为min初值 (须在累加count之前判断)
+    first = np.unique(index[target[index, _COUNT_FIELD] == 0])
+    for column, field in enumerate(fields):
+        values = samples[:, column]
+        if field == _MIN_FIELD:
+            target[first, field] = np.inf
+            np.minimum.at(target[:, field], index, values)
+        elif field == _MAX_FIELD:
+            np.maximum.at(target[:, field], index, values)
+        else:
+            np.add.at(target[:, field], index, values)
+
+
+# _parse_component返回的组件类型编号 (-1表示非路由器/网络接口组件)
+_ROUTER_KIND = 0
+_ENDPOINT_KIND = 1
+
+
+def _parse_component(name: str, cache: Dict[str, Tuple[int, int]]) -> Tuple[int, int]:
+    """组件名 -> (类型编号, 节点ID)，无法识别时返回(-1, -1)"""
+    parsed = cache.get(name)
+    if parsed is None:
+        match = _COMPONENT_PATTERN.match(name)
+        if match is None:
+            parsed = (-1, -1)
+        else:
+            parsed = (_ROUTER_KIND if match.group(1) == "router" else _ENDPOINT_KIND, int(match.group(2)))
+        cache[name] = parsed
+    return parsed
+
+
+def _parse_port(subid: str, cache: Dict[str, int]) -> int:
+    """统计子ID -> 端口号，无端口时返回-1"""
+    port = cache.get(subid)
+    if port is None:
+        match = _PORT_PATTERN.search(subid)
+        port = cache[subid] = int(match.group(1)) if match else -1
+    return port
+
+
+def parse_sst_csv(path: str, mesh_size_x: int, mesh_size_y: int,
+                  chunk_rows: int = 100000, cumulative: bool = True) -> SSTStatistics:
+    """
+    流式解析SST statOutputCSV文件
+
+    Args:
+        path: CSV文件路径 (.csv 或 .csv.gz)
+        mesh_size_x: X方向网格大小
+        mesh_size_y: Y方向网格大小
+        chunk_rows: 每块读取的行数
+        cumulative: 统计值是否为累计值 (默认SST不在输出后清零)；
+                    True时取每个统计最后一次输出，False时对所有周期输出求和
+
+    Returns:
+        SSTStatistics: 解析结果
+
+    Raises:
+        ValueError: 表头缺少ComponentName/StatisticName/StatisticSubId列
+    """
+    num_nodes = mesh_size_x * mesh_size_y
+    num_ports = len(PORT_DIRECTIONS)
+    router: Dict[str, np.ndarray] = {}
+    endpoint: Dict[str, np.ndarray] = {}
+    last_sim_time = 0
+
+    with _open_text(path) as f:
+        reader = csv.reader(f, skipinitialspace=True)
+        header = next(reader, None)
+        if header is None:
+            return SSTStatistics(mesh_size_x, mesh_size_y, router, endpoint)
+
+        columns = [name.strip().split(".")[0].lower() for name in header]
+        missing = [name for name in ("componentname", "statisticname", "statisticsubid") if name not in columns]
+        if missing:
+            raise ValueError(f"{path} 不是SST statOutputCSV格式，表头缺少列: {', '.join(missing)}")
+        comp_col = columns.index("componentname")
+        stat_col = columns.index("statisticname")
+        subid_col = columns.index("statisticsubid")
+        time_col = columns.index("simtime") if "simtime" in columns else None
+        # CSV列名去掉类型后缀后与字段同名 (如 "Sum.u64" -> "sum")
+        field_cols = [(columns.index(field), index)
+                      for index, field in enumerate(STAT_FIELDS) if field in columns]
+
+        fields = [field for _, field in field_cols]
+        min_length = max([comp_col, stat_col, subid_col, time_col or 0] + [col for col, _ in field_cols]) + 1
+
+        # 组件名 -> (类型, 节点ID) 缓存，每个不同组件名只匹配一次正则
+        component_cache: Dict[str, Tuple[int, int]] = {}
+        port_cache: Dict[str, int] = {}
+
+        for chunk in _iter_chunks(reader, chunk_rows):
+            rows = chunk
+            if min(map(len, chunk)) < min_length:
+                rows = [row for row in chunk if len(row) >= min_length]
+                if not rows:
+                    continue
+            columns_data = list(zip(*rows))
+
+            # 按不同取值映射组件名和端口子ID，再通过逆索引展开为每行数组
+            components, component_index = np.unique(columns_data[comp_col], return_inverse=True)
+            parsed = np.array([_parse_component(name, component_cache) for name in components.tolist()],
+                              dtype=np.int64).reshape(-1, 2)
+            kinds = parsed[component_index, 0]
+            node_ids = parsed[component_index, 1]
+            subids, subid_index = np.unique(columns_data[subid_col], return_inverse=True)
+            ports = np.array([_parse_port(subid, port_cache) for subid in subids.tolist()],
+                             dtype=np.int64)[subid_index]
+            stat_names, stat_index = np.unique(columns_data[stat_col], return_inverse=True)
+
+            valid = (kinds >= 0) & (node_ids < num_nodes)
+            valid &= (kinds != _ROUTER_KIND) | ((ports >= 0) & (ports < num_ports))
+            if time_col is not None and valid.any():
+                times = np.asarray(columns_data[time_col], dtype=float)[valid]
+                last_sim_time = max(last_sim_time, int(times.max()))
+            samples = np.array([columns_data[col] for col, _ in field_cols], dtype=float).T.reshape(len(rows), -1)
+
+            for stat_id, stat_name in enumerate(stat_names.tolist()):
+                for kind in (_ROUTER_KIND, _ENDPOINT_KIND):
+                    selected = np.nonzero(valid & (stat_index == stat_id) & (kinds == kind))[0]
+                    if len(selected) == 0:
+                        continue
+                    if kind == _ROUTER_KIND:
+                        values = router.get(stat_name)
+                        if values is None:
+                            values = router[stat_name] = np.zeros((num_nodes, num_ports, len(STAT_FIELDS)))
+                        target = values.reshape(num_nodes * num_ports, len(STAT_FIELDS))
+                        index = node_ids[selected] * num_ports + ports[selected]
+                    else:
+                        values = endpoint.get(stat_name)
+                        if values is None:
+                            values = endpoint[stat_name] = np.zeros((num_nodes, len(STAT_FIELDS)))
+                        target = values
+                        index = node_ids[selected]
+                    _accumulate(target, index, samples[selected], fields, cumulative)
+
+    return SSTStatistics(mesh_size_x, mesh_size_y, router, endpoint, last_sim_time)
+
+
+def load_sst_statistics(path: str, mesh_size_x: int, mesh_size_y: int,
+                        chunk_rows: int = 100000, cumulative: bool = True,
+                        use_cache: bool = True) -> SSTStatistics:
+    """
+    加载SST统计，优先使用二进制缓存
+
+    缓存文件为 <CSV路径>.npz，源CSV大小或修改时间变化时自动重新解析
+
+    Args:
+        path: CSV文件路径
+        mesh_size_x: X方向网格大小
+        mesh_size_y: Y方向网格大小
+        chunk_rows: 每块读取的行数
+        cumulative: 统计值是否为累计值
+        use_cache: 是否读写二进制缓存
+
+    Returns:
+        SSTStatistics: 统计数据
+    """
+    signature = _source_signature(path, cumulative)
+    cache_path = f"{path}.npz"
+
+    if use_cache and os.path.exists(cache_path):
+        stats = SSTStatistics.load(cache_path, signature)
+        if stats is not None and (stats.mesh_size_x, stats.mesh_size_y) == (mesh_size_x, mesh_size_y):
+            return stats
+
+    stats = parse_sst_csv(path, mesh_size_x, mesh_size_y, chunk_rows, cumulative)
+    if use_cache:
+        stats.save(cache_path, signature)
+    return stats
+
+
+# =============================================================================
+# 测试函数
+# =============================================================================
+
+# 测试用SST统计CSV (2×2网格): 字段依次为 Sum, SumSQ, Count, Min, Max
+_TEST_CSV_HEADER = ("ComponentName, StatisticName, StatisticSubId, StatisticType, SimTime, Rank, "
+                    "Sum.u64, SumSQ.u64, Count.u64, Min.u64, Max.u64")
+_TEST_CSV_ROWS = (
+    "router_0_rtr, send_packet_count, port0, Accumulator, 1000, 0, 5, 25, 1, 5, 5",
+    "router_3_rtr, send_packet_count, port4, Accumulator, 1000, 0, 7, 49, 1, 7, 7",
+    "router_1_rtr, send_packet_count, port9, Accumulator, 1000, 0, 99, 0, 1, 99, 99",
+    "router_0_rtr, send_packet_count, port0, Accumulator, 2000, 0, 12, 144, 1, 12, 12",
+    "endpoint_2_nic, packet_latency, , Accumulator, 2000, 0, 300, 30400, 3, 80, 120",
+    "endpoint_9_nic, packet_latency, , Accumulator, 2000, 0, 1, 1, 1, 1, 1",
+    "endpoint_2_nic, packet_latency, , Accumulator, 3000, 0, 500, 64100, 4, 90, 200",
+    "memory_0, requests, , Accumulator, 3000, 0, 42, 0, 1, 42, 42",
+)
+
+
+def test_sst_stats_parser():
+    """
+    SST统计解析测试
+
+    写出一个小的SST格式CSV，检查每端口/每网络接口数组、累计值 (取最后一次输出)
+    与求和两种模式、求和模式下首次出现的目标以inf为min初值、.npz缓存的复用与
+    按源文件签名和网格形状失效，以及缺少必需列时的ValueError
+    """
+    print("\n\n=== SST统计解析测试 ===")
+
+    field = {name: index for index, name in enumerate(STAT_FIELDS)}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "stats.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join((_TEST_CSV_HEADER,) + _TEST_CSV_ROWS) + "\n")
+        with gzip.open(f"{path}.gz", "wt", encoding="utf-8") as f:
+            f.write("\n".join((_TEST_CSV_HEADER,) + _TEST_CSV_ROWS) + "\n")
+
+        # 累计值模式: 每个统计取最后一次输出，越界端口/节点和非网络组件被忽略
+        stats = parse_sst_csv(path, 2, 2, chunk_rows=3)
+        packets = stats.port_packets()
+        latency = stats.endpoint["packet_latency"]
+        ok = (packets.shape == (4, len(PORT_DIRECTIONS)) and packets[0, 0] == 12 and packets[3, LOCAL_PORT] == 7
+              and packets.sum() == 19 and latency.shape == (4, len(STAT_FIELDS))
+              and latency[2].tolist() == [500, 64100, 4, 90, 200] and latency[[0, 1, 3]].sum() == 0
+              and set(stats.router) == {"send_packet_count"} and stats.last_sim_time == 3000)
+        print(f"  {'✅' if ok else '❌'} 累计值模式: 端口数组 {packets.shape}, router_0 port0 = {packets[0, 0]:.0f}, "
+              f"endpoint_2 延迟 = {latency[2].tolist()}")
+        assert ok, "累计值模式的端口/网络接口数组与最后一次输出不一致"
+
+        # 求和模式: sum/sumsq/count求和，min/max取极值；endpoint_2首次出现在第二块，min须从inf开始
+        stats = parse_sst_csv(path, 2, 2, chunk_rows=3, cumulative=False)
+        latency = stats.endpoint["packet_latency"]
+        port = stats.router["send_packet_count"][0, 0]
+        ok = (latency[2].tolist() == [800, 94500, 7, 80, 200] and port.tolist() == [17, 169, 2, 5, 12]
+              and latency[1, field["min"]] == 0 and stats.mean_packet_latency()[2] == 800 / 7
+              and np.isnan(stats.mean_packet_latency()[1]))
+        print(f"  {'✅' if ok else '❌'} 求和模式: endpoint_2 延迟 = {latency[2].tolist()}, "
+              f"router_0 port0 = {port.tolist()}")
+        assert ok, "求和模式的累加结果错误 (未出现过的目标min应以inf为初值)"
+
+        compressed = parse_sst_csv(f"{path}.gz", 2, 2)
+        ok = all(np.array_equal(compressed.router[name], parse_sst_csv(path, 2, 2).router[name])
+                 for name in compressed.router)
+        print(f"  {'✅' if ok else '❌'} gzip压缩CSV与未压缩结果一致")
+        assert ok, "gzip压缩CSV的解析结果与未压缩CSV不一致"
+
+        # 缓存: 命中时不重新解析 (不重写缓存文件)，源文件、累计模式或网格形状变化时重新解析
+        cache_path = f"{path}.npz"
+
+        def reparsed(**kwargs) -> Tuple[bool, SSTStatistics]:
+            os.utime(cache_path, ns=(1, 1))
+            result = load_sst_statistics(path, **kwargs)
+            return os.stat(cache_path).st_mtime_ns != 1, result
+
+        first = load_sst_statistics(path, 2, 2)
+        hit, cached = reparsed(mesh_size_x=2, mesh_size_y=2)
+        same = all(np.array_equal(cached.router[name], first.router[name]) for name in first.router)
+        print(f"  {'✅' if os.path.exists(cache_path) and not hit and same else '❌'} 缓存命中时直接读取.npz")
+        assert os.path.exists(cache_path) and not hit and same, "签名未变化时应复用缓存"
+
+        shape_changed, reshaped = reparsed(mesh_size_x=4, mesh_size_y=1)
+        mode_changed, summed = reparsed(mesh_size_x=4, mesh_size_y=1, cumulative=False)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("router_2_rtr, send_packet_count, port1, Accumulator, 4000, 0, 3, 9, 1, 3, 3\n")
+        source_changed, updated = reparsed(mesh_size_x=4, mesh_size_y=1, cumulative=False)
+        ok = (shape_changed and (reshaped.mesh_size_x, reshaped.mesh_size_y) == (4, 1)
+              and mode_changed and summed.port_packets()[0, 0] == 17
+              and source_changed and updated.port_packets()[2, 1] == 3)
+        print(f"  {'✅' if ok else '❌'} 网格形状、累计模式或源文件变化时重新解析")
+        assert ok, "缓存未按网格形状/累计模式/源文件签名失效"
+
+        # 缺少必需列的表头
+        bad_path = os.path.join(directory, "bad.csv")
+        with open(bad_path, "w", encoding="utf-8") as f:
+            f.write("Component, Statistic, SimTime, Sum.u64\nrouter_0_rtr, send_packet_count, 1000, 5\n")
+        try:
+            parse_sst_csv(bad_path, 2, 2)
+        except ValueError as error:
+            print(f"  ✅ 缺少必需列的表头: ValueError ({error})")
+        else:
+            raise AssertionError("缺少ComponentName等必需列时应抛出ValueError")
+
+
+# =============================================================================
+# 命令行入口
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口: 解析SST统计CSV并打印链路利用率和热点报告"""
+    parser = argparse.ArgumentParser(description="解析SST statOutputCSV统计结果")
+    parser.add_argument("csv_file", help="SST统计CSV文件 (.csv 或 .csv.gz)")
+    parser.add_argument("--shape", default="4x4", help="网格大小，如 4x4")
+    parser.add_argument("--topology", choices=["mesh", "torus"], default="mesh", help="拓扑类型")
+    parser.add_argument("--link-bw", type=float, default=40.0, help="链路带宽 (GiB/s)")
+    parser.add_argument("--chunk-rows", type=int, default=100000, help="每块读取的行数")
+    parser.add_argument("--no-cache", action="store_true", help="不读写二进制缓存")
+    args = parser.parse_args(argv)
+
+    size_x, size_y = (int(v) for v in args.shape.lower().split("x"))
+    stats = load_sst_statistics(args.csv_file, size_x, size_y,
+                                chunk_rows=args.chunk_rows, use_cache=not args.no_cache)
+    stats.print_report(wrap=args.topology == "torus", link_bandwidth_gib=args.link_bw)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Run-to-Run Statistics Diff
+
+两次运行统计的逐节点/逐链路/逐流对比，用于性能回归定位
+读取两份按列组织的运行统计 (collect_statistics() 的结果: export_sst_statistics 导出的
+hybrid_mesh_run_*.json，或结果缓存条目 <键>.json.gz)，用numpy按列计算吞吐量、
+延迟 (平均/p50/p99) 和跳数的差值，按恶化程度排序并输出简短报告
+
+所有计算都是整列的向量运算，流按 (目标, 源) 编码为整数键后用排序求交对齐，
+4096节点网格的对比在数秒内完成 (耗时主要在JSON解析)
+
+使用方法:
+    python stats_diff.py statistics_output/hybrid_mesh_run_A.json statistics_output/hybrid_mesh_run_B.json
+    python stats_diff.py base.json.gz candidate.json.gz --top 5 --json diff_report.json
+"""
+
+# 标准库导入
+import argparse
+import gzip
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# 第三方库
+import numpy as np
+
+# 链路方向顺序 (与collect_statistics()["links"]一致)
+LINK_DIRECTIONS = ("north", "south", "east", "west")
+
+
+# =============================================================================
+# 数据结构
+# =============================================================================
+
+@dataclass
+class MetricDelta:
+    """一项指标在两次运行之间的逐实体差值"""
+    scope: str                           # node / link / flow
+    metric: str
+    higher_is_better: Optional[bool]     # None表示无好坏方向 (如链路负载，增大视为恶化)
+    ids: np.ndarray                      # 实体编号 (节点ID / 方向*N+节点ID / 目标*N+源)
+    baseline: np.ndarray
+    candidate: np.ndarray
+
+    @property
+    def delta(self) -> np.ndarray:
+        return self.candidate - self.baseline
+
+    @property
+    def regression(self) -> np.ndarray:
+        """恶化量 (正值表示变差，NaN表示任一侧无数据)"""
+        return self.baseline - self.candidate if self.higher_is_better else self.candidate - self.baseline
+
+    def worst(self, top: int) -> np.ndarray:
+        """恶化量最大的top个实体下标 (只含恶化量>0的实体)"""
+        regression = np.nan_to_num(self.regression, nan=0.0)
+        candidates = np.flatnonzero(regression > 0)
+        if len(candidates) > top:
+            candidates = candidates[np.argpartition(-regression[candidates], top - 1)[:top]]
+        return candidates[np.argsort(-regression[candidates], kind="stable")]
+
+
+@dataclass
+class RunDiff:
+    """两次运行的对比结果"""
+    mesh_size: Tuple[int, int]
+    summary: Dict[str, Tuple[float, float]]            # 汇总指标 -> (基线, 候选)
+    metrics: List[MetricDelta] = field(default_factory=list)
+    flows_common: int = 0
+    flows_only_baseline: int = 0
+    flows_only_candidate: int = 0
+
+    def label(self, scope: str, entity: int) -> str:
+        """实体的可读名称"""
+        size_x, size_y = self.mesh_size
+        num_nodes = size_x * size_y
+
+        def position(node_id: int) -> str:
+            return f"({node_id % size_x},{node_id // size_x})"
+
+        if scope == "node":
+            return position(entity)
+        if scope == "link":
+            return f"{position(entity % num_nodes)}->{LINK_DIRECTIONS[entity // num_nodes]}"
+        return f"{position(entity % num_nodes)}->{position(entity // num_nodes)}"
+
+    def regressions(self, top: int = 10) -> List[Dict[str, Any]]:
+        """
+        各指标恶化最大的实体，合并后按相对恶化量 (恶化量 / 该指标基线均值) 排序
+
+        Returns:
+            List[Dict]: scope/metric/entity/baseline/candidate/delta/relative
+        """
+        rows = []
+        for metric in self.metrics:
+            scale = np.nanmean(np.abs(metric.baseline)) if len(metric.baseline) else 0.0
+            for index in metric.worst(top).tolist():
+                baseline, candidate = float(metric.baseline[index]), float(metric.candidate[index])
+                rows.append({
+                    "scope": metric.scope, "metric": metric.metric,
+                    "entity": self.label(metric.scope, int(metric.ids[index])),
+                    "baseline": baseline, "candidate": candidate, "delta": candidate - baseline,
+                    "relative": float(metric.regression[index] / scale) if scale > 0 else float("inf"),
+                })
+        rows.sort(key=lambda row: row["relative"], reverse=True)
+        return rows
+
+    def to_dict(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            "mesh_size": list(self.mesh_size),
+            "summary": {key: {"baseline": base, "candidate": cand} for key, (base, cand) in self.summary.items()},
+            "flows": {"common": self.flows_common, "only_baseline": self.flows_only_baseline,
+                      "only_candidate": self.flows_only_candidate},
+            "regressions": self.regressions(top),
+        }
+
+    def print_report(self, top: int = 10):
+        """打印简短对比报告: 汇总指标变化 + 每项指标恶化最大的实体"""
+        size_x, size_y = self.mesh_size
+        print(f"\n=== 运行对比 ({size_x}x{size_y}) ===")
+        print(f"{'指标':<22} {'基线':>12} {'候选':>12} {'变化':>9}")
+        for key, (base, cand) in self.summary.items():
+            change = f"{(cand - base) / base * 100:+.1f}%" if base else "-"
+            print(f"{key:<22} {base:>12.4f} {cand:>12.4f} {change:>9}")
+        print(f"流: 共有 {self.flows_common}, 仅基线 {self.flows_only_baseline}, 仅候选 {self.flows_only_candidate}")
+
+        for metric in self.metrics:
+            worst = metric.worst(top)
+            if not len(worst):
+                continue
+            print(f"\n📉 {metric.scope}.{metric.metric} 恶化最大的 {len(worst)} 个:")
+            for index in worst.tolist():
+                base, cand = metric.baseline[index], metric.candidate[index]
+                print(f"   {self.label(metric.scope, int(metric.ids[index])):<22} "
+                      f"{base:>10.4f} -> {cand:>10.4f} ({cand - base:+.4f})")
+
+
+# =============================================================================
+# 读取与对比
+# =============================================================================
+
+def load_statistics(path: str) -> Dict[str, Any]:
+    """读取运行统计 (JSON文件或gzip压缩的结果缓存条目)"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        data = json.load(handle)
+    if "statistics" in data and "nodes" not in data:
+        data = data["statistics"]
+    if "nodes" not in data or "links" not in data:
+        raise ValueError(f"不是按列组织的运行统计文件: {path}")
+    return data
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """逐元素相除，分母为0处为NaN"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1), np.nan)
+
+
+def _node_metrics(statistics: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    nodes = {key: np.asarray(values, dtype=np.float64) for key, values in statistics["nodes"].items()}
+    cycles = max(statistics.get("cycles") or 1, 1)
+    received = nodes["packets_received"]
+    metrics = {
+        "throughput": received / cycles,
+        "avg_latency_cycles": _ratio(nodes["total_latency_cycles"], received),
+        "avg_hop_count": _ratio(nodes["total_hop_count"], received),
+    }
+    for key in ("p50_latency_cycles", "p99_latency_cycles"):
+        if key in nodes:
+            metrics[key] = np.where(received > 0, nodes[key], np.nan)
+    return metrics
+
+
+def _flow_table(statistics: Dict[str, Any], num_nodes: int) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    flows = statistics.get("flows") or {}
+    source = np.asarray(flows.get("source", []), dtype=np.int64)
+    keys = np.asarray(flows.get("destination", []), dtype=np.int64) * num_nodes + source
+    columns = {name: np.asarray(flows.get(name, []), dtype=np.float64)
+               for name in ("packets", "total_latency_cycles", "total_hop_count")}
+    # 逐流p99列只在较新引擎版本的运行统计中存在
+    if "p99_latency_cycles" in flows:
+        columns["p99_latency_cycles"] = np.asarray(flows["p99_latency_cycles"], dtype=np.float64)
+    order = np.argsort(keys, kind="stable")
+    return keys[order], {name: column[order] for name, column in columns.items()}
+
+
+# 指标好坏方向
+_HIGHER_IS_BETTER = {"throughput": True, "avg_latency_cycles": False, "p50_latency_cycles": False,
+                     "p99_latency_cycles": False, "avg_hop_count": False}
+
+
+def diff_runs(baseline: Dict[str, Any], candidate: Dict[str, Any], min_packets: int = 5) -> RunDiff:
+    """
+    对比两次运行
+
+    Args:
+        baseline: 基线运行统计
+        candidate: 候选运行统计
+        min_packets: 流级延迟/跳数只比较两次运行中都至少有这么多包的流
+
+    Returns:
+        RunDiff: 汇总、逐节点、逐链路和逐流的差值
+    """
+    num_nodes = len(baseline["nodes"]["packets_received"])
+    if len(candidate["nodes"]["packets_received"]) != num_nodes:
+        raise ValueError(f"两次运行的节点数不同: {num_nodes} vs {len(candidate['nodes']['packets_received'])}")
+    mesh_size = tuple(baseline.get("mesh_size") or (num_nodes, 1))
+    if candidate.get("mesh_size") and tuple(candidate["mesh_size"]) != mesh_size:
+        raise ValueError(f"两次运行的网格形状不同: {mesh_size} vs {tuple(candidate['mesh_size'])}")
+
+    summary = {key: (float(baseline["summary"][key]), float(candidate["summary"][key]))
+               for key in baseline["summary"] if key in candidate["summary"]}
+    result = RunDiff(mesh_size=mesh_size, summary=summary)
+
+    # 逐节点
+    node_ids = np.arange(num_nodes)
+    base_nodes, cand_nodes = _node_metrics(baseline), _node_metrics(candidate)
+    for metric, values in base_nodes.items():
+        if metric in cand_nodes:
+            result.metrics.append(MetricDelta("node", metric, _HIGHER_IS_BETTER[metric], node_ids,
+                                              values, cand_nodes[metric]))
+
+    # 逐链路 (输出链路负载，包/周期)
+    def link_load(statistics: Dict[str, Any]) -> np.ndarray:
+        links = np.asarray([statistics["links"][direction] for direction in LINK_DIRECTIONS], dtype=np.float64)
+        return links.reshape(-1) / max(statistics.get("cycles") or 1, 1)
+
+    result.metrics.append(MetricDelta("link", "load", None, np.arange(len(LINK_DIRECTIONS) * num_nodes),
+                                      link_load(baseline), link_load(candidate)))
+
+    # 逐流: 按整数键排序求交对齐
+    base_keys, base_flows = _flow_table(baseline, num_nodes)
+    cand_keys, cand_flows = _flow_table(candidate, num_nodes)
+    common, base_index, cand_index = np.intersect1d(base_keys, cand_keys, assume_unique=True, return_indices=True)
+    result.flows_common = len(common)
+    result.flows_only_baseline = len(base_keys) - len(common)
+    result.flows_only_candidate = len(cand_keys) - len(common)
+    if len(common):
+        base_packets, cand_packets = base_flows["packets"][base_index], cand_flows["packets"][cand_index]
+        result.metrics.append(MetricDelta(
+            "flow", "throughput", True, common,
+            base_packets / max(baseline.get("cycles") or 1, 1), cand_packets / max(candidate.get("cycles") or 1, 1)))
+        sampled = (base_packets >= min_packets) & (cand_packets >= min_packets)
+        for column, metric in (("total_latency_cycles", "avg_latency_cycles"), ("total_hop_count", "avg_hop_count")):
+            result.metrics.append(MetricDelta(
+                "flow", metric, False, common[sampled],
+                base_flows[column][base_index][sampled] / base_packets[sampled],
+                cand_flows[column][cand_index][sampled] / cand_packets[sampled]))
+        if "p99_latency_cycles" in base_flows and "p99_latency_cycles" in cand_flows:
+            result.metrics.append(MetricDelta(
+                "flow", "p99_latency_cycles", False, common[sampled],
+                base_flows["p99_latency_cycles"][base_index][sampled],
+                cand_flows["p99_latency_cycles"][cand_index][sampled]))
+    return result
+
+
+# =============================================================================
+# 命令行接口
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="两次运行统计的逐节点/逐链路/逐流对比")
+    parser.add_argument("baseline", help="基线运行统计 (hybrid_mesh_run_*.json 或缓存条目 .json.gz)")
+    parser.add_argument("candidate", help="候选运行统计")
+    parser.add_argument("--top", type=int, default=10, help="每项指标列出的恶化实体数")
+    parser.add_argument("--min-packets", type=int, default=5, help="流级延迟/跳数比较的最少包数")
+    parser.add_argument("--json", help="把对比结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    result = diff_runs(load_statistics(args.baseline), load_statistics(args.candidate), args.min_packets)
+    result.print_report(args.top)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(result.to_dict(args.top), handle, indent=2, ensure_ascii=False)
+        print(f"\n对比结果已写入: {args.json}")
+    print(f"\n用时 {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()